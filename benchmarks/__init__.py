@@ -0,0 +1 @@
+# benchmarks：熱點路徑的效能基準（python -m benchmarks.run）
@@ -0,0 +1,261 @@
+# benchmarks/cases.py
+# 基準項目：每個項目是一個 setup 函式，回傳要重複計時的無參數 callable
+from __future__ import annotations
+
+import io
+import tempfile
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+@dataclass
+class Benchmark:
+    name: str
+    setup: Callable[[], Callable[[], object]]
+    number: int = 1   # 每次計時呼叫幾次（取平均）
+    repeat: int = 5   # 計時幾輪（比較時取最小值）
+    floor_s: float = 0.0  # 比基準慢不到此秒數不算退步（易受雜訊影響的項目另設）
+
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def bench(name: str, *, number: int = 1, repeat: int = 5, floor_s: float = 0.0):
+    def deco(setup):
+        BENCHMARKS[name] = Benchmark(name=name, setup=setup, number=number, repeat=repeat, floor_s=floor_s)
+        return setup
+    return deco
+
+
+# ---------------- 稅務引擎 ----------------
+
+_FAMILY = dict(has_spouse=True, adult_children=2, parents=1, disabled_people=0, other_dependents=0)
+
+
+@bench("tax_rules.diagnose_yuan", number=2000)
+def _tax_scalar():
+    from src.domain.tax_rules import EstateTaxCalculator
+    calc = EstateTaxCalculator()
+    return lambda: calc.diagnose_yuan(185_000_000, **_FAMILY)
+
+
+@bench("tax_rules.diagnose_batch_100k", number=5)
+def _tax_batch():
+    from src.domain.tax_rules import EstateTaxCalculator
+    calc = EstateTaxCalculator()
+    values = np.random.default_rng(0).uniform(0, 2e9, 100_000)
+    return lambda: calc.diagnose_batch(values, **_FAMILY)
+
+
+@bench("legacy.tax_calculator", number=5000)
+def _legacy_tax():
+    from legacy_tools.modules.tax_calculator import TaxCalculator
+    return lambda: TaxCalculator.calculate_inheritance_tax(30000, 2000, 1333)
+
+
+@bench("insurance.recommend_batch_10k", number=3)
+def _recommend_batch():
+    import pandas as pd
+    from legacy_tools.modules.insurance_logic import recommend_strategies_batch
+    rng = np.random.default_rng(0)
+    goals = ["傳承", "稅源", "企業主", "退休", "資產配置", "醫療", "長照", "教育"]
+    df = pd.DataFrame({
+        "budget": rng.uniform(10, 2000, 10_000),
+        "currency": rng.choice(["TWD", "USD"], 10_000),
+        "pay_years": rng.choice([1, 6, 10, 20], 10_000),
+        "goals": [list(rng.choice(goals, rng.integers(1, 4), replace=False)) for _ in range(10_000)],
+    })
+    return lambda: recommend_strategies_batch(df)
+
+
+# ---------------- PDF ----------------
+
+_PARAGRAPH = (
+    "家族傳承規劃重點：先盤點資產與負債，估算遺產稅與稅源缺口，"
+    "再以保單、信託與贈與安排分年落實。Estate planning summary line. "
+)
+
+
+def _pdf_setup(paragraphs: int):
+    def setup():
+        from legacy_tools.modules.pdf_generator import generate_pdf
+        content = "\n".join(_PARAGRAPH * 3 for _ in range(paragraphs))
+        logo = str(REPO_ROOT / "logo.png")
+        return lambda: generate_pdf(content, title="基準測試報告", logo_path=logo, footer_text="永傳家族辦公室")
+    return setup
+
+
+bench("pdf.generate_short", number=5)(_pdf_setup(5))
+bench("pdf.generate_long", number=1, repeat=3)(_pdf_setup(400))
+
+
+@bench("pdf.render_cached", number=200)
+def _pdf_cached():
+    from legacy_tools.modules.pdf_generator import render_pdf
+    content = "\n".join(_PARAGRAPH * 3 for _ in range(5))
+    render_pdf(content, title="基準測試報告", footer_text="永傳家族辦公室")
+    return lambda: render_pdf(content, title="基準測試報告", footer_text="永傳家族辦公室")
+
+
+def _wrap_setup(quadratic: bool):
+    def setup():
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.units import mm
+        from reportlab.pdfbase import pdfmetrics
+        from legacy_tools.modules import pdf_generator as pg
+
+        text = (_PARAGRAPH * 500)[:50_000]
+        font, size, maxw = pg._font_name(), 12, A4[0] - 40 * mm
+        if not quadratic:
+            return lambda: pg._wrap(text, font, size, maxw)
+
+        def prefix_wrap():
+            # 舊版作法：每加一字就重量整段前綴寬度（每行平方時間），留作對照
+            out, buf = [], ""
+            for ch in text:
+                if pdfmetrics.stringWidth(buf + ch, font, size) <= maxw:
+                    buf += ch
+                else:
+                    out.append(buf)
+                    buf = ch
+            out.append(buf)
+            return out
+        return prefix_wrap
+    return setup
+
+
+bench("pdf.wrap_50k", number=3)(_wrap_setup(quadratic=False))
+bench("pdf.wrap_50k_prefix_reference", number=1, repeat=3)(_wrap_setup(quadratic=True))
+
+
+# ---------------- Copilot 檢索 ----------------
+
+@bench("copilot.retrieve", number=200)
+def _retrieve():
+    from src.services.knowledge import load_cards_from, retrieve
+    cards = []
+    for folder in ("knowledge", "knowledge_public"):
+        cards += load_cards_from(str(REPO_ROOT / folder))
+    return lambda: retrieve("遺產稅 稅源 保單 信託 贈與 規劃", cards, k=3)
+
+
+@bench("copilot.retrieve_500_cards", number=5)
+def _retrieve_large():
+    from src.services.knowledge import load_cards_from, retrieve
+    cards = load_cards_from(str(REPO_ROOT / "knowledge"))
+    corpus = [(f"{i}_{fn}", tx) for i in range(500 // max(len(cards), 1) + 1) for fn, tx in cards][:500]
+    return lambda: retrieve("遺產稅 稅源 保單 信託 贈與 規劃", corpus, k=3)
+
+
+# ---------------- 資料庫寫入 ----------------
+# 在暫存目錄建立獨立的 SQLite，不碰專案的 data/app.db
+
+def _isolated_db():
+    import src.db as db
+    tmp = Path(tempfile.mkdtemp(prefix="bench_db_"))
+    if db._conn is not None:
+        db._conn.close()
+    db._conn = None
+    db.DB_PATH = tmp / "app.db"
+    return db
+
+
+@bench("repo.case_upsert", number=200)
+def _case_upsert():
+    _isolated_db()
+    from src.repos.case_repo import CaseRepo
+
+    def run():
+        CaseRepo.upsert({
+            "id": uuid.uuid4().hex[:12], "advisor_id": "bench", "advisor_name": "基準",
+            "client_alias": "王先生", "assets_financial": 5000, "assets_realestate": 12000,
+            "assets_business": 3000, "liabilities": 1000, "net_estate": 19000,
+            "tax_estimate": 1500, "liquidity_needed": 1800, "payload": {"note": "bench"},
+        })
+    return run
+
+
+@bench("repo.event_log", number=500)
+def _event_log():
+    _isolated_db()
+    from src.repos.event_repo import EventRepo
+    return lambda: EventRepo.log("bench-case", "report_download", {"kind": "pdf"})
+
+
+# ---------------- 圖表 ----------------
+
+def _render(make_fig) -> Callable[[], object]:
+    import matplotlib.pyplot as plt
+
+    def run():
+        fig = make_fig()
+        out = io.BytesIO()
+        fig.savefig(out, format="png", dpi=100)
+        plt.close(fig)
+        return out
+    return run
+
+
+@bench("charts.tax_breakdown_bar", number=3)
+def _chart_bar():
+    from src.services.charts import tax_breakdown_bar
+    return _render(lambda: tax_breakdown_bar(25_000))
+
+
+@bench("charts.savings_compare_bar", number=3)
+def _chart_compare():
+    from src.services.charts import savings_compare_bar
+    return _render(lambda: savings_compare_bar(32_000_000, 20_000_000))
+
+
+@bench("charts.simple_sankey", number=3)
+def _chart_sankey():
+    from src.services.charts import simple_sankey
+    return _render(lambda: simple_sankey(300_000_000, 32_000_000, 10_000_000))
+
+
+@bench("charts.asset_pie_vector", number=3, repeat=7, floor_s=0.010)
+def _chart_pie_vector():
+    # 與上方 PNG 輸出對照：同一張圖轉成 reportlab 向量圖（不經快取）
+    import matplotlib.pyplot as plt
+    from src.services.charts import asset_pie
+    from src.services.chart_vector import figure_to_drawing
+
+    def run():
+        fig = asset_pie(10_000_000, 20_000_000, 5_000_000)
+        drawing = figure_to_drawing(fig)
+        plt.close(fig)
+        return drawing
+    return run
+
+
+@bench("reports.build_pdf_report", number=5, repeat=7, floor_s=0.005)
+def _report_pdf():
+    from src.services.reports_pdf import build_pdf_report
+    out = Path(tempfile.mkdtemp(prefix="bench-reports-"))
+    case = {"id": "bench", "net_estate": 300_000_000, "tax_estimate": 32_000_000, "liquidity_needed": 35_000_000,
+            "assets_financial": 100_000_000, "assets_realestate": 180_000_000, "assets_business": 20_000_000,
+            "payload": {"params": {"has_spouse": True, "adult_children": 2}}}
+    return lambda: build_pdf_report(case, out_dir=out)
+
+
+@bench("reports.render_docx", number=200)
+def _report_docx():
+    from src.services.reports import load_master, render_docx
+    case = {"id": "bench", "client_alias": "王先生", "net_estate": 300_000_000, "tax_estimate": 32_000_000,
+            "liquidity_needed": 35_000_000, "assets_financial": 100_000_000, "assets_realestate": 180_000_000}
+    load_master()
+    return lambda: render_docx(case, full=True)
+
+
+def select(patterns: List[str] | None) -> List[Benchmark]:
+    items = list(BENCHMARKS.values())
+    if not patterns:
+        return items
+    return [b for b in items if any(p in b.name for p in patterns)]
@@ -0,0 +1,144 @@
+# benchmarks/run.py
+"""
+熱點路徑效能基準（離線可跑）：
+
+    python -m benchmarks.run                       # 全部跑，與 baselines.json 比較
+    python -m benchmarks.run -k pdf -k tax          # 只跑名稱含 pdf / tax 的項目
+    python -m benchmarks.run --output out.json      # 結果另存 JSON
+    python -m benchmarks.run --update-baselines     # 以本次結果覆寫基準
+
+比較以各輪「每次呼叫秒數」的最小值為準（最不受背景負載干擾）；超過基準 (1 + threshold) 倍，
+且多出的時間超過絕對容忍值（--min-delta-ms 與項目自訂 floor_s 取大者）才視為退步，程式以代碼 1 結束。
+微秒級項目的比例波動多半是雜訊，絕對容忍值避免誤報。
+基準值與機器有關，換機器後請先 --update-baselines。
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import warnings
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict
+
+import matplotlib
+matplotlib.use("Agg")
+
+from benchmarks.cases import REPO_ROOT, Benchmark, select
+
+BASELINES_PATH = Path(__file__).resolve().parent / "baselines.json"
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_MIN_DELTA_S = 0.001
+
+
+def time_benchmark(b: Benchmark) -> Dict[str, Any]:
+    fn = b.setup()
+    fn()  # 暖身：載入字型、建立連線、填滿快取
+    per_call = []
+    for _ in range(b.repeat):
+        t0 = time.perf_counter()
+        for _ in range(b.number):
+            fn()
+        per_call.append((time.perf_counter() - t0) / b.number)
+    return {
+        "median_s": statistics.median(per_call),
+        "min_s": min(per_call),
+        "number": b.number,
+        "repeat": b.repeat,
+        "floor_s": b.floor_s,
+    }
+
+
+def compare(results: Dict[str, Dict[str, Any]], baselines: Dict[str, Dict[str, Any]],
+            threshold: float, min_delta_s: float = DEFAULT_MIN_DELTA_S) -> Dict[str, Dict[str, Any]]:
+    out: Dict[str, Dict[str, Any]] = {}
+    for name, r in results.items():
+        base = baselines.get(name)
+        if not base:
+            out[name] = {"status": "new"}
+            continue
+        ratio = r["min_s"] / base["min_s"] if base["min_s"] > 0 else float("inf")
+        delta = r["min_s"] - base["min_s"]
+        tolerance = max(min_delta_s, r.get("floor_s", 0.0))
+        if ratio > 1 + threshold and delta > tolerance:
+            status = "regressed"
+        elif ratio < 1 - threshold and -delta > tolerance:
+            status = "improved"
+        else:
+            status = "ok"
+        out[name] = {"status": status, "ratio": ratio, "delta_s": delta, "baseline_min_s": base["min_s"]}
+    return out
+
+
+def _environment() -> Dict[str, str]:
+    import numpy
+    import reportlab
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": numpy.__version__,
+        "reportlab": reportlab.Version,
+        "matplotlib": matplotlib.__version__,
+    }
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.run", description="熱點路徑效能基準")
+    ap.add_argument("-k", dest="patterns", action="append", help="只跑名稱包含此字串的項目（可重複）")
+    ap.add_argument("--output", type=Path, help="結果 JSON 輸出路徑（預設只印到 stdout）")
+    ap.add_argument("--baselines", type=Path, default=BASELINES_PATH)
+    ap.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="允許的變慢比例（預設 0.25）")
+    ap.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_S * 1e3,
+                    help="絕對容忍值：比基準多出不到此毫秒數不算退步（預設 1）")
+    ap.add_argument("--update-baselines", action="store_true", help="以本次結果覆寫基準檔")
+    args = ap.parse_args(argv)
+
+    # 讓 cases 中依 cwd 找檔的模組（字型、logo）行為與 app 一致
+    sys.path.insert(0, str(REPO_ROOT))
+    # 環境缺中文字型時 matplotlib 會逐字警告，不影響計時
+    warnings.filterwarnings("ignore", message="Glyph .* missing from font")
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for b in select(args.patterns):
+        results[b.name] = time_benchmark(b)
+        print(f"{b.name:<32} {results[b.name]['min_s'] * 1e3:>10.3f} ms", file=sys.stderr)
+
+    baselines: Dict[str, Dict[str, Any]] = {}
+    if args.baselines.is_file():
+        baselines = json.loads(args.baselines.read_text(encoding="utf-8")).get("results", {})
+    comparison = compare(results, baselines, args.threshold, args.min_delta_ms / 1e3)
+
+    report = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "environment": _environment(),
+        "threshold": args.threshold,
+        "min_delta_s": args.min_delta_ms / 1e3,
+        "results": results,
+        "comparison": comparison,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        args.output.write_text(text, encoding="utf-8")
+
+    if args.update_baselines:
+        merged = {**baselines, **results}
+        args.baselines.write_text(json.dumps(
+            {"environment": report["environment"], "results": merged},
+            ensure_ascii=False, indent=2,
+        ) + "\n", encoding="utf-8")
+        return 0
+
+    regressed = [n for n, c in comparison.items() if c["status"] == "regressed"]
+    for n in regressed:
+        c = comparison[n]
+        print(f"退步：{n} 為基準的 {c['ratio']:.2f} 倍（多 {c['delta_s'] * 1e3:.3f} ms）", file=sys.stderr)
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,20 @@
 # legacy_tools/modules/__init__.py
-from .pdf_generator import generate_pdf
-from .insurance_logic import recommend_strategies, FX_USD_TWD
+from .pdf_generator import generate_pdf, render_pdf, pdf_cache_stats
+from .insurance_logic import recommend_strategies, recommend_strategies_batch, FX_USD_TWD
+from .insurance_projection import project_policy
+from .coverage_optimizer import optimize_coverage
+from .fx import FxQuote, FxService, get_fx_service
 
 __all__ = [
     "generate_pdf",
+    "render_pdf",
+    "pdf_cache_stats",
     "recommend_strategies",
+    "recommend_strategies_batch",
     "FX_USD_TWD",
+    "project_policy",
+    "optimize_coverage",
+    "FxQuote",
+    "FxService",
+    "get_fx_service",
 ]
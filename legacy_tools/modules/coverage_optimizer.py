@@ -0,0 +1,221 @@
+# legacy_tools/modules/coverage_optimizer.py
+"""
+稅源保障配置：在總預算內分配各類保單（定期／終身 × TWD／USD），
+於「保障額度達成稅源目標」與「期末保單價值」之間求取 Pareto 前緣。
+- 每個權重下為一個小型線性規劃（預算、單一商品上限、USD 曝險上限、保障不超過目標）
+- 係數由 insurance_projection 的試算模型推得；金額單位：萬元（TWD）
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .insurance_projection import mortality_rate, project_policy
+
+
+@dataclass(frozen=True)
+class ProductArchetype:
+    """保單原型：kind 為 "term"（定期，保障期間＝繳費年期）或 "whole"（終身）。"""
+    name: str
+    kind: str
+    currency: str
+    declared_rate: float = 0.0
+    min_pay_years: int = 1
+    max_pay_years: int = 30
+    max_share: float = 1.0       # 占總預算上限
+    expense_load: float = 0.25   # 定期險附加費用率
+
+
+DEFAULT_ARCHETYPES: Tuple[ProductArchetype, ...] = (
+    ProductArchetype("定期壽險（TWD）", "term", "TWD", min_pay_years=5, max_pay_years=30, max_share=0.5),
+    ProductArchetype("定期壽險（USD）", "term", "USD", min_pay_years=5, max_pay_years=30, max_share=0.5),
+    ProductArchetype("增額終身壽險（TWD）", "whole", "TWD", declared_rate=0.025, min_pay_years=1, max_pay_years=20),
+    ProductArchetype("增額終身壽險（USD）", "whole", "USD", declared_rate=0.040, min_pay_years=2, max_pay_years=20),
+)
+
+
+@dataclass
+class Allocation:
+    """單一配置（金額單位：萬元 TWD）。"""
+    premiums_wan: Dict[str, float]
+    coverage_wan: float
+    cash_value_wan: float
+    spent_wan: float
+    usd_share: float
+    target_ratio: float
+    vertex: bool = True   # False：相鄰兩個頂點解的線性內插
+
+
+@dataclass
+class CoverageFrontier:
+    target_wan: float
+    budget_wan: float
+    max_usd_share: float
+    products: List[ProductArchetype]
+    coverage_per_wan: np.ndarray     # 每萬元保費對應的保障額度
+    cash_value_per_wan: np.ndarray   # 每萬元保費於 horizon 年末的保單價值
+    points: List[Allocation] = field(default_factory=list)
+
+    def frame(self) -> pd.DataFrame:
+        rows = []
+        for p in self.points:
+            row = {
+                "保障額度（萬元）": p.coverage_wan,
+                "稅源達成率": p.target_ratio,
+                "期末保單價值（萬元）": p.cash_value_wan,
+                "投入保費（萬元）": p.spent_wan,
+                "USD 占比": p.usd_share,
+            }
+            row.update({f"{k}（萬元）": v for k, v in p.premiums_wan.items()})
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+
+def product_coefficients(
+    products: Sequence[ProductArchetype],
+    *,
+    age: int,
+    pay_years: int,
+    horizon_years: int = 20,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    每萬元（TWD 等值）總保費可買到的保障額度與 horizon 年末保單價值。
+    終身險取 project_policy 第 pay_years 年的身故保險金；定期險以繳費期間平均死亡率計價，
+    且只在保障期間（＝繳費年期）內有效，故保障額度依其涵蓋 horizon 的比例折算。
+    幣別不影響 TWD 等值係數，只計入 USD 曝險。
+    """
+    cov = np.zeros(len(products))
+    cv = np.zeros(len(products))
+    whole = [i for i, p in enumerate(products) if p.kind == "whole"]
+    if whole:
+        proj = project_policy(
+            1.0, pay_years, age=age,
+            declared_rate=[products[i].declared_rate for i in whole],
+            years=max(horizon_years, pay_years),
+        )
+        cov[whole] = proj.death_benefit_wan[:, pay_years - 1]
+        cv[whole] = proj.cash_value_wan[:, horizon_years - 1]
+    # 定期險期滿即失效：保障期間短於 horizon 時，只計入涵蓋的比例
+    term_fraction = min(pay_years / horizon_years, 1.0) if horizon_years > 0 else 1.0
+    for i, p in enumerate(products):
+        if p.kind == "term":
+            q = mortality_rate(age + np.arange(pay_years)).mean()
+            # 總保費 1 萬分 pay_years 年繳；每年保費 = 保額 × q ×（1 + 附加費用）
+            cov[i] = term_fraction / (pay_years * q * (1.0 + p.expense_load))
+    return cov, cv
+
+
+def _simplex_max(c: np.ndarray, A: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """max c·x s.t. A x <= b, x >= 0（b >= 0，原點可行）；Bland 規則避免循環。"""
+    m, n = A.shape
+    T = np.zeros((m + 1, n + m + 1))
+    T[:m, :n] = A
+    T[:m, n:n + m] = np.eye(m)
+    T[:m, -1] = b
+    T[m, :n] = -c
+    basis = list(range(n, n + m))
+    eps = 1e-12
+    for _ in range(50 * (n + m)):
+        enter = next((j for j in range(n + m) if T[m, j] < -eps), None)
+        if enter is None:
+            break
+        col = T[:m, enter]
+        ratios = np.where(col > eps, T[:m, -1] / np.where(col > eps, col, 1.0), np.inf)
+        best = ratios.min()
+        if not np.isfinite(best):
+            raise ValueError("線性規劃無界")
+        leave = min((i for i in range(m) if ratios[i] <= best + eps), key=lambda i: basis[i])
+        T[leave] /= T[leave, enter]
+        for i in range(m + 1):
+            if i != leave and T[i, enter] != 0.0:
+                T[i] -= T[i, enter] * T[leave]
+        basis[leave] = enter
+    x = np.zeros(n + m)
+    x[basis] = T[:m, -1]
+    return x[:n]
+
+
+def optimize_coverage(
+    target_wan: float,
+    budget_wan: float,
+    *,
+    age: int,
+    pay_years: int,
+    max_usd_share: float = 0.5,
+    products: Sequence[ProductArchetype] = DEFAULT_ARCHETYPES,
+    horizon_years: int = 20,
+    n_weights: int = 21,
+    n_points: int = 11,
+) -> CoverageFrontier:
+    """
+    於權重 λ ∈ [0, 1] 間求解 max (1-λ)·保障/目標 + λ·保單價值/預算，
+    限制：總保費 ≤ 預算、各商品 ≤ max_share × 預算、USD 保費 ≤ max_usd_share × 預算、
+    保障 ≤ 目標（超過目標的保障不再計分）。只納入 pay_years 在商品允許範圍內者。
+    線性規劃的 Pareto 前緣為各頂點解連成的折線，因此去除被支配點後，
+    再於相鄰頂點間依保障額度等距內插至約 n_points 點（保障由高到低）。
+    """
+    target = max(float(target_wan), 0.0)
+    budget = max(float(budget_wan), 0.0)
+    eligible = [p for p in products if p.min_pay_years <= pay_years <= p.max_pay_years]
+    frontier = CoverageFrontier(
+        target_wan=target, budget_wan=budget, max_usd_share=max_usd_share, products=eligible,
+        coverage_per_wan=np.zeros(0), cash_value_per_wan=np.zeros(0),
+    )
+    if not eligible or budget <= 0:
+        return frontier
+
+    cov, cv = product_coefficients(eligible, age=age, pay_years=pay_years, horizon_years=horizon_years)
+    frontier.coverage_per_wan, frontier.cash_value_per_wan = cov, cv
+    n = len(eligible)
+    usd = np.array([p.currency == "USD" for p in eligible], dtype=float)
+    rows = [np.ones(n), usd] + [np.eye(n)[i] for i in range(n)]
+    rhs = [budget, max_usd_share * budget] + [p.max_share * budget for p in eligible]
+    if target > 0:
+        rows.append(cov)
+        rhs.append(target)
+    A, b = np.vstack(rows), np.array(rhs, dtype=float)
+
+    cov_scale = 1.0 / target if target > 0 else 1.0 / max(cov.max() * budget, 1.0)
+    vertices: Dict[tuple, np.ndarray] = {}
+    for lam in np.linspace(0.0, 1.0, n_weights):
+        # 極小的保費懲罰：效益相同時不多花預算
+        c = (1 - lam) * cov * cov_scale + lam * cv / budget - 1e-9
+        x = _simplex_max(c, A, b)
+        x[x < 1e-9] = 0.0
+        vertices.setdefault(tuple(np.round(x, 6)), x)
+
+    # 去除被支配點（保障與保單價值皆不優於另一點），依保障由高到低排列
+    xs = list(vertices.values())
+    score = [(float(cov @ x), float(cv @ x)) for x in xs]
+    front = [
+        x for x, (a, v) in zip(xs, score)
+        if not any(a2 >= a - 1e-9 and v2 >= v - 1e-9 and (a2 > a + 1e-9 or v2 > v + 1e-9) for a2, v2 in score)
+    ]
+    front.sort(key=lambda x: -float(cov @ x))
+
+    def point(x: np.ndarray, vertex: bool) -> Allocation:
+        spent = float(x.sum())
+        coverage = float(cov @ x)
+        return Allocation(
+            premiums_wan={p.name: float(v) for p, v in zip(eligible, x)},
+            coverage_wan=coverage,
+            cash_value_wan=float(cv @ x),
+            spent_wan=spent,
+            usd_share=float(usd @ x) / spent if spent > 0 else 0.0,
+            target_ratio=coverage / target if target > 0 else 0.0,
+            vertex=vertex,
+        )
+
+    span = float(cov @ front[0] - cov @ front[-1])
+    for k, (x0, x1) in enumerate(zip(front, front[1:])):
+        frontier.points.append(point(x0, True))
+        gap = float(cov @ x0 - cov @ x1)
+        steps = max(int(round((n_points - 1) * gap / span)), 1) if span > 0 else 1
+        for t in np.linspace(0.0, 1.0, steps + 1)[1:-1]:
+            frontier.points.append(point((1 - t) * x0 + t * x1, False))
+    frontier.points.append(point(front[-1], True))
+    return frontier
+
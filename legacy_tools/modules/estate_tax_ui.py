@@ -3,10 +3,11 @@
 # 依賴：tax_constants.TaxConstants、pdf_generator.generate_pdf
 from __future__ import annotations
 
-import math
 import pandas as pd
 import streamlit as st
 
+from src.domain.tax_rules import compile_brackets
+
 from .tax_constants import TaxConstants
 from .pdf_generator import generate_pdf
 
@@ -53,16 +54,8 @@ def calculate_estate_tax(constants: TaxConstants,
 
     taxable_amount = max(0.0, total_assets - constants.EXEMPT_AMOUNT - deductions)
 
-    # 依級距逐段計算（previous_bracket 為前一段上限）
-    tax_due = 0.0
-    previous_bracket = 0.0
-    for upper, rate in constants.TAX_BRACKETS:
-        if taxable_amount > previous_bracket:
-            amount_at_rate = min(taxable_amount, upper) - previous_bracket
-            tax_due += amount_at_rate * rate
-            previous_bracket = upper
-        else:
-            break
+    # 依累計級距表計算（與 src.domain.tax_rules 共用）
+    tax_due = compile_brackets(constants.TAX_BRACKETS).tax(taxable_amount)
 
     return taxable_amount, round(tax_due, 0), deductions
 
@@ -0,0 +1,206 @@
+# legacy_tools/modules/fx.py
+"""
+匯率子系統：
+- FxProvider：匯率來源介面；FileFxProvider 讀取本地 JSON（離線可用），之後可換成線上來源
+- FxStore：本地時間序列（日期 → 匯率），CSV 追加寫入；歷史報告可依日期取回當時生效的匯率
+  （預設 <專案根目錄>/data/fx_rates.csv，可用環境變數 FX_STORE_PATH 改寫）
+- FxService：提供者＋本地序列＋有上限的記憶體 TTL 快取；來源失敗時退回本地序列，再退回 FX_USD_TWD
+- to_twd / to_twd_array：向量化換算
+"""
+from __future__ import annotations
+
+import csv
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_PAIR = "USD/TWD"
+RATES_FILE = os.path.join(os.path.dirname(__file__), "fx_rates.json")
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+STORE_PATH = Path(os.environ.get("FX_STORE_PATH") or PROJECT_ROOT / "data" / "fx_rates.csv")
+DEFAULT_TTL_SECONDS = 3600.0
+DEFAULT_CACHE_SIZE = 256   # (幣別對, 日期) 組合數上限
+
+
+@dataclass(frozen=True)
+class FxQuote:
+    """匯率報價：as_of 為該匯率的生效日，報告中應一併記錄以便重現。"""
+    pair: str
+    rate: float
+    as_of: date
+    source: str
+
+
+def _parse_date(s: str) -> date:
+    return datetime.strptime(s, "%Y-%m-%d").date()
+
+
+class FxProvider(ABC):
+    """匯率來源介面：回傳 on 當日（含）以前最近一筆匯率；無資料時回傳 None。"""
+    name = "provider"
+
+    @abstractmethod
+    def fetch(self, pair: str, on: date) -> Optional[FxQuote]:
+        ...
+
+
+class FileFxProvider(FxProvider):
+    """讀取本地 JSON 匯率檔（{"USD/TWD": [{"date": "YYYY-MM-DD", "rate": 32.0}, ...]}）。"""
+    name = "file"
+
+    def __init__(self, path: str = RATES_FILE):
+        self.path = path
+        self._series: Optional[Dict[str, Tuple[List[date], List[float]]]] = None
+
+    def _load(self) -> Dict[str, Tuple[List[date], List[float]]]:
+        if self._series is None:
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            series = {}
+            for pair, rows in raw.items():
+                points = sorted((_parse_date(r["date"]), float(r["rate"])) for r in rows)
+                series[pair] = ([d for d, _ in points], [r for _, r in points])
+            self._series = series
+        return self._series
+
+    def fetch(self, pair: str, on: date) -> Optional[FxQuote]:
+        dates, rates = self._load().get(pair, ([], []))
+        i = bisect_right(dates, on) - 1
+        if i < 0:
+            return None
+        return FxQuote(pair, rates[i], dates[i], self.name)
+
+
+class FxStore:
+    """本地匯率時間序列：CSV（date,pair,rate,source），同一日期以最後寫入者為準。"""
+
+    def __init__(self, path: Path = STORE_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._series: Optional[Dict[str, Dict[date, Tuple[float, str]]]] = None
+
+    def _load(self) -> Dict[str, Dict[date, Tuple[float, str]]]:
+        if self._series is None:
+            series: Dict[str, Dict[date, Tuple[float, str]]] = {}
+            if self.path.is_file():
+                with open(self.path, "r", encoding="utf-8", newline="") as f:
+                    for row in csv.DictReader(f):
+                        series.setdefault(row["pair"], {})[_parse_date(row["date"])] = (
+                            float(row["rate"]), row.get("source") or "store"
+                        )
+            self._series = series
+        return self._series
+
+    def get(self, pair: str, on: date) -> Optional[FxQuote]:
+        with self._lock:
+            points = self._load().get(pair, {})
+            dates = sorted(points)
+        i = bisect_right(dates, on) - 1
+        if i < 0:
+            return None
+        rate, source = points[dates[i]]
+        return FxQuote(pair, rate, dates[i], source)
+
+    def put(self, quote: FxQuote) -> None:
+        with self._lock:
+            points = self._load().setdefault(quote.pair, {})
+            if points.get(quote.as_of) == (quote.rate, quote.source):
+                return
+            points[quote.as_of] = (quote.rate, quote.source)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            new_file = not self.path.is_file()
+            with open(self.path, "a", encoding="utf-8", newline="") as f:
+                w = csv.writer(f)
+                if new_file:
+                    w.writerow(["date", "pair", "rate", "source"])
+                w.writerow([quote.as_of.isoformat(), quote.pair, quote.rate, quote.source])
+
+
+class FxService:
+    """
+    查詢順序：記憶體快取（TTL）→ 提供者 → 本地序列 → 固定匯率 FX_USD_TWD。
+    提供者取得的匯率會寫入本地序列，之後即使離線也能依日期重現。
+    """
+
+    def __init__(self, provider: Optional[FxProvider] = None, store: Optional[FxStore] = None,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS, cache_size: int = DEFAULT_CACHE_SIZE):
+        self.provider = provider or FileFxProvider()
+        self.store = store or FxStore()
+        self.ttl_seconds = float(ttl_seconds)
+        self.cache_size = int(cache_size)
+        self._cache: "OrderedDict[Tuple[str, date], Tuple[float, FxQuote]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def quote(self, pair: str = DEFAULT_PAIR, on: Optional[date] = None) -> FxQuote:
+        on = on or date.today()
+        key = (pair, on)
+        now = time.monotonic()
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit and hit[0] > now:
+                self._cache.move_to_end(key)
+                return hit[1]
+
+        q: Optional[FxQuote] = None
+        try:
+            q = self.provider.fetch(pair, on)
+        except Exception:
+            q = None
+        if q is not None:
+            try:
+                self.store.put(q)
+            except OSError:
+                pass  # 唯讀環境：不落地，仍可使用
+        else:
+            q = self.store.get(pair, on) or _fallback(pair)
+
+        with self._lock:
+            self._cache[key] = (now + self.ttl_seconds, q)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return q
+
+    def rate(self, pair: str = DEFAULT_PAIR, on: Optional[date] = None) -> float:
+        return self.quote(pair, on).rate
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+def _fallback(pair: str) -> FxQuote:
+    from .insurance_logic import FX_USD_TWD
+    if pair != DEFAULT_PAIR:
+        raise KeyError(f"查無匯率：{pair}")
+    return FxQuote(pair, FX_USD_TWD, date(1970, 1, 1), "fixed")
+
+
+_SERVICE: Optional[FxService] = None
+
+def get_fx_service() -> FxService:
+    """全程序共用的匯率服務（本地檔案提供者＋STORE_PATH）。"""
+    global _SERVICE
+    if _SERVICE is None:
+        _SERVICE = FxService()
+    return _SERVICE
+
+
+# ---------- 換算 ----------
+def to_twd(amount: float, currency: str, usd_twd: float) -> float:
+    return float(amount) * (usd_twd if currency == "USD" else 1.0)
+
+def to_twd_array(amounts, currencies, usd_twd: float) -> np.ndarray:
+    """批次換算：currencies 可為單一幣別或與 amounts 等長的陣列（"TWD" / "USD"）。"""
+    a = np.asarray(amounts, dtype=float)
+    return a * np.where(np.asarray(currencies) == "USD", float(usd_twd), 1.0)
@@ -1,24 +1,139 @@
 # legacy_tools/modules/insurance_logic.py
 from __future__ import annotations
 
-from typing import List, Dict
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-# 簡單固定匯率；之後要動態匯率再接資料源即可
+import numpy as np
+import pandas as pd
+
+from .fx import to_twd_array
+
+# 預設匯率：未傳入 fx_rate 且匯率服務無資料時使用（動態匯率見 fx.get_fx_service）
 FX_USD_TWD: float = 32.0
 
+# ---------- 規則資料 ----------
+# 預算分級門檻（等值萬 TWD），由高到低
+TIERS: Tuple[Tuple[float, str], ...] = (
+    (1000.0, "高端預算"),
+    (300.0, "進階預算"),
+    (100.0, "標準預算"),
+    (float("-inf"), "入門預算"),
+)
+
+# 策略規則：goals 任一命中即列入；description 可用 {frontload}、{pay_years}
+STRATEGY_RULES: Tuple[Dict[str, Any], ...] = (
+    {
+        "goals": ("傳承", "稅源", "企業主"),
+        "name": "終身壽險＋增額結構（預留稅源）",
+        "fit": ["傳承", "稅源", "企業主"],
+        "why": "以壽險作為稅源準備，另兼具資產傳承的確定性與效率。",
+        "description": (
+            "{frontload}建議以 {pay_years} 年繳，調整基本保額與增額比例；"
+            "保單可作為流動性工具（保單借款），亦可搭配信託或股權設計。"
+        ),
+    },
+    {
+        "goals": ("退休", "資產配置"),
+        "name": "增額型終身壽＋現金流配置",
+        "fit": ["退休", "資產配置"],
+        "why": "強化中長期現金值成長，兼顧風險管控與退休現金流。",
+        "description": (
+            "{frontload}採 {pay_years} 年期；以定率增額提高長期現金值，"
+            "到期後視利率與家庭現金流需求調整保單借款或減額繳清。"
+        ),
+    },
+    {
+        "goals": ("醫療", "長照"),
+        "name": "醫療險／長照險（保障缺口補強）",
+        "fit": ["醫療", "長照"],
+        "why": "轉嫁重大醫療與長期照護風險，避免侵蝕家族資產。",
+        "description": "優先補齊實支實付與長照給付；與壽險方案協同配置保費。",
+    },
+    {
+        "goals": ("教育",),
+        "name": "教育金專案（保值與安全性優先）",
+        "fit": ["教育"],
+        "why": "確保教育基金安全到位，降低市場波動影響。",
+        "description": "{frontload}搭配年期 {pay_years}；屆期以減額或保單借款取得資金。",
+    },
+)
+
+# 預算敏感度提示（僅文字說明，不改策略）：落在此分級時附加；fit 為分級名稱
+BUDGET_HINTS: Dict[str, Dict[str, str]] = {
+    "入門預算": {
+        "name": "入門預算提示",
+        "why": "入門預算應聚焦關鍵保障與稅源準備的最低門檻。",
+        "description": "可先以定期壽險＋醫療長照補足缺口，逐步升級到終身壽險結構。",
+    },
+}
+
+# ---------- 編譯：目標 → 位元；位元組合 → 命中的規則 ----------
+GOAL_BITS: Dict[str, int] = {}
+for _rule in STRATEGY_RULES:
+    for _g in _rule["goals"]:
+        GOAL_BITS.setdefault(_g, 1 << len(GOAL_BITS))
+_RULE_MASKS = tuple(sum(GOAL_BITS[g] for g in r["goals"]) for r in STRATEGY_RULES)
+_RULES_BY_MASK: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(i for i, m in enumerate(_RULE_MASKS) if mask & m)
+    for mask in range(1 << len(GOAL_BITS))
+)
+# (目標位元, 年期, 分級, 是否附加提示) → 已套好文字的策略；同組合第二次起直接查表
+_RENDERED: Dict[Tuple[int, int, str, bool], Tuple[Dict, ...]] = {}
+
+
+def goal_mask(goals: Iterable[str]) -> int:
+    mask = 0
+    for g in goals:
+        mask |= GOAL_BITS.get(g, 0)
+    return mask
+
 def _frontload_text(pay_years: int) -> str:
     # 依你要求：1 年期不顯示；>1 年顯示「前期視資金狀況加保；」
     return "" if pay_years == 1 else "前期視資金狀況加保；"
 
-def _tier(budget_wan: float, currency: str) -> str:
-    twd_wan = budget_wan * (FX_USD_TWD if currency == "USD" else 1.0)
-    if twd_wan >= 1000:
-        return "高端預算"
-    if twd_wan >= 300:
-        return "進階預算"
-    if twd_wan >= 100:
-        return "標準預算"
-    return "入門預算"
+def _tier(budget_wan: float, currency: str, fx_rate: Optional[float] = None) -> str:
+    rate = FX_USD_TWD if fx_rate is None else fx_rate
+    twd_wan = budget_wan * (rate if currency == "USD" else 1.0)
+    return _tier_of_twd(twd_wan)
+
+def budget_tier(budget_wan: float, currency: str, fx_rate: Optional[float] = None) -> str:
+    """預算分級（高端／進階／標準／入門），以等值萬 TWD 判斷。"""
+    return _tier(budget_wan, currency, fx_rate)
+
+def _tier_of_twd(twd_wan: float) -> str:
+    for threshold, label in TIERS:
+        if twd_wan >= threshold:
+            return label
+    return TIERS[-1][1]
+
+def _render(mask: int, pay_years: int, tier: str, hint: bool = True) -> Tuple[Dict, ...]:
+    """hint=False 時不附加預算提示（預算為 NaN：原本的 twd_wan < 100 判斷不成立）。"""
+    key = (mask, pay_years, tier, hint)
+    hit = _RENDERED.get(key)
+    if hit is not None:
+        return hit
+    frontload = _frontload_text(pay_years)
+    out = [
+        {
+            "name": STRATEGY_RULES[i]["name"],
+            "fit": list(STRATEGY_RULES[i]["fit"]),
+            "why": STRATEGY_RULES[i]["why"],
+            "description": STRATEGY_RULES[i]["description"].format(
+                frontload=frontload, pay_years=pay_years
+            ).strip(),
+        }
+        for i in _RULES_BY_MASK[mask]
+    ]
+    h = BUDGET_HINTS.get(tier) if hint else None
+    if h:
+        out.append({"name": h["name"], "fit": [tier], "why": h["why"], "description": h["description"]})
+    _RENDERED[key] = tuple(out)
+    return _RENDERED[key]
+
+def _copy(items: Tuple[Dict, ...]) -> List[Dict]:
+    # 回傳副本：呼叫端修改結果不會汙染查表內容
+    return [dict(d, fit=list(d["fit"])) for d in items]
 
 def recommend_strategies(
     age: int,
@@ -27,59 +142,50 @@ def recommend_strategies(
     currency: str,     # "TWD" / "USD"
     pay_years: int,
     goals: List[str],
+    fx_rate: Optional[float] = None,   # USD/TWD；None 用 FX_USD_TWD
 ) -> List[Dict]:
     """回傳策略清單：每個元素含 name / why / fit / description。"""
-    twd_wan = budget * (FX_USD_TWD if currency == "USD" else 1.0)
-    tier = _tier(budget, currency)
-    frontload = _frontload_text(pay_years)
+    rate = FX_USD_TWD if fx_rate is None else fx_rate
+    twd_wan = float(budget) * (rate if currency == "USD" else 1.0)
+    tier = _tier_of_twd(twd_wan)
+    return _copy(_render(goal_mask(goals), pay_years, tier, not math.isnan(twd_wan)))
+
+def _as_goals(value) -> Tuple[str, ...]:
+    if isinstance(value, str):
+        return tuple(g.strip() for g in value.replace("、", ",").split(",") if g.strip())
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ()
+    return tuple(value)
+
+def recommend_strategies_batch(profiles: pd.DataFrame, fx_rate: Optional[float] = None) -> pd.Series:
+    """
+    批次版 recommend_strategies：profiles 需含 budget / currency / pay_years / goals 欄位
+    （age、gender 可省略）；goals 可為清單或以「、」「,」分隔的字串。
+    回傳與 profiles 同索引的 Series，每列為該客戶的策略清單，與逐筆呼叫結果相同。
+    """
+    twd_wan = to_twd_array(
+        profiles["budget"].to_numpy(dtype=float),
+        profiles["currency"].to_numpy(),
+        FX_USD_TWD if fx_rate is None else fx_rate,
+    )
+    thresholds = np.array([t for t, _ in TIERS], dtype=float)
+    # TIERS 由高到低：第一個 twd_wan >= 門檻的分級；都不符合（含 NaN、負數）時與 _tier_of_twd 同為最後一級
+    hit = twd_wan[:, None] >= thresholds[None, :]
+    tier_idx = np.where(hit.any(axis=1), np.argmax(hit, axis=1), len(TIERS) - 1)
+    tier_labels = [TIERS[i][1] for i in tier_idx]
+    hints = ~np.isnan(twd_wan)
+
+    mask_cache: Dict[Tuple[str, ...], int] = {}
+    masks = []
+    for value in profiles["goals"]:
+        goals = _as_goals(value)
+        if goals not in mask_cache:
+            mask_cache[goals] = goal_mask(goals)
+        masks.append(mask_cache[goals])
 
-    L: List[Dict] = []
-
-    if "傳承" in goals or "稅源" in goals or "企業主" in goals:
-        L.append({
-            "name": "終身壽險＋增額結構（預留稅源）",
-            "fit": ["傳承", "稅源", "企業主"],
-            "why": "以壽險作為稅源準備，另兼具資產傳承的確定性與效率。",
-            "description": (
-                f"{frontload}建議以 {pay_years} 年繳，調整基本保額與增額比例；"
-                "保單可作為流動性工具（保單借款），亦可搭配信託或股權設計。"
-            ).strip()
-        })
-
-    if "退休" in goals or "資產配置" in goals:
-        L.append({
-            "name": "增額型終身壽＋現金流配置",
-            "fit": ["退休", "資產配置"],
-            "why": "強化中長期現金值成長，兼顧風險管控與退休現金流。",
-            "description": (
-                f"{frontload}採 {pay_years} 年期；以定率增額提高長期現金值，"
-                "到期後視利率與家庭現金流需求調整保單借款或減額繳清。"
-            ).strip()
-        })
-
-    if "醫療" in goals or "長照" in goals:
-        L.append({
-            "name": "醫療險／長照險（保障缺口補強）",
-            "fit": ["醫療", "長照"],
-            "why": "轉嫁重大醫療與長期照護風險，避免侵蝕家族資產。",
-            "description": "優先補齊實支實付與長照給付；與壽險方案協同配置保費。"
-        })
-
-    if "教育" in goals:
-        L.append({
-            "name": "教育金專案（保值與安全性優先）",
-            "fit": ["教育"],
-            "why": "確保教育基金安全到位，降低市場波動影響。",
-            "description": f"{frontload}搭配年期 {pay_years}；屆期以減額或保單借款取得資金。".strip()
-        })
-
-    # 預算敏感度提示（僅文字說明，不改策略）
-    if twd_wan < 100:
-        L.append({
-            "name": "入門預算提示",
-            "fit": [tier],
-            "why": "入門預算應聚焦關鍵保障與稅源準備的最低門檻。",
-            "description": "可先以定期壽險＋醫療長照補足缺口，逐步升級到終身壽險結構。"
-        })
-
-    return L
+    pay_years = profiles["pay_years"].to_numpy()
+    out = [
+        _copy(_render(m, int(p), t, bool(h)))
+        for m, p, t, h in zip(masks, pay_years, tier_labels, hints)
+    ]
+    return pd.Series(out, index=profiles.index, name="strategies")
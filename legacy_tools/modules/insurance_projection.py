@@ -0,0 +1,141 @@
+# legacy_tools/modules/insurance_projection.py
+"""
+增額型終身壽險的逐年試算（示意模型，非商品建議書）：
+- 總預算平均分攤於繳費年期；前幾年附加費用較高
+- 保單價值以宣告利率累積，扣除淨危險保額的保險成本
+- 宣告利率高於預定利率的部分用於增額繳清，逐年提高保額
+- 所有參數皆可傳入陣列，一次試算多組情境（逐年遞迴，情境間完全向量化）
+金額單位：萬元（TWD）；USD 預算依 FX_USD_TWD 折算。
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from . import insurance_logic
+
+# 各保單年度的附加費用率（之後年度沿用最後一個值）
+DEFAULT_EXPENSE_LOADS = (0.40, 0.20, 0.10, 0.05, 0.03)
+DEFAULT_PRICING_RATE = 0.0225   # 預定利率
+DEFAULT_LOAN_RATIO = 0.80       # 保單借款成數（對保單價值）
+
+
+def mortality_rate(age) -> np.ndarray:
+    """簡化 Gompertz 死亡率（約略貼近台灣壽險經驗生命表的量級）。"""
+    return np.minimum(np.exp(-10.3 + 0.095 * np.asarray(age, dtype=float)), 1.0)
+
+
+def corridor_ratio(age) -> np.ndarray:
+    """死亡給付對保單價值之最低比率：40 歲以下 190%、41–70 歲 160%、71 歲以上 140%。"""
+    age = np.asarray(age, dtype=float)
+    return np.where(age <= 40, 1.9, np.where(age <= 70, 1.6, 1.4))
+
+
+def default_face_multiple(age) -> np.ndarray:
+    """初始保額 / 總保費：年紀越輕倍數越高（1.0–2.0 倍）。"""
+    return np.clip(1.0 + 0.02 * (65 - np.asarray(age, dtype=float)), 1.0, 2.0)
+
+
+@dataclass
+class PolicyProjection:
+    """
+    逐年試算結果：各陣列形狀為 (情境數, years)，第 j 欄為第 j+1 保單年度末。
+    scenarios 為廣播後的各情境參數。
+    """
+    years: np.ndarray
+    premium_paid_wan: np.ndarray
+    cash_value_wan: np.ndarray
+    death_benefit_wan: np.ndarray
+    loan_capacity_wan: np.ndarray
+    scenarios: Dict[str, np.ndarray]
+
+    @property
+    def n_scenarios(self) -> int:
+        return self.cash_value_wan.shape[0]
+
+    def frame(self, i: int = 0) -> pd.DataFrame:
+        """單一情境的逐年表。"""
+        return pd.DataFrame({
+            "保單年度": self.years,
+            "年齡": self.scenarios["age"][i] + self.years,
+            "累計保費（萬元）": self.premium_paid_wan[i],
+            "保單價值（萬元）": self.cash_value_wan[i],
+            "身故保險金（萬元）": self.death_benefit_wan[i],
+            "可借款額度（萬元）": self.loan_capacity_wan[i],
+        })
+
+    def percentiles(self, metric: str, pcts: Sequence[float] = (10, 50, 90)) -> np.ndarray:
+        """跨情境的分位數帶，形狀為 (len(pcts), years)。"""
+        return np.percentile(getattr(self, metric), pcts, axis=0)
+
+
+def project_policy(
+    budget,
+    pay_years,
+    *,
+    currency: str = "TWD",
+    age=45,
+    declared_rate=0.025,
+    pricing_rate=DEFAULT_PRICING_RATE,
+    face_multiple=None,
+    loan_ratio=DEFAULT_LOAN_RATIO,
+    expense_loads: Sequence[float] = DEFAULT_EXPENSE_LOADS,
+    years: int = 30,
+    fx_rate: Optional[float] = None,
+) -> PolicyProjection:
+    """
+    budget（萬 <currency>）、pay_years、age、declared_rate、pricing_rate、face_multiple、loan_ratio
+    可為純量或陣列，彼此廣播成情境數 S；回傳 (S, years) 的逐年試算。
+    """
+    fx = insurance_logic.FX_USD_TWD if fx_rate is None else float(fx_rate)
+    budget_twd = np.asarray(budget, dtype=float) * (fx if currency == "USD" else 1.0)
+    if face_multiple is None:
+        face_multiple = default_face_multiple(age)
+    b = np.broadcast_arrays(
+        budget_twd, np.asarray(pay_years, dtype=int), np.asarray(age, dtype=float),
+        np.asarray(declared_rate, dtype=float), np.asarray(pricing_rate, dtype=float),
+        np.asarray(face_multiple, dtype=float), np.asarray(loan_ratio, dtype=float),
+    )
+    budget_twd, pay, age0, declared, pricing, face, loan = (np.atleast_1d(a).astype(float) for a in b)
+    pay = np.maximum(pay, 1.0)
+
+    loads = np.asarray(expense_loads, dtype=float)
+    annual = budget_twd / pay
+    face_amount = budget_twd * face
+    bonus_rate = np.maximum(declared - pricing, 0.0)
+
+    S, T = budget_twd.shape[0], int(years)
+    out = {k: np.empty((S, T)) for k in ("paid", "cv", "db")}
+    cv = np.zeros(S)
+    db = face_amount.copy()
+    paid = np.zeros(S)
+    for t in range(T):
+        premium = np.where(t < pay, annual, 0.0)
+        paid = paid + premium
+        load = loads[min(t, loads.size - 1)]
+        attained = age0 + t
+        # 保險成本：以期初淨危險保額計算
+        coi = mortality_rate(attained) * np.maximum(db - cv, 0.0)
+        cv = np.maximum((cv + premium * (1.0 - load) - coi) * (1.0 + declared), 0.0)
+        # 利差回饋增額繳清：保額依超額利率成長
+        face_amount = face_amount * (1.0 + bonus_rate)
+        db = np.maximum.reduce([face_amount, cv * corridor_ratio(attained + 1), paid])
+        out["paid"][:, t] = paid
+        out["cv"][:, t] = cv
+        out["db"][:, t] = db
+
+    return PolicyProjection(
+        years=np.arange(1, T + 1),
+        premium_paid_wan=out["paid"],
+        cash_value_wan=out["cv"],
+        death_benefit_wan=out["db"],
+        loan_capacity_wan=out["cv"] * loan[:, None],
+        scenarios={
+            "budget_twd_wan": budget_twd, "pay_years": pay.astype(int), "age": age0,
+            "declared_rate": declared, "pricing_rate": pricing,
+            "face_multiple": face, "loan_ratio": loan,
+        },
+    )
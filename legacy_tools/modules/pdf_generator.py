@@ -1,30 +1,189 @@
 # legacy_tools/modules/pdf_generator.py
 from __future__ import annotations
-import io, os, re
+import hashlib, io, json, os, re, threading, time
+from collections import OrderedDict
+from dataclasses import dataclass
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Iterable, Iterator
 from datetime import datetime
+from weakref import WeakKeyDictionary
+import numpy as np
+import reportlab
+from reportlab import rl_config
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import mm
 from reportlab.lib.utils import ImageReader
 from reportlab.pdfgen import canvas as rl_canvas
 from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfbase.ttfonts import TTEncoding, TTFNameBytes, TTFont, TTFontFace, TTFontParser
 
-# 字型：優先 NotoSansTC
+# 字型：優先 NotoSansTC；第一次產生 PDF 時才註冊（import 不解析字型檔）
 _FONT_MAIN = "NotoSansTC"
 _FONT_CANDIDATES = [
     os.path.join(os.getcwd(), "NotoSansTC-Regular.ttf"),
     os.path.join(os.path.dirname(__file__), "NotoSansTC-Regular.ttf"),
 ]
-def _register_fonts() -> str:
-    for p in _FONT_CANDIDATES:
-        if os.path.isfile(p):
-            try:
-                pdfmetrics.registerFont(TTFont(_FONT_MAIN, p))
-                return _FONT_MAIN
-            except Exception:
-                pass
-    return "Helvetica"
-_FONT_NAME = _register_fonts()
+_FONT_NAME: str | None = None
+_FONT_LOCK = threading.Lock()
+
+# 字型解析結果的磁碟快取（跨 process）：extractInfo 算出的 cmap、字寬、glyph 位置存成 npz（數值陣列＋JSON 字串，
+# 以 allow_pickle=False 讀取），檔名由 (字型路徑, 檔案大小, mtime, reportlab 版本) 雜湊而來
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+FONT_CACHE_DIR = Path(os.environ.get("PDF_FONT_CACHE_DIR") or PROJECT_ROOT / "data" / "font_cache")
+_FONT_CACHE_FORMAT = "1"
+# TTFontParser 讀檔時設定的欄位（每次重新讀檔取得，不進快取）
+_PARSER_FIELDS = frozenset({"_ttf_data", "_pos", "filename", "validate", "version", "numTables", "searchRange",
+                            "entrySelector", "rangeShift", "table", "tables", "subfontNameX"})
+_NAME_FIELDS = ("name", "familyName", "styleName", "fullName", "uniqueFontID")
+# 大型欄位存成陣列；glyphToChar（glyph → 字碼串列）存成攤平的字碼＋各 glyph 的起訖位置
+# hmetrics 前段為 (int, int)，numberOfHMetrics 之後的 glyph 沿用已換算成 1/1000 的 float 寬度，兩段分開存以保留型別
+_DICT_FIELDS = ("charToGlyph", "charWidths")
+
+def _font_cache_path(path: str) -> Path:
+    st = os.stat(path)
+    raw = f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}|{reportlab.Version}|{_FONT_CACHE_FORMAT}"
+    return FONT_CACHE_DIR / (hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32] + ".npz")
+
+def _save_face(face: TTFontFace, cache: Path) -> None:
+    meta, arrays = {}, {}
+    for k, v in vars(face).items():
+        if k in _PARSER_FIELDS or callable(v):
+            continue
+        if k == "glyphToChar":
+            arrays["glyphToChar.keys"] = np.fromiter(v.keys(), dtype=np.int64, count=len(v))
+            arrays["glyphToChar.offsets"] = np.cumsum([0, *map(len, v.values())], dtype=np.int64)
+            arrays["glyphToChar.chars"] = np.fromiter((c for cs in v.values() for c in cs), dtype=np.int64)
+        elif k in _DICT_FIELDS:
+            arrays[k + ".keys"] = np.fromiter(v.keys(), dtype=np.int64, count=len(v))
+            arrays[k + ".values"] = np.fromiter(v.values(), dtype=np.float64 if k == "charWidths" else np.int64, count=len(v))
+        elif k == "hmetrics":
+            n = next((i for i, (aw, _) in enumerate(v) if not isinstance(aw, int)), len(v))
+            arrays["hmetrics.head"] = np.asarray(v[:n], dtype=np.int64).reshape(-1, 2)
+            arrays["hmetrics.tail_aw"] = np.asarray([aw for aw, _ in v[n:]], dtype=np.float64)
+            arrays["hmetrics.tail_lsb"] = np.asarray([lsb for _, lsb in v[n:]], dtype=np.int64)
+        elif k == "glyphPos":
+            arrays[k] = np.asarray(v, dtype=np.int64)
+        else:
+            meta[k] = v.ustr if k in _NAME_FIELDS else v
+    cache.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache.with_name(f"{cache.stem}.{os.getpid()}.tmp.npz")
+    np.savez(tmp, meta=np.array(json.dumps(meta, ensure_ascii=False)), **arrays)
+    os.replace(tmp, cache)
+
+def _load_face_info(cache: Path) -> dict:
+    with np.load(cache, allow_pickle=False) as data:
+        info = json.loads(str(data["meta"]))
+        for k in _NAME_FIELDS:
+            info[k] = TTFNameBytes(info[k].encode("utf-8"))
+        info["fontRevision"] = tuple(info["fontRevision"])
+        for k in _DICT_FIELDS:
+            info[k] = dict(zip(data[k + ".keys"].tolist(), data[k + ".values"].tolist()))
+        info["hmetrics"] = [*map(tuple, data["hmetrics.head"].tolist()),
+                            *zip(data["hmetrics.tail_aw"].tolist(), data["hmetrics.tail_lsb"].tolist())]
+        info["glyphPos"] = data["glyphPos"].tolist()
+        chars, offsets = data["glyphToChar.chars"].tolist(), data["glyphToChar.offsets"].tolist()
+        info["glyphToChar"] = {g: chars[a:b] for g, a, b in
+                               zip(data["glyphToChar.keys"].tolist(), offsets, offsets[1:])}
+    return info
+
+class _CachedFace(TTFontFace):
+    """由快取的 metrics 建立字型：只讀入檔案 bytes 與表格目錄（子集化時用），不重跑 extractInfo。"""
+
+    def __init__(self, filename: str, info: dict):
+        pdfmetrics.TypeFace.__init__(self, None)
+        TTFontParser.__init__(self, filename)
+        self.__dict__.update(info)
+        scale = 1000 / self.unitsPerEm
+        self._pdfScale = (lambda x: x) if self.unitsPerEm == 1000 else (lambda x: x * scale)
+
+def _cached_ttfont(name: str, path: str, info: dict) -> TTFont:
+    """與 TTFont(name, path) 相同的物件，但 face 由快取還原。"""
+    font = TTFont.__new__(TTFont)
+    font.fontName = name
+    font.face = _CachedFace(path, info)
+    font.encoding = TTEncoding()
+    font.state = WeakKeyDictionary()
+    font._asciiReadable = rl_config.ttfAsciiReadable
+    font.shapable = not any(fnmatch(name, g) for g in rl_config.unShapedFontGlob)
+    return font
+
+def _load_ttfont(name: str, path: str) -> TTFont:
+    """有快取就由 npz 還原，否則正常解析並寫入快取；快取讀寫失敗（損壞、唯讀環境）一律退回解析。"""
+    cache = _font_cache_path(path)
+    try:
+        return _cached_ttfont(name, path, _load_face_info(cache))
+    except Exception:
+        pass
+    font = TTFont(name, path)
+    try:
+        _save_face(font.face, cache)
+    except Exception:
+        pass
+    return font
+
+def _font_name() -> str:
+    """
+    第一次呼叫時註冊字型，之後整個 process 共用。註冊在鎖內完成，且只有 registerFont 成功後
+    才設定 _FONT_NAME，並行的第一次呼叫（如下載按鈕的 data callable 在另一個 thread）不會先拿到 Helvetica。
+    """
+    global _FONT_NAME
+    if _FONT_NAME is not None:
+        return _FONT_NAME
+    with _FONT_LOCK:
+        if _FONT_NAME is None:
+            name = "Helvetica"
+            for p in _FONT_CANDIDATES:
+                if os.path.isfile(p):
+                    try:
+                        pdfmetrics.registerFont(_load_ttfont(_FONT_MAIN, p))
+                        name = _FONT_MAIN
+                        break
+                    except Exception:
+                        pass
+            _FONT_NAME = name
+    return _FONT_NAME
+
+# Logo 等圖片：解碼並縮放到輸出尺寸後的 PIL 影像，以 (路徑, mtime, 框尺寸) 為鍵於整個 process 共用
+_IMAGE_DPI = 300
+_IMAGE_CACHE: dict[tuple, tuple["PIL.Image.Image", float, float]] = {}
+_IMAGE_CACHE_MAX = 8
+
+def _image_resource(path: str, max_w: float, max_h: float) -> tuple[ImageReader, float, float] | None:
+    """
+    回傳 (ImageReader, 寬 pt, 高 pt)。快取的是已依 _IMAGE_DPI 縮到框內、模式已轉成 reportlab 可直接取用的
+    PIL 影像；每次只以它建立新的 ImageReader（每份文件一個），不再讀檔、解碼或縮放。
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    key = (os.path.abspath(path), mtime, max_w, max_h)
+    hit = _IMAGE_CACHE.get(key)
+    if hit is None:
+        try:
+            from PIL import Image
+            with Image.open(path) as im:
+                im.load()
+                iw, ih = im.size
+                scale = min(max_w/iw, max_h/ih)
+                w, h = iw*scale, ih*scale
+                px = (max(1, round(w / 72 * _IMAGE_DPI)), max(1, round(h / 72 * _IMAGE_DPI)))
+                if px[0] < iw:
+                    im = im.resize(px, Image.LANCZOS)
+                else:
+                    im = im.copy()
+            if im.mode == "P" and "transparency" in im.info:
+                im = im.convert("RGBA")
+            elif im.mode not in ("L", "LA", "RGB", "RGBA", "CMYK"):
+                im = im.convert("RGB")
+        except Exception:
+            return None
+        if len(_IMAGE_CACHE) >= _IMAGE_CACHE_MAX:
+            _IMAGE_CACHE.pop(next(iter(_IMAGE_CACHE)))
+        hit = _IMAGE_CACHE[key] = (im, w, h)
+    im, w, h = hit
+    return ImageReader(im), w, h
 
 # 去除 emoji
 _EMOJI = re.compile("[" "\U0001F300-\U0001F5FF" "\U0001F600-\U0001F64F" "\U0001F680-\U0001F6FF"
@@ -34,25 +193,107 @@ _EMOJI = re.compile("[" "\U0001F300-\U0001F5FF" "\U0001F600-\U0001F64F" "\U0001F
 def _sanitize(s: str) -> str:
     return "" if not s else _EMOJI.sub("", s)
 
-def _wrap(text: str, font: str, size: float, maxw: float) -> list[str]:
-    out = []
-    for raw in (text or "").splitlines():
-        line = raw.rstrip("\n")
+# 斷行禁則：不可置於行首（收尾標點）／不可置於行尾（開頭括號）
+_NO_LINE_START = frozenset("，。、；：！？）」』】〕》〉〗〙｝］,.;:!?)]}%…‥ー～·’”")
+_NO_LINE_END = frozenset("（「『【〔《〈〖〘｛［([{‘“$＄￥")
+# 英數詞（含網址、千分位數字）視為一個不可拆的單位；其餘逐字
+_TOKEN = re.compile(r"[A-Za-z0-9]+(?:[.,:/@_\-%&+#=?][A-Za-z0-9]+)*|[ \t]+|.")
+
+# 禁則回退的單位數上限（整段都是標點時不無限回退）
+_MAX_CARRY = 4
+
+# 各字型 1pt 下的字寬表（逐字查一次後快取）
+_GLYPH_WIDTHS: dict[str, dict[str, float]] = {}
+
+def _text_width(s: str, widths: dict[str, float], font: str) -> float:
+    w = 0.0
+    for ch in s:
+        cw = widths.get(ch)
+        if cw is None:
+            cw = widths[ch] = pdfmetrics.stringWidth(ch, font, 1.0)
+        w += cw
+    return w
+
+def _wrap_line(line: str, widths: dict[str, float], font: str, size: float, maxw: float) -> Iterator[str]:
+    """單行貪婪斷行：每個單位只量一次寬度，換行時最多回退 _MAX_CARRY 個單位，整體為線性時間。"""
+    limit = maxw / size
+    cur: list[str] = []
+    cur_w: list[float] = []
+    total = 0.0
+    wrapped = False
+    for m in _TOKEN.finditer(line):
+        tok = m.group()
+        w = _text_width(tok, widths, font)
+        # 超過整行寬的英數詞改逐字斷開
+        pieces = [(tok, w)] if w <= limit or len(tok) == 1 else [(ch, widths[ch]) for ch in tok]
+        for piece, pw in pieces:
+            space = piece[0] in " \t"
+            if space and wrapped and not cur:
+                continue  # 折行後的行首空白不保留
+            if total + pw <= limit or not cur or space:
+                cur.append(piece); cur_w.append(pw); total += pw
+                continue
+            while cur and cur[-1][0] in " \t":
+                total -= cur_w.pop(); cur.pop()
+            carry: list[str] = []
+            carry_w: list[float] = []
+            # 行首禁則：下一行開頭若為收尾標點，連同前面的單位一起帶過去（連續標點逐一回退）
+            while len(cur) > 1 and len(carry) < _MAX_CARRY and (carry[0] if carry else piece)[0] in _NO_LINE_START:
+                carry.insert(0, cur.pop()); carry_w.insert(0, cur_w.pop())
+            # 行尾禁則：開頭括號移到下一行
+            while len(cur) > 1 and len(carry) < _MAX_CARRY and cur[-1][-1] in _NO_LINE_END:
+                carry.insert(0, cur.pop()); carry_w.insert(0, cur_w.pop())
+            yield "".join(cur)
+            cur = carry + [piece]
+            cur_w = carry_w + [pw]
+            total = sum(cur_w)
+            wrapped = True
+    yield "".join(cur)
+
+_NEWLINE = re.compile(r"\r\n|\r|\n")
+
+def _source_lines(content: str | Iterable[str]) -> Iterator[str]:
+    """
+    逐行讀出內容；content 可為字串或逐段產生的字串（如逐案附加的案例集）。
+    段落不一定以換行結尾：未完的尾段留待與下一段接起來。
+    """
+    chunks = [content] if isinstance(content, str) else content
+    tail = ""
+    for chunk in chunks:
+        if not chunk:
+            continue
+        buf = tail + chunk
+        # 結尾的 \r 可能是被切開的 \r\n，先不斷行
+        held = "\r" if buf.endswith("\r") else ""
+        lines = _NEWLINE.split(buf[:-1] if held else buf)
+        tail = lines.pop() + held
+        yield from lines
+    if tail:
+        lines = _NEWLINE.split(tail)
+        if not lines[-1]:
+            lines.pop()
+        yield from lines
+
+def _iter_wrap(lines: Iterable[str], font: str, size: float, maxw: float) -> Iterator[str]:
+    widths = _GLYPH_WIDTHS.setdefault(font, {})
+    for line in lines:
         if not line:
-            out.append(""); continue
-        buf = ""
-        for ch in line:
-            t = buf + ch
-            if pdfmetrics.stringWidth(t, font, size) <= maxw:
-                buf = t
-            else:
-                if buf: out.append(buf)
-                buf = ch
-        if buf or line == "":
-            out.append(buf)
-    return out
-
-def generate_pdf(content: str, title: str = "報告", logo_path: str | None = None, footer_text: str = "") -> io.BytesIO:
+            yield ""; continue
+        yield from _wrap_line(line, widths, font, size, maxw)
+
+def _wrap(text: str, font: str, size: float, maxw: float) -> list[str]:
+    return list(_iter_wrap((text or "").splitlines(), font, size, maxw))
+
+def generate_pdf(
+    content: str | Iterable[str],
+    title: str = "報告",
+    logo_path: str | None = None,
+    footer_text: str = "",
+) -> io.BytesIO:
+    """
+    逐頁串流排版：斷行結果邊產生邊繪製，不先展開全部行。
+    每頁重複頁首（logo、單位、日期）與頁尾，並標示「第 n / N 頁」；標題只在第一頁。
+    """
     # 自動帶入根目錄 logo.png
     if not logo_path:
         default_logo = os.path.join(os.getcwd(), "logo.png")
@@ -64,48 +305,178 @@ def generate_pdf(content: str, title: str = "報告", logo_path: str | None = No
     LOGO_MAX_W, LOGO_MAX_H = 36*mm, 18*mm
     META_FONT_SIZE, TITLE_SIZE = 9, 18
     TITLE_GAP, BODY_GAP = 5*mm, 6*mm
-    BODY_FONT, BODY_SIZE, BODY_LINE = _FONT_NAME, 12, 16
+    BODY_FONT, BODY_SIZE, BODY_LINE = _font_name(), 12, 16
 
     buf = io.BytesIO()
     c = rl_canvas.Canvas(buf, pagesize=A4)
 
     header_top = PAGE_H - M_T
     header_bottom = header_top - LOGO_MAX_H
+    right_x = PAGE_W - M_R
+    meta = (_sanitize("本報告所有金額單位：萬元（TWD）"),
+            _sanitize(f"生成日期：{datetime.now().strftime('%Y-%m-%d')}"))
+    footer = _sanitize(footer_text) if footer_text else ""
 
-    # 左：Logo
-    if logo_path and os.path.isfile(logo_path):
-        try:
-            img = ImageReader(logo_path)
-            iw, ih = img.getSize()
-            scale = min(LOGO_MAX_W/iw, LOGO_MAX_H/ih)
-            c.drawImage(img, M_L, header_top - ih*scale, width=iw*scale, height=ih*scale, mask="auto")
-        except Exception:
-            pass
+    logo = _image_resource(logo_path, LOGO_MAX_W, LOGO_MAX_H) if logo_path else None
 
-    # 右：單位＋日期
-    c.setFont(BODY_FONT, META_FONT_SIZE)
-    right_x = PAGE_W - M_R
-    c.drawRightString(right_x, header_top - 0, _sanitize("本報告所有金額單位：萬元（TWD）"))
-    c.drawRightString(right_x, header_top - 12, _sanitize(f"生成日期：{datetime.now().strftime('%Y-%m-%d')}"))
+    def start_page() -> None:
+        # 左：Logo（各頁共用同一個 form）；右：單位＋日期
+        if logo:
+            c.saveState()
+            c.translate(M_L, header_top - logo[2])
+            c.doForm("logo")
+            c.restoreState()
+        c.setFont(BODY_FONT, META_FONT_SIZE)
+        c.drawRightString(right_x, header_top - 0, meta[0])
+        c.drawRightString(right_x, header_top - 12, meta[1])
+
+    def end_page(page_no: int) -> None:
+        # 頁尾＋頁碼（總頁數於文件結束時填入共用的 form）
+        if footer:
+            c.setFont(BODY_FONT, 10)
+            c.drawCentredString(PAGE_W/2, M_B - 6, footer)
+        c.setFont(BODY_FONT, META_FONT_SIZE)
+        label = f"第 {page_no} / "
+        x = right_x - pdfmetrics.stringWidth("000 頁", BODY_FONT, META_FONT_SIZE)
+        c.drawRightString(x, M_B - 18, label)
+        c.saveState()
+        c.translate(x, M_B - 18)
+        c.doForm("page_total")
+        c.restoreState()
+        c.showPage()
 
-    # 置中標題
-    c.setFont(_FONT_NAME, TITLE_SIZE)
+    # 第一頁：置中標題
+    page_no = 1
+    start_page()
+    c.setFont(BODY_FONT, TITLE_SIZE)
     title_y = header_bottom - TITLE_GAP
     c.drawCentredString(PAGE_W/2, title_y, _sanitize(title or "報告"))
+    y = title_y - BODY_GAP
+    body_top = header_bottom - TITLE_GAP
 
-    # 正文
-    body_start_y = title_y - BODY_GAP
+    # 正文：逐行斷行、逐行繪製，頁滿即換頁
+    lines = _iter_wrap((_sanitize(l) for l in _source_lines(content)), BODY_FONT, BODY_SIZE, PAGE_W - M_L - M_R)
     c.setFont(BODY_FONT, BODY_SIZE)
-    lines = _wrap(_sanitize(content or ""), BODY_FONT, BODY_SIZE, PAGE_W - M_L - M_R)
-    y = body_start_y
     for line in lines:
-        if y <= M_B + BODY_LINE: break
+        if y <= M_B + BODY_LINE:
+            end_page(page_no)
+            page_no += 1
+            start_page()
+            y = body_top
+            c.setFont(BODY_FONT, BODY_SIZE)
         c.drawString(M_L, y, line); y -= BODY_LINE
+    end_page(page_no)
 
-    # 頁尾
-    if footer_text:
-        c.setFont(BODY_FONT, 10)
-        c.drawCentredString(PAGE_W/2, M_B - 6, _sanitize(footer_text))
-
-    c.showPage(); c.save(); buf.seek(0)
+    if logo:
+        img, w, h = logo
+        c.beginForm("logo")
+        try:
+            c.drawImage(img, 0, 0, width=w, height=h, mask="auto")
+        except Exception:
+            pass
+        c.endForm()
+    c.beginForm("page_total")
+    c.setFont(BODY_FONT, META_FONT_SIZE)
+    c.drawString(0, 0, f"{page_no} 頁")
+    c.endForm()
+    c.save(); buf.seek(0)
     return buf
+
+
+# ---------- 產出快取：同樣的摘要每個 process 只排版一次 ----------
+# 版面（頁首、頁尾、字級等）調整時遞增，舊快取即失效
+PDF_TEMPLATE_VERSION = "1"
+_PDF_CACHE_MAX = 64
+
+@dataclass
+class PdfCacheStats:
+    hits: int = 0
+    misses: int = 0
+    render_s: float = 0.0     # 累計排版時間（只計 miss）
+    last_render_s: float = 0.0
+    size: int = 0
+    max_size: int = _PDF_CACHE_MAX
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @property
+    def avg_render_s(self) -> float:
+        return self.render_s / self.misses if self.misses else 0.0
+
+_PDF_CACHE: "OrderedDict[str, bytes]" = OrderedDict()
+_PDF_STATS = PdfCacheStats()
+_PDF_LOCK = threading.Lock()
+
+def _pdf_hasher(title: str, logo_path: str | None, footer_text: str) -> "hashlib._Hash":
+    """內容以外的部分先寫入雜湊；內容最後逐段 update（逐段與整段字串的雜湊相同）。"""
+    logo = logo_path or os.path.join(os.getcwd(), "logo.png")
+    try:
+        logo_sig = f"{os.path.abspath(logo)}:{os.stat(logo).st_mtime_ns}"
+    except OSError:
+        logo_sig = ""
+    h = hashlib.sha256()
+    # 生成日期印在頁首，跨日即視為不同內容
+    for s in (PDF_TEMPLATE_VERSION, datetime.now().strftime("%Y-%m-%d"), title, logo_sig, footer_text):
+        h.update(s.encode("utf-8"))
+        h.update(b"\0")
+    return h
+
+def _hashing(chunks: Iterable[str], h: "hashlib._Hash") -> Iterator[str]:
+    """邊交出段落邊寫入雜湊，不保留讀過的內容。"""
+    for chunk in chunks:
+        if chunk:
+            h.update(chunk.encode("utf-8"))
+            yield chunk
+
+def _cache_get(key: str) -> bytes | None:
+    with _PDF_LOCK:
+        data = _PDF_CACHE.get(key)
+        if data is not None:
+            _PDF_CACHE.move_to_end(key)
+            _PDF_STATS.hits += 1
+        return data
+
+def _cache_put(key: str, data: bytes, elapsed: float) -> None:
+    with _PDF_LOCK:
+        _PDF_STATS.misses += 1
+        _PDF_STATS.render_s += elapsed
+        _PDF_STATS.last_render_s = elapsed
+        _PDF_CACHE[key] = data
+        _PDF_CACHE.move_to_end(key)
+        while len(_PDF_CACHE) > _PDF_CACHE_MAX:
+            _PDF_CACHE.popitem(last=False)
+        _PDF_STATS.size = len(_PDF_CACHE)
+
+def render_pdf(content: str | Iterable[str], title: str = "報告", logo_path: str | None = None,
+               footer_text: str = "") -> bytes:
+    """
+    generate_pdf 的快取版本，回傳 PDF bytes；以 (標題, 內容, logo, 頁尾, 版型版本) 的雜湊為鍵，LRU 上限 _PDF_CACHE_MAX 份。
+    字串與可重複走訪的序列先雜湊再查快取；一次性的 iterator 無法事先算鍵，改為邊排版邊雜湊、排完才寫入快取
+    （同樣內容仍會排版，但不必保留整份內容）。
+    """
+    content = content if content is not None else ""
+    h = _pdf_hasher(title or "", logo_path, footer_text or "")
+    one_shot = not isinstance(content, str) and iter(content) is content
+    if not one_shot:
+        for chunk in [content] if isinstance(content, str) else content:
+            h.update(chunk.encode("utf-8"))
+        data = _cache_get(h.hexdigest())
+        if data is not None:
+            return data
+    t0 = time.perf_counter()
+    body = _hashing(content, h) if one_shot else content
+    data = generate_pdf(body, title=title, logo_path=logo_path, footer_text=footer_text).getvalue()
+    _cache_put(h.hexdigest(), data, time.perf_counter() - t0)
+    return data
+
+def pdf_cache_stats() -> PdfCacheStats:
+    with _PDF_LOCK:
+        return PdfCacheStats(**vars(_PDF_STATS))
+
+def clear_pdf_cache() -> None:
+    with _PDF_LOCK:
+        _PDF_CACHE.clear()
+        _PDF_STATS.__init__()
@@ -3,9 +3,12 @@
 遺產稅計算模組
 - 採用相對匯入（.tax_constants）
 - 提供相容別名 EstateTaxCalculator，讓舊頁面可直接使用
+- 級距計算委派至 src.domain.tax_rules.compile_brackets（全站共用同一張級距表）
 """
 
-from .tax_constants import TaxConstants
+from src.domain.tax_rules import compile_brackets
+
+from .tax_constants import DEFAULT_TAX_BRACKETS
 
 
 class TaxCalculator:
@@ -28,16 +31,8 @@ class TaxCalculator:
         if taxable_amount <= 0:
             return 0.0
 
-        # 依稅率級距逐段計算
-        tax_due = 0.0
-        for lower, upper, rate in TaxConstants.INHERITANCE_TAX_BRACKETS:
-            if taxable_amount > lower:
-                amount_in_bracket = min(taxable_amount, upper) - lower
-                if amount_in_bracket > 0:
-                    tax_due += amount_in_bracket * rate
-            else:
-                break
-
+        # 累計級距表：二分搜尋 + 一次乘加
+        tax_due = compile_brackets(DEFAULT_TAX_BRACKETS).tax(taxable_amount)
         return round(tax_due, 2)
 
 
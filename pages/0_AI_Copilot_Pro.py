@@ -3,13 +3,15 @@
 from __future__ import annotations
 
 import os
-import glob
-import re
 from datetime import datetime
-from typing import List, Tuple
+from functools import partial
+from typing import List
 
 import streamlit as st
-from legacy_tools.modules.pdf_generator import generate_pdf
+from legacy_tools.modules.pdf_generator import render_pdf
+from src.services.knowledge import (
+    read_text, scrub_sensitive, hard_truncate, load_cards_from, retrieve,
+)
 
 # ==============================
 # 基本設定
@@ -23,52 +25,6 @@ st.set_page_config(
 # —— 免費模式防外洩上限（雙重保護） ——
 FREE_MAX_SNIPPETS = 2          # 最多擷取 2 段
 FREE_MAX_CHARS_PER_SNIP = 300  # 每段最多 300 字
-SENSITIVE_PATTERNS = [
-    r"【內部】.*?【/內部】",
-    r"\[\[PRIVATE\]\].*?\[\[/PRIVATE\]\]",
-    r"\{\{SENSITIVE\}\}.*?\{\{/SENSITIVE\}\}",
-]
-
-# ==============================
-# 工具：文字處理與檔案
-# ==============================
-def read_text(path: str) -> str:
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            return f.read()
-    except Exception:
-        return ""
-
-def scrub_sensitive(text: str) -> str:
-    t = text
-    for pat in SENSITIVE_PATTERNS:
-        t = re.sub(pat, "", t, flags=re.DOTALL)
-    return t
-
-def hard_truncate(text: str, limit: int) -> str:
-    if len(text) <= limit:
-        return text
-    return text[:limit] + "……"
-
-def keywordize(s: str) -> List[str]:
-    s = re.sub(r"[^\u4e00-\u9fffA-Za-z0-9]+", " ", s)
-    return [w for w in s.lower().split() if w]
-
-def score_overlap(query: str, doc: str) -> int:
-    qset = set(keywordize(query))
-    dset = set(keywordize(doc))
-    return len(qset & dset)
-
-def load_cards_from(folder: str) -> List[Tuple[str, str]]:
-    cards: List[Tuple[str, str]] = []
-    for p in sorted(glob.glob(os.path.join(folder, "*.md"))):
-        cards.append((os.path.basename(p), read_text(p)))
-    return cards
-
-def retrieve(query: str, docs: List[Tuple[str, str]], k: int = 3) -> List[Tuple[str, str]]:
-    scored = [(fn, tx, score_overlap(query, tx)) for fn, tx in docs]
-    scored.sort(key=lambda x: x[2], reverse=True)
-    return [(fn, tx) for fn, tx, _ in scored[:k] if _ > 0]
 
 # ==============================
 # 模板（prompts）
@@ -352,20 +308,20 @@ with col_out:
             disabled=not result.strip()
         )
     with d2:
-        if st.button("下載 PDF", use_container_width=True, disabled=not result.strip()):
-            pdf_bytes = generate_pdf(
+        st.download_button(
+            "下載 PDF",
+            # 按下才產生 PDF；自動抓根目錄 logo.png，相同內容由快取回傳
+            data=partial(
+                render_pdf,
                 content=result,
                 title=f"{purpose}",
-                logo_path=None,  # 自動抓根目錄 logo.png（已於 pdf_generator.py 實作）
                 footer_text="永傳家族辦公室｜www.gracefo.com｜123@gracefo.com",
-            ).getvalue()
-            st.download_button(
-                "點此下載 PDF",
-                data=pdf_bytes,
-                file_name=f"AI_Copilot_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
-                mime="application/pdf",
-                use_container_width=True
-            )
+            ),
+            file_name=f"AI_Copilot_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
+            mime="application/pdf",
+            use_container_width=True,
+            disabled=not result.strip()
+        )
 
 st.markdown("---")
 # 導覽（僅資產地圖保留「家族」二字）
@@ -6,7 +6,9 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
-from legacy_tools.modules.pdf_generator import generate_pdf
+from legacy_tools.modules.pdf_generator import render_pdf
+from src.domain.tax_loader import load_tax_constants
+from src.domain.liquidity import LiquidityEngine
 
 # ---------- 小工具 ----------
 def fmt_wan(n: float) -> str:
@@ -18,6 +20,8 @@ def fmt_wan(n: float) -> str:
 def df_to_csv_bytes(df: pd.DataFrame) -> bytes:
     return df.to_csv(index=False).encode("utf-8-sig")
 
+MAX_CHILDREN, MAX_PARENTS, MAX_OTHER = 10, 2, 5
+
 # ---------- 介面設定 ----------
 st.set_page_config(page_title="家族資產地圖", layout="wide")
 
@@ -25,6 +29,15 @@ st.markdown("## 🗺️ 家族資產地圖")
 st.caption("把專業變成家人的安心：**3 分鐘看懂家族資產版圖**，協助您規劃現金流與傳承節奏。")
 st.caption("所有金額單位：**萬元（TWD）**。請以「萬元」輸入（例：500 代表 NT$5,000,000）。")
 
+# 引擎存於 session：再次送出時只重算有變動的資產項目；淨遺產與家庭未變時不重算稅額
+C = load_tax_constants()
+engine = st.session_state.get("liquidity_engine")
+if engine is None or engine.constants is not C:
+    engine = LiquidityEngine(C)
+    st.session_state["liquidity_engine"] = engine
+# 家庭成員預設帶入上次送出的設定（首次為無配偶、0 位子女）
+family = engine.family
+
 with st.form("asset_form"):
     c1, c2 = st.columns(2)
 
@@ -47,6 +60,25 @@ with st.form("asset_form"):
         tax_reserve = st.number_input("稅務準備（未繳之預估稅金）", min_value=0.0, value=0.0, step=10.0)
         other_liab = st.number_input("其他負債", min_value=0.0, value=0.0, step=10.0)
 
+    with st.expander("家庭成員（用於估算遺產稅與稅源缺口）", expanded=False):
+        f1, f2, f3 = st.columns(3)
+        with f1:
+            has_spouse = st.checkbox("有配偶", value=family["has_spouse"])
+            adult_children = st.number_input("直系血親卑親屬數", min_value=0, max_value=MAX_CHILDREN,
+                                             value=family["adult_children"])
+        with f2:
+            parents = st.number_input(f"父母數（最多 {MAX_PARENTS} 人）", min_value=0, max_value=MAX_PARENTS,
+                                      value=family["parents"])
+            # 表單送出前拿不到其他欄位，先以最大家庭設上限；送出後由引擎依實際人數檢查
+            disabled_people = st.number_input(
+                "重度以上身心障礙者數（不超過配偶、子女與父母合計）", min_value=0,
+                max_value=LiquidityEngine.max_disabled_people(True, MAX_CHILDREN, MAX_PARENTS),
+                value=family["disabled_people"],
+            )
+        with f3:
+            other_dependents = st.number_input("受撫養之兄弟姊妹、祖父母數", min_value=0, max_value=MAX_OTHER,
+                                               value=family["other_dependents"])
+
     submitted = st.form_submit_button("產生資產地圖")
 
 if not submitted:
@@ -89,6 +121,45 @@ m1.metric("總資產（萬元）", fmt_wan(total_assets))
 m2.metric("總負債（萬元）", fmt_wan(total_liab))
 m3.metric("家族淨值（萬元）", fmt_wan(net_worth))
 
+# ---------- 稅源缺口 ----------
+try:
+    engine.set_family(
+        has_spouse=has_spouse, adult_children=adult_children, parents=parents,
+        disabled_people=disabled_people, other_dependents=other_dependents,
+    )
+except ValueError as e:
+    st.error(str(e))
+    st.stop()
+engine.update(asset_items)
+engine.set_liabilities(total_liab)
+gap = engine.result()
+
+st.markdown("### 稅源缺口（萬元）")
+g1, g2, g3, g4 = st.columns(4)
+g1.metric("預估遺產稅", fmt_wan(gap.tax_wan))
+g2.metric("建議預留稅源", fmt_wan(gap.required_wan))
+g3.metric(f"{engine.deadline_days} 天內可動用", fmt_wan(gap.available_wan))
+g4.metric("稅源缺口", fmt_wan(gap.gap_wan))
+if gap.gap_wan > 0:
+    st.warning(f"申報期限內可變現資金不足，尚缺約 {fmt_wan(gap.gap_wan)}；可考慮以保單或預留現金補足。")
+elif gap.required_wan > 0:
+    st.success("期限內可變現資金足以支應建議預留稅源。")
+with st.expander("各類資產變現假設", expanded=False):
+    st.dataframe(
+        pd.DataFrame([
+            {
+                "項目": r["name"],
+                "金額（萬元）": r["value_wan"],
+                "急售折價": f"{r['haircut']:.0%}",
+                "變現天數": r["days_to_cash"],
+                "期限內可動用（萬元）": r["available_wan"],
+            }
+            for r in gap.by_class
+        ]),
+        use_container_width=True,
+    )
+    st.caption(f"稅則版本：{gap.rules_version}；不動產、企業股權等變現天數超過申報期限者不計入可動用資金。")
+
 st.markdown("---")
 
 # ---------- 配置圖與表 ----------
@@ -143,6 +214,9 @@ def build_pdf_bytes() -> bytes:
         f"總資產（萬元）：{total_assets:,.0f}",
         f"總負債（萬元）：{total_liab:,.0f}",
         f"家族淨值（萬元）：{net_worth:,.0f}",
+        f"預估遺產稅（萬元）：{gap.tax_wan:,.0f}",
+        f"期限內可動用資金（萬元）：{gap.available_wan:,.0f}",
+        f"稅源缺口（萬元）：{gap.gap_wan:,.0f}",
         "",
         "— 資產明細（萬元） —",
     ]
@@ -152,19 +226,18 @@ def build_pdf_bytes() -> bytes:
     for _, r in df_liab.iterrows():
         lines.append(f"{r['項目']}: {r['金額（萬元）']:,.0f}")
 
-    pdf_buf = generate_pdf(
+    return render_pdf(
         content="\n".join(lines),
         title="家族資產地圖",
         logo_path="logo.png",
         footer_text="永傳家族辦公室｜www.gracefo.com｜123@gracefo.com",
     )
-    return pdf_buf.getvalue()
 
 cA, cB = st.columns([1, 1])
 with cA:
     st.download_button(
         "下載 PDF 摘要（萬元）",
-        data=build_pdf_bytes(),
+        data=build_pdf_bytes,  # 按下才產生（相同內容由快取回傳）
         file_name="家族資產地圖_摘要_萬元.pdf",
         mime="application/pdf",
         use_container_width=True,
@@ -4,67 +4,123 @@ from __future__ import annotations
 
 import streamlit as st
 import pandas as pd
-from typing import Tuple, List
-from dataclasses import dataclass, field
+import plotly.graph_objects as go
 
-from legacy_tools.modules.pdf_generator import generate_pdf
+from legacy_tools.modules.pdf_generator import render_pdf
+from src.domain.tax_loader import load_tax_constants
+from src.domain.tax_memo import memo_diagnose_yuan
+from src.domain.tax_rules import SpouseProperty, TaxConstants
+from src.domain.tax_rules import EstateTaxCalculator as DomainEstateTaxCalculator
+from src.domain.tax_surface import TaxSurface, build_tax_surface, profile_grid
+from src.domain.spousal_plan import optimize_two_deaths
 
 # ===============================
-# 常數（單位：萬元）
+# 常數（單位：萬元；依生效日取 tax_config.json 的版本）
 # ===============================
-@dataclass
-class TaxConstants:
-    EXEMPT_AMOUNT: float = 1333   # 免稅額
-    FUNERAL_EXPENSE: float = 138  # 喪葬費
-    SPOUSE_DEDUCTION_VALUE: float = 553
-    ADULT_CHILD_DEDUCTION: float = 56
-    PARENTS_DEDUCTION: float = 138
-    DISABLED_DEDUCTION: float = 693
-    OTHER_DEPENDENTS_DEDUCTION: float = 56
-    TAX_BRACKETS: List[tuple] = field(default_factory=lambda: [
-        (5621, 0.10), (11242, 0.15), (float('inf'), 0.20)
-    ])
+ASSET_MIN, ASSET_MAX, ASSET_STEP = 1000, 100000, 100
+MAX_CHILDREN, MAX_PARENTS, MAX_OTHER = 10, 2, 5
 
 # ===============================
-# 計算邏輯（單位：萬元）
+# 敏感度曲面（每個稅則版本只算一次，跨 session 共用）
 # ===============================
-class EstateTaxCalculator:
-    def __init__(self, constants: TaxConstants):
-        self.constants = constants
-
-    def compute_deductions(
-        self, spouse: bool, adult_children: int, other_dependents: int,
-        disabled_people: int, parents: int
-    ) -> float:
-        spouse_deduction = self.constants.SPOUSE_DEDUCTION_VALUE if spouse else 0
-        return (
-            spouse_deduction +
-            self.constants.FUNERAL_EXPENSE +
-            disabled_people * self.constants.DISABLED_DEDUCTION +
-            adult_children * self.constants.ADULT_CHILD_DEDUCTION +
-            other_dependents * self.constants.OTHER_DEPENDENTS_DEDUCTION +
-            parents * self.constants.PARENTS_DEDUCTION
-        )
+@st.cache_resource(show_spinner=False)
+def _tax_surface(rules_version: str) -> TaxSurface:
+    return build_tax_surface(
+        load_tax_constants(version=rules_version),
+        range(ASSET_MIN, ASSET_MAX + 1, ASSET_STEP),
+        profile_grid(max_children=MAX_CHILDREN, max_parents=MAX_PARENTS, max_other=MAX_OTHER),
+    )
 
-    @st.cache_data
-    def calculate_estate_tax(
-        _self, total_assets: float, spouse: bool, adult_children: int,
-        other_dependents: int, disabled_people: int, parents: int
-    ) -> Tuple[float, float, float]:
-        deductions = _self.compute_deductions(
-            spouse, adult_children, other_dependents, disabled_people, parents
-        )
-        if total_assets < _self.constants.EXEMPT_AMOUNT + deductions:
-            return 0, 0, deductions
-        taxable_amount = max(0, total_assets - _self.constants.EXEMPT_AMOUNT - deductions)
-        tax_due = 0.0
-        prev = 0.0
-        for bracket, rate in _self.constants.TAX_BRACKETS:
-            if taxable_amount > prev:
-                taxed = min(taxable_amount, bracket) - prev
-                tax_due += taxed * rate
-                prev = bracket
-        return taxable_amount, round(tax_due, 0), deductions
+# ===============================
+# 敏感度圖表
+# ===============================
+def _render_sensitivity(surface: TaxSurface, profile: tuple, total_assets: float) -> None:
+    curve = surface.curve(profile)
+    assets = curve["asset_levels_wan"]
+
+    fig_rate = go.Figure()
+    fig_rate.add_trace(go.Scatter(x=assets, y=curve["effective_rate"] * 100, name="有效稅率（%）"))
+    fig_rate.add_trace(go.Scatter(x=assets, y=curve["marginal_rate"] * 100, name="邊際稅率（%）", line_shape="hv"))
+    fig_rate.add_vline(x=total_assets, line_dash="dot")
+    fig_rate.update_layout(
+        title="目前家庭組合：有效稅率與邊際稅率", height=360,
+        xaxis_title="總資產（萬元）", yaxis_title="稅率（%）", margin=dict(t=60, b=20, l=20, r=20),
+    )
+    st.plotly_chart(fig_rate, use_container_width=True)
+
+    # 熱圖：固定其他條件，變動子女數
+    spouse, _, parents, disabled, other = profile
+    children_axis = [
+        c for c in range(MAX_CHILDREN + 1)
+        if (spouse, c, parents, disabled, other) in surface.profile_column
+    ]
+    cols = [surface.column((spouse, c, parents, disabled, other)) for c in children_axis]
+    fig_heat = go.Figure(go.Heatmap(
+        x=assets, y=children_axis, z=surface.tax_wan[:, cols].T,
+        colorbar=dict(title="稅額（萬）"),
+        hovertemplate="總資產 %{x:,.0f} 萬<br>子女 %{y} 人<br>稅額 %{z:,.0f} 萬<extra></extra>",
+    ))
+    fig_heat.update_layout(
+        title="稅額熱圖（資產 × 直系血親卑親屬數）", height=360,
+        xaxis_title="總資產（萬元）", yaxis_title="人數", margin=dict(t=60, b=20, l=20, r=20),
+    )
+    st.plotly_chart(fig_heat, use_container_width=True)
+
+def _render_inverse(C: TaxConstants, profile: tuple) -> None:
+    spouse, children, parents, disabled, other = profile
+    family = dict(
+        has_spouse=spouse, adult_children=children, parents=parents,
+        disabled_people=disabled, other_dependents=other,
+    )
+    solver = DomainEstateTaxCalculator(C)
+    target_wan = st.number_input("目標稅額（萬元）", min_value=0, value=1000, step=100)
+    need_wan = solver.required_net_estate_yuan(target_wan * C.UNIT_FACTOR, **family) / C.UNIT_FACTOR
+    st.markdown(f"- 總資產超過 **{need_wan:,.0f} 萬元**，預估遺產稅將超過 {target_wan:,.0f} 萬元")
+    for rate in sorted({r for _, r in C.TAX_BRACKETS})[1:]:
+        edge_wan = solver.bracket_entry_net_estate_yuan(rate, **family) / C.UNIT_FACTOR
+        st.markdown(f"- 總資產在 **{edge_wan:,.0f} 萬元** 以內，邊際稅率不會進入 {rate:.0%} 級距")
+
+def _render_spousal(C: TaxConstants, profile: tuple, total_assets_wan: float) -> None:
+    _, children, parents, disabled, other = profile
+    c1, c2 = st.columns(2)
+    with c1:
+        st.markdown("**本人（先身故）**")
+        m1 = st.number_input("婚後財產（萬元）", min_value=0, value=int(total_assets_wan * 0.8), step=100, key="sp_m1")
+        s1 = st.number_input("婚前及繼承、受贈財產（萬元）", min_value=0, value=int(total_assets_wan * 0.2), step=100, key="sp_s1")
+        d1 = st.number_input("婚後負債（萬元）", min_value=0, value=0, step=100, key="sp_d1")
+    with c2:
+        st.markdown("**配偶（後身故）**")
+        m2 = st.number_input("婚後財產（萬元）", min_value=0, value=1000, step=100, key="sp_m2")
+        s2 = st.number_input("婚前及繼承、受贈財產（萬元）", min_value=0, value=0, step=100, key="sp_s2")
+        d2 = st.number_input("婚後負債（萬元）", min_value=0, value=0, step=100, key="sp_d2")
+    c3, c4 = st.columns(2)
+    years = c3.number_input("兩次繼承間隔（年）", min_value=0, max_value=40, value=10)
+    growth = c4.number_input("配偶財產年成長率（%）", min_value=-5.0, max_value=10.0, value=2.0, step=0.5) / 100
+
+    res = optimize_two_deaths(
+        SpouseProperty(m1, s1, d1), SpouseProperty(m2, s2, d2),
+        adult_children=children, parents=parents, disabled_people=disabled, other_dependents=other,
+        years_between=years, growth_rate=growth, constants=C,
+    )
+    cur, best = res.current, res.best
+    k1, k2, k3 = st.columns(3)
+    k1.metric("現況兩代合計稅額", f"{cur['total_tax_wan']:,.0f} 萬", help=f"全額主張差額分配 {cur['claim_wan']:,.0f} 萬")
+    k2.metric("最適兩代合計稅額", f"{best['total_tax_wan']:,.0f} 萬",
+              delta=f"{best['total_tax_wan'] - cur['total_tax_wan']:,.0f} 萬", delta_color="inverse")
+    k3.metric("最適安排", f"登記 {best['split_ratio']:.0%}｜主張 {best['claim_ratio']:.0%}",
+              help=f"婚後財產登記於本人名下比例；配偶主張請求額 {best['claim_wan']:,.0f} 萬")
+
+    fig = go.Figure(go.Heatmap(
+        x=res.claim_ratios * 100, y=res.split_ratios * 100, z=res.total_tax_wan,
+        colorbar=dict(title="稅額（萬）"),
+        hovertemplate="登記於本人 %{y:.0f}%<br>主張比例 %{x:.0f}%<br>兩代合計 %{z:,.0f} 萬<extra></extra>",
+    ))
+    fig.update_layout(
+        title="兩代合計稅額（婚後財產登記比例 × 差額分配主張比例）", height=380,
+        xaxis_title="主張比例（%）", yaxis_title="登記於本人（%）", margin=dict(t=60, b=20, l=20, r=20),
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption("登記比例代表夫妻婚後財產登記於誰名下；第二次繼承無配偶扣除。實際請求額以法院或協議認定為準。")
 
 # ===============================
 # 介面（中文）
@@ -75,25 +131,48 @@ def main():
     st.markdown("## 🧮 遺產稅試算")
     st.caption("用清楚的試算，**提早預留稅源**，讓傳承更從容。所有金額單位：**萬元（TWD）**。")
 
+    C = load_tax_constants()
+    surface = _tax_surface(C.VERSION)
+
     st.markdown("### 請輸入資產與家庭資訊")
-    total_assets_input = st.number_input("總資產（萬元）", min_value=1000, max_value=100000, value=5000, step=100)
+    total_assets_input = st.slider(
+        "總資產（萬元）", min_value=ASSET_MIN, max_value=ASSET_MAX, value=5000, step=ASSET_STEP,
+        help="拖曳即時查看稅額變化（直接查表，不重新試算）",
+    )
 
     st.markdown("---")
     st.markdown("### 家庭成員")
-    has_spouse = st.checkbox("是否有配偶（扣除額 553 萬元）", value=False)
-    adult_children_input = st.number_input("直系血親卑親屬數（每人 56 萬元）", min_value=0, max_value=10, value=0)
-    parents_input = st.number_input("父母數（每人 138 萬元，最多 2 人）", min_value=0, max_value=2, value=0)
+    has_spouse = st.checkbox(f"是否有配偶（扣除額 {C.SPOUSE_DEDUCTION_VALUE:,.0f} 萬元）", value=False)
+    adult_children_input = st.number_input(f"直系血親卑親屬數（每人 {C.ADULT_CHILD_DEDUCTION:,.0f} 萬元）", min_value=0, max_value=MAX_CHILDREN, value=0)
+    parents_input = st.number_input(f"父母數（每人 {C.PARENTS_DEDUCTION:,.0f} 萬元，最多 2 人）", min_value=0, max_value=MAX_PARENTS, value=0)
     max_disabled = (1 if has_spouse else 0) + adult_children_input + parents_input
-    disabled_people_input = st.number_input("重度以上身心障礙者數（每人 693 萬元）", min_value=0, max_value=max_disabled, value=0)
-    other_dependents_input = st.number_input("受撫養之兄弟姊妹、祖父母數（每人 56 萬元）", min_value=0, max_value=5, value=0)
+    disabled_people_input = st.number_input(f"重度以上身心障礙者數（每人 {C.DISABLED_DEDUCTION:,.0f} 萬元）", min_value=0, max_value=max_disabled, value=0)
+    other_dependents_input = st.number_input(f"受撫養之兄弟姊妹、祖父母數（每人 {C.OTHER_DEPENDENTS_DEDUCTION:,.0f} 萬元）", min_value=0, max_value=MAX_OTHER, value=0)
 
-    calculator = EstateTaxCalculator(TaxConstants())
-    taxable_amount, tax_due, total_deductions = calculator.calculate_estate_tax(
-        total_assets_input, has_spouse, adult_children_input,
-        other_dependents_input, disabled_people_input, parents_input
-    )
+    profile = (has_spouse, adult_children_input, parents_input, disabled_people_input, other_dependents_input)
+    try:
+        point = surface.lookup(float(total_assets_input), profile)
+        taxable_amount = point["taxable_base_wan"]
+        tax_due = round(point["tax_wan"], 0)
+        total_deductions = point["deductions_wan"]
+    except KeyError:
+        # 不在曲面格點上（理論上不會發生）：退回逐筆試算（共用試算快取）
+        diag = memo_diagnose_yuan(
+            float(total_assets_input) * C.UNIT_FACTOR, has_spouse=has_spouse,
+            adult_children=adult_children_input, parents=parents_input,
+            disabled_people=disabled_people_input, other_dependents=other_dependents_input,
+            constants=C,
+        )
+        taxable_amount = diag["taxable_base_wan"]
+        tax_due = round(diag["tax_yuan"] / C.UNIT_FACTOR, 0)
+        total_deductions = diag["deductions_wan"]
+        point = None
 
     st.markdown(f"## 預估遺產稅：{tax_due:,.0f} 萬元")
+    if point:
+        st.caption(
+            f"有效稅率 {point['effective_rate']:.2%}｜邊際稅率 {point['marginal_rate']:.0%}｜稅則版本 {surface.rules_version}"
+        )
 
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -109,13 +188,13 @@ def main():
                 "重度身心障礙扣除額", "其他撫養扣除額"
             ],
             "金額（萬元）": [
-                TaxConstants.EXEMPT_AMOUNT,
-                TaxConstants.FUNERAL_EXPENSE,
-                TaxConstants.SPOUSE_DEDUCTION_VALUE if has_spouse else 0,
-                adult_children_input * TaxConstants.ADULT_CHILD_DEDUCTION,
-                parents_input * TaxConstants.PARENTS_DEDUCTION,
-                disabled_people_input * TaxConstants.DISABLED_DEDUCTION,
-                other_dependents_input * TaxConstants.OTHER_DEPENDENTS_DEDUCTION
+                C.EXEMPT_AMOUNT,
+                C.FUNERAL_EXPENSE,
+                C.SPOUSE_DEDUCTION_VALUE if has_spouse else 0,
+                adult_children_input * C.ADULT_CHILD_DEDUCTION,
+                parents_input * C.PARENTS_DEDUCTION,
+                disabled_people_input * C.DISABLED_DEDUCTION,
+                other_dependents_input * C.OTHER_DEPENDENTS_DEDUCTION
             ]
         }).astype({"金額（萬元）": int})
         st.table(df_deductions)
@@ -127,6 +206,19 @@ def main():
             "金額（萬元）": [int(taxable_amount), int(tax_due)]
         }))
 
+    # 稅額敏感度（曲面查表，不重算）
+    with st.expander("📈 稅額敏感度：資產 × 家庭組合", expanded=False):
+        _render_sensitivity(surface, profile, total_assets_input)
+
+    # 反推：目標稅額 → 資產門檻（分段線性，精確解）
+    with st.expander("🎯 反推：資產到多少，稅額會超過目標？", expanded=False):
+        _render_inverse(C, profile)
+
+    # 配偶剩餘財產差額分配：兩次繼承合計稅額
+    if has_spouse:
+        with st.expander("💑 配偶剩餘財產差額分配：兩代合計稅負", expanded=False):
+            _render_spousal(C, profile, float(total_assets_input))
+
     # 下載 PDF
     st.markdown("---")
 
@@ -144,17 +236,17 @@ def main():
         for _, r in df_deductions.iterrows():
             lines.append(f"{r['項目']}: {r['金額（萬元）']:,d}")
 
-        pdf_buf = generate_pdf(
+        return render_pdf(
             content="\n".join(lines),
             title="遺產稅試算",
             logo_path="logo.png",
             footer_text="永傳家族辦公室｜www.gracefo.com｜123@gracefo.com",
         )
-        return pdf_buf.getvalue()
 
+    # 按下才產生 PDF（相同內容由快取直接回傳）
     st.download_button(
         "下載 PDF 摘要（萬元）",
-        data=_build_pdf_bytes(),
+        data=_build_pdf_bytes,
         file_name="遺產稅試算_摘要_萬元.pdf",
         mime="application/pdf",
         use_container_width=True,
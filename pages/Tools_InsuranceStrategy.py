@@ -2,26 +2,33 @@
 # 保單策略建議（英文檔名＋中文頁面；畫面統一以『萬元（TWD）』，USD 顯示等值）
 from __future__ import annotations
 
+from functools import partial
+
+import numpy as np
 import streamlit as st
+import plotly.graph_objects as go
 from typing import List, Dict
 
-from legacy_tools.modules.insurance_logic import (
-    recommend_strategies,
-    FX_USD_TWD,
-)
-from legacy_tools.modules.pdf_generator import generate_pdf
+from legacy_tools.modules.coverage_optimizer import optimize_coverage
+from legacy_tools.modules.insurance_logic import budget_tier, recommend_strategies
+from legacy_tools.modules.fx import FxQuote, get_fx_service
+from legacy_tools.modules.insurance_projection import project_policy
+from legacy_tools.modules.pdf_generator import render_pdf
+from src.domain.tax_loader import load_tax_constants
+from src.domain.tax_memo import memo_diagnose_yuan
 
 # ---------- 小工具 ----------
-def _tier_label(budget_wan: float, currency: str) -> str:
-    """以等值萬 TWD 判斷分級（顯示用）。"""
-    twd_wan = budget_wan * (FX_USD_TWD if currency == "USD" else 1.0)
-    if twd_wan >= 1000:
-        return "高端預算"
-    if twd_wan >= 300:
-        return "進階預算"
-    if twd_wan >= 100:
-        return "標準預算"
-    return "入門預算"
+def _fx_quote() -> FxQuote:
+    """USD/TWD 匯率每個 session 只查一次；報告記錄其生效日，之後可依日期重現。"""
+    q = st.session_state.get("fx_usd_twd")
+    if q is None:
+        q = get_fx_service().quote("USD/TWD")
+        st.session_state["fx_usd_twd"] = q
+    return q
+
+def _fx_text() -> str:
+    q = _fx_quote()
+    return f"USD/TWD {q.rate:,.2f}（{q.as_of:%Y-%m-%d} 生效）"
 
 def _fmt_money_wan_twd(amount_wan: float) -> str:
     return f"{amount_wan:,.0f} 萬元"
@@ -29,11 +36,11 @@ def _fmt_money_wan_twd(amount_wan: float) -> str:
 def _fmt_budget_display(budget_wan: float, currency: str) -> str:
     """主畫面一律以『萬元（TWD）』顯示；USD 額外顯示原幣參考。"""
     if currency == "USD":
-        twd_equiv = budget_wan * FX_USD_TWD
+        twd_equiv = budget_wan * _fx_quote().rate
         return f"{_fmt_money_wan_twd(twd_equiv)}（約 US${budget_wan:,.0f} 萬）"
     return _fmt_money_wan_twd(budget_wan)
 
-def _pdf_from_results(
+def _pdf_content(
     age: int,
     gender: str,
     budget_wan: float,
@@ -41,9 +48,9 @@ def _pdf_from_results(
     pay_years: int,
     goals: List[str],
     strategies: List[Dict],
-) -> bytes:
-    """輸出 PDF（以萬元 TWD 為主，含 logo／生成日期／頁尾）。"""
-    tier = _tier_label(budget_wan, currency)
+) -> str:
+    """PDF 內文（以萬元 TWD 為主）；排版於按下下載時才進行。"""
+    tier = budget_tier(budget_wan, currency, _fx_quote().rate)
     main_budget_text = _fmt_budget_display(budget_wan, currency)
     lines: List[str] = []
     lines += [
@@ -53,6 +60,7 @@ def _pdf_from_results(
         f"性別：{gender}",
         f"總預算（統一顯示）：{main_budget_text}",
         f"繳費年期：{pay_years} 年",
+        f"匯率：{_fx_text()}",
         f"分級：{tier}",
         f"目標：{('、'.join(goals)) if goals else '（未填）'}",
         "",
@@ -72,20 +80,14 @@ def _pdf_from_results(
             "",
         ]
 
-    pdf_buf = generate_pdf(
-        content="\n".join(lines),
-        title="保單策略建議",
-        logo_path="logo.png",
-        footer_text="永傳家族辦公室｜www.gracefo.com｜123@gracefo.com",
-    )
-    return pdf_buf.getvalue()
+    return "\n".join(lines)
 
 # ---------- 介面 ----------
 st.set_page_config(page_title="保單策略建議", page_icon="📦", layout="wide")
 
 st.markdown("## 📦 保單策略建議")
 st.caption("依您的家庭目標與預算，**即時產出專屬策略與說明**，協助預留稅源、守護家族現金流。")
-st.caption("畫面一律以 **『萬元（TWD）』** 顯示；若選 USD，會同時顯示等值新台幣。")
+st.caption(f"畫面一律以 **『萬元（TWD）』** 顯示；若選 USD，會同時顯示等值新台幣（匯率 {_fx_text()}）。")
 
 with st.form("ins_form"):
     c1, c2, c3 = st.columns([1, 1, 1])
@@ -115,6 +117,19 @@ with st.form("ins_form"):
             default=["傳承"],
         )
 
+    with st.expander("試算假設（保費與保單價值）", expanded=False):
+        a1, a2, a3 = st.columns(3)
+        declared_pct = a1.number_input("假設宣告利率（%）", min_value=0.0, max_value=8.0, value=2.5, step=0.1)
+        spread_pct = a2.number_input("情境區間（± 百分點）", min_value=0.0, max_value=3.0, value=1.0, step=0.25)
+        horizon = a3.number_input("試算年數", min_value=10, max_value=60, value=30, step=5)
+
+    with st.expander("稅源配置（選填：輸入資產即試算各險種配置）", expanded=False):
+        t1, t2, t3, t4 = st.columns(4)
+        estate_wan = t1.number_input("預估遺產總額（萬元）", min_value=0.0, value=0.0, step=100.0)
+        has_spouse = t2.checkbox("有配偶", value=True)
+        adult_children = t3.number_input("子女人數", min_value=0, max_value=10, value=2, step=1)
+        max_usd_pct = t4.slider("USD 保費上限（%）", min_value=0, max_value=100, value=50, step=10)
+
     submitted = st.form_submit_button("✨ 產生建議")
 
 if not submitted:
@@ -137,10 +152,11 @@ recs = recommend_strategies(
     currency=currency,      # 'TWD' / 'USD'
     pay_years=int(pay_years),
     goals=goals,            # ✅ 正確參數名稱
+    fx_rate=_fx_quote().rate,
 )
 
 # 分級與顯示
-tier_text = _tier_label(float(budget), currency)
+tier_text = budget_tier(float(budget), currency, _fx_quote().rate)
 main_budget_text = _fmt_budget_display(float(budget), currency)
 
 st.markdown(
@@ -157,6 +173,76 @@ else:
             st.markdown(f"**策略觀念：** {s.get('why','')}")
             st.markdown(f"**實作作法：** {s.get('description','')}")
 
+# ---------- 保費與保單價值試算（情境扇形） ----------
+st.markdown("---")
+st.markdown("### 📈 保費與保單價值試算（示意）")
+rates = np.linspace(declared_pct - spread_pct, declared_pct + spread_pct, 21).clip(min=0.0) / 100
+proj = project_policy(
+    float(budget), int(pay_years), currency=currency, age=int(age),
+    declared_rate=rates, years=int(horizon), fx_rate=_fx_quote().rate,
+)
+base = project_policy(
+    float(budget), int(pay_years), currency=currency, age=int(age),
+    declared_rate=declared_pct / 100, years=int(horizon), fx_rate=_fx_quote().rate,
+)
+band = proj.percentiles("cash_value_wan", (0, 50, 100))
+fig = go.Figure()
+fig.add_trace(go.Scatter(x=proj.years, y=band[2], line=dict(width=0), showlegend=False, hoverinfo="skip"))
+fig.add_trace(go.Scatter(
+    x=proj.years, y=band[0], fill="tonexty", line=dict(width=0),
+    name=f"保單價值區間（宣告利率 {rates[0]:.2%}–{rates[-1]:.2%}）",
+))
+fig.add_trace(go.Scatter(x=base.years, y=base.cash_value_wan[0], name="保單價值（假設利率）"))
+fig.add_trace(go.Scatter(x=base.years, y=base.death_benefit_wan[0], name="身故保險金", line=dict(dash="dash")))
+fig.add_trace(go.Scatter(x=base.years, y=base.premium_paid_wan[0], name="累計保費", line=dict(dash="dot")))
+fig.update_layout(
+    height=420, xaxis_title="保單年度", yaxis_title="萬元（TWD）",
+    margin=dict(t=30, b=20, l=20, r=20), legend=dict(orientation="h", y=-0.2),
+)
+st.plotly_chart(fig, use_container_width=True)
+with st.expander("逐年明細（假設宣告利率）", expanded=False):
+    st.dataframe(base.frame(0).round(1), use_container_width=True, hide_index=True)
+st.caption("示意模型：附加費用、保險成本與增額方式皆為簡化假設，實際數字以保險公司建議書為準。")
+
+# ---------- 稅源配置（保障 × 保單價值 的取捨） ----------
+if estate_wan > 0:
+    st.markdown("---")
+    st.markdown("### 🧮 稅源配置：各險種預算分配")
+    _c = load_tax_constants()
+    _diag = memo_diagnose_yuan(
+        float(estate_wan) * _c.UNIT_FACTOR, has_spouse=has_spouse, adult_children=int(adult_children),
+        parents=0, disabled_people=0, other_dependents=0, constants=_c,
+    )
+    target_wan = _diag["recommended_liquidity_yuan"] / _c.UNIT_FACTOR
+    budget_twd = float(budget) * (_fx_quote().rate if currency == "USD" else 1.0)
+    frontier = optimize_coverage(
+        target_wan, budget_twd, age=int(age), pay_years=int(pay_years),
+        max_usd_share=max_usd_pct / 100, horizon_years=int(horizon),
+    )
+    st.caption(f"建議預留稅源：**{_fmt_money_wan_twd(target_wan)}**（稅則 {_diag['rules_version']}）")
+    if target_wan <= 0:
+        st.info("以目前資產與家庭結構估算無遺產稅，無須另行預留稅源。")
+    elif not frontier.points:
+        st.info("目前繳費年期下沒有可配置的險種，請調整年期。")
+    else:
+        df = frontier.frame()
+        fig2 = go.Figure(go.Scatter(
+            x=df["保障額度（萬元）"], y=df["期末保單價值（萬元）"], mode="lines+markers",
+            customdata=df[["稅源達成率", "USD 占比"]].to_numpy(),
+            hovertemplate="保障 %{x:,.0f} 萬｜保單價值 %{y:,.0f} 萬<br>達成率 %{customdata[0]:.0%}｜USD %{customdata[1]:.0%}<extra></extra>",
+        ))
+        fig2.add_vline(x=target_wan, line_dash="dash", annotation_text="稅源目標")
+        fig2.update_layout(
+            height=360, xaxis_title="身故保障（萬元）", yaxis_title=f"第 {int(horizon)} 年保單價值（萬元）",
+            margin=dict(t=30, b=20, l=20, r=20),
+        )
+        st.plotly_chart(fig2, use_container_width=True)
+        fmt = {c: "{:,.0f}" for c in df.columns}
+        fmt.update({"稅源達成率": "{:.0%}", "USD 占比": "{:.0%}"})
+        st.dataframe(df.style.format(fmt), use_container_width=True, hide_index=True)
+        st.caption("每一列都是無法再同時提高保障與保單價值的配置：越上方越偏重稅源保障（定期險），越下方越偏重資產累積（終身險）。"
+                   f"定期險只在繳費年期內有效，其保障依涵蓋 {int(horizon)} 年試算期間的比例折算。")
+
 # 下載區（TXT / PDF）
 st.markdown("---")
 colA, colB = st.columns(2)
@@ -169,6 +255,7 @@ txt_lines = [
     f"- 性別：{gender}",
     f"- 總預算（統一顯示）：{main_budget_text}",
     f"- 繳費年期：{int(pay_years)} 年",
+    f"- 匯率：{_fx_text()}",
     f"- 目標：{('、'.join(goals)) if goals else '（未填）'}",
     "",
     "## 策略清單",
@@ -193,12 +280,16 @@ with colA:
     )
 
 with colB:
-    pdf_bytes = _pdf_from_results(
-        int(age), gender, float(budget), currency, int(pay_years), goals, recs
-    )
     st.download_button(
         "下載 PDF（萬元）",
-        data=pdf_bytes,
+        # 按下才產生 PDF（相同內容由快取回傳）
+        data=partial(
+            render_pdf,
+            _pdf_content(int(age), gender, float(budget), currency, int(pay_years), goals, recs),
+            title="保單策略建議",
+            logo_path="logo.png",
+            footer_text="永傳家族辦公室｜www.gracefo.com｜123@gracefo.com",
+        ),
         file_name="保單策略建議_萬元.pdf",
         mime="application/pdf",
     )
@@ -0,0 +1,40 @@
+# src/domain/gift_rules.py
+from __future__ import annotations
+from typing import Dict, Any
+
+import numpy as np
+
+from src.domain.tax_rules import TaxConstants, compile_brackets
+
+
+class GiftTaxCalculator:
+    """
+    贈與稅（單位：萬）：每位贈與人每年贈與總額扣除免稅額後，依累進級距課稅。
+    級距計算與遺產稅共用 compile_brackets。
+    """
+
+    def __init__(self, constants: TaxConstants | None = None):
+        self.c = constants or TaxConstants()
+        self.brackets = compile_brackets(self.c.GIFT_TAX_BRACKETS)
+
+    def taxable_gift_wan(self, annual_gifts_wan: float) -> float:
+        return max(float(annual_gifts_wan) - self.c.GIFT_ANNUAL_EXCLUSION, 0.0)
+
+    def annual_gift_tax_wan(self, annual_gifts_wan: float) -> float:
+        return self.brackets.tax(self.taxable_gift_wan(annual_gifts_wan))
+
+    def annual_gift_tax_wan_batch(self, annual_gifts_wan) -> np.ndarray:
+        g = np.asarray(annual_gifts_wan, dtype=float)
+        return self.brackets.tax_array(np.maximum(g - self.c.GIFT_ANNUAL_EXCLUSION, 0.0))
+
+    def diagnose_wan(self, annual_gifts_wan: float) -> Dict[str, Any]:
+        taxable = self.taxable_gift_wan(annual_gifts_wan)
+        tax = self.brackets.tax(taxable)
+        return {
+            "rules_version": self.c.VERSION,
+            "annual_exclusion_wan": self.c.GIFT_ANNUAL_EXCLUSION,
+            "gifts_wan": float(annual_gifts_wan),
+            "taxable_gift_wan": taxable,
+            "gift_tax_wan": tax,
+            "marginal_rate": self.brackets.marginal_rate(taxable),
+        }
@@ -0,0 +1,304 @@
+# src/domain/heirs.py
+# 法定繼承：家族樹 → 各繼承人應繼分、特留分與稅後金額
+from __future__ import annotations
+from dataclasses import dataclass, field
+from fractions import Fraction
+from typing import Dict, List, Optional, Tuple
+
+from src.domain.tax_rules import TaxConstants, EstateTaxCalculator
+
+DECEDENT = "__decedent__"
+
+# 特留分比例（民法第 1223 條）
+RESERVED_RATIO: Dict[str, Fraction] = {
+    "spouse": Fraction(1, 2),
+    "descendant": Fraction(1, 2),
+    "parent": Fraction(1, 2),
+    "sibling": Fraction(1, 3),
+    "grandparent": Fraction(1, 3),
+}
+
+Branch = Tuple[Tuple[str, Fraction], ...]
+
+
+@dataclass
+class Person:
+    """
+    家族成員（相對於被繼承人）：
+      - renounced：拋棄繼承，視為自始非繼承人，其應繼分歸同順序其他繼承人，不生代位
+      - disqualified：喪失繼承權，由其直系血親卑親屬代位繼承
+      - disabled / dependent：遺產稅扣除額用（重度身心障礙、受扶養之兄弟姊妹或祖父母）
+    """
+    id: str
+    name: str = ""
+    alive: bool = True
+    renounced: bool = False
+    disqualified: bool = False
+    disabled: bool = False
+    dependent: bool = False
+
+    @property
+    def inherits(self) -> bool:
+        return self.alive and not self.renounced and not self.disqualified
+
+
+@dataclass
+class HeirShare:
+    """單一繼承人的分配結果（金額單位：萬）。"""
+    person_id: str
+    name: str
+    relation: str
+    statutory_share: Fraction
+    reserved_share: Fraction
+    gross_wan: float
+    reserved_wan: float
+    tax_wan: float
+    net_wan: float
+
+
+@dataclass
+class Distribution:
+    net_estate_wan: float
+    tax_wan: float
+    rules_version: str
+    heirs: List[HeirShare] = field(default_factory=list)
+
+    def by_id(self) -> Dict[str, HeirShare]:
+        return {h.person_id: h for h in self.heirs}
+
+
+class FamilyTree:
+    """
+    以被繼承人為中心的家族圖：
+      - 直系血親卑親屬為一棵樹（add_child 指定父／母節點，預設為被繼承人）
+      - 配偶、父母、兄弟姊妹、祖父母直接掛在被繼承人下
+    直系血親卑親屬依房（branch）計算並記憶結果；修改某成員時只清除該成員到被繼承人
+    路徑上的記憶，其餘各房沿用。
+    """
+
+    def __init__(self):
+        self.people: Dict[str, Person] = {}
+        self.spouse: Optional[str] = None
+        self.parents: List[str] = []
+        self.siblings: List[str] = []
+        self.grandparents: List[str] = []
+        self._children: Dict[str, List[str]] = {DECEDENT: []}
+        self._parent: Dict[str, str] = {}
+        self._memo: Dict[str, Branch] = {}
+        self.memo_hits = 0
+        self.memo_misses = 0
+
+    # ---------- 建立與修改 ----------
+    def _register(self, person: Person) -> None:
+        if person.id in self.people or person.id == DECEDENT:
+            raise ValueError(f"成員代號重複：{person.id}")
+        self.people[person.id] = person
+
+    def set_spouse(self, person: Person) -> None:
+        self._register(person)
+        self.spouse = person.id
+
+    def add_child(self, person: Person, parent_id: str = DECEDENT) -> None:
+        if parent_id not in self._children:
+            raise KeyError(f"找不到直系血親卑親屬：{parent_id}")
+        self._register(person)
+        self._children[parent_id].append(person.id)
+        self._children[person.id] = []
+        self._parent[person.id] = parent_id
+        self._invalidate(parent_id)
+
+    def add_parent(self, person: Person) -> None:
+        if len(self.parents) >= 2:
+            raise ValueError("父母最多 2 人")
+        self._register(person)
+        self.parents.append(person.id)
+
+    def add_sibling(self, person: Person) -> None:
+        self._register(person)
+        self.siblings.append(person.id)
+
+    def add_grandparent(self, person: Person) -> None:
+        if len(self.grandparents) >= 4:
+            raise ValueError("祖父母最多 4 人")
+        self._register(person)
+        self.grandparents.append(person.id)
+
+    def update(self, person_id: str, **changes) -> None:
+        """修改成員狀態（alive、renounced、disqualified 等），並清除受影響那一房的記憶。"""
+        p = self.people[person_id]
+        for k, v in changes.items():
+            if not hasattr(p, k) or k == "id":
+                raise AttributeError(f"不可修改的欄位：{k}")
+            setattr(p, k, v)
+        if person_id in self._parent:
+            self._invalidate(person_id)
+
+    def remove(self, person_id: str) -> None:
+        """移除成員；直系血親卑親屬連同其子孫一併移除。"""
+        if person_id in self._parent:
+            parent = self._parent.pop(person_id)
+            self._children[parent].remove(person_id)
+            stack = [person_id]
+            while stack:
+                pid = stack.pop()
+                stack.extend(self._children.pop(pid, []))
+                self._parent.pop(pid, None)
+                self._memo.pop(pid, None)
+                del self.people[pid]
+            self._invalidate(parent)
+            return
+        for group in (self.parents, self.siblings, self.grandparents):
+            if person_id in group:
+                group.remove(person_id)
+        if self.spouse == person_id:
+            self.spouse = None
+        del self.people[person_id]
+
+    def _invalidate(self, person_id: str) -> None:
+        node = person_id
+        while node != DECEDENT:
+            self._memo.pop(node, None)
+            node = self._parent[node]
+
+    # ---------- 應繼分 ----------
+    def _branch(self, person_id: str) -> Branch:
+        """該房內各繼承人的占比（合計為 1；整房無繼承人時為空）。"""
+        cached = self._memo.get(person_id)
+        if cached is not None:
+            self.memo_hits += 1
+            return cached
+        self.memo_misses += 1
+        p = self.people[person_id]
+        if p.inherits:
+            result: Branch = ((person_id, Fraction(1)),)
+        elif p.renounced:
+            result = ()
+        else:
+            # 死亡或喪失繼承權：由子女依房代位
+            subs = [b for b in (self._branch(c) for c in self._children[person_id]) if b]
+            result = tuple(
+                (pid, frac / len(subs)) for b in subs for pid, frac in b
+            )
+        self._memo[person_id] = result
+        return result
+
+    def _descendant_branches(self) -> List[Branch]:
+        """
+        第一順序各房：自子女一代起逐代往下找，取第一個有繼承人的親等。
+        上一代全數拋棄（或死亡而無人代位）時，次親等各人以本位繼承、各自成一房。
+        """
+        level = self._children[DECEDENT]
+        while level:
+            branches = [b for b in (self._branch(pid) for pid in level) if b]
+            if branches:
+                return branches
+            level = [c for pid in level for c in self._children[pid]]
+        return []
+
+    def _alive_heirs(self, ids: List[str]) -> List[str]:
+        return [pid for pid in ids if self.people[pid].inherits]
+
+    def statutory_shares(self) -> Dict[str, Tuple[Fraction, str]]:
+        """
+        應繼分（民法第 1138、1140、1144、1176 條）：回傳 {成員代號: (應繼分, 順序類別)}。
+        配偶與第一順序按房均分；與第二、三順序共同繼承時配偶 1/2；與祖父母共同繼承時 2/3。
+        親等近者均拋棄繼承時，由次親等直系血親卑親屬以本位繼承（第 1176 條第 5 項）。
+        """
+        shares: Dict[str, Tuple[Fraction, str]] = {}
+        spouse = self.spouse if self.spouse and self.people[self.spouse].inherits else None
+
+        branches = self._descendant_branches()
+        if branches:
+            n = len(branches) + (1 if spouse else 0)
+            for b in branches:
+                for pid, frac in b:
+                    shares[pid] = (frac / n, "descendant")
+            if spouse:
+                shares[spouse] = (Fraction(1, n), "spouse")
+            return shares
+
+        for group, kind, spouse_part in (
+            (self.parents, "parent", Fraction(1, 2)),
+            (self.siblings, "sibling", Fraction(1, 2)),
+            (self.grandparents, "grandparent", Fraction(2, 3)),
+        ):
+            heirs = self._alive_heirs(group)
+            if heirs:
+                rest = (1 - spouse_part) if spouse else Fraction(1)
+                for pid in heirs:
+                    shares[pid] = (rest / len(heirs), kind)
+                if spouse:
+                    shares[spouse] = (spouse_part, "spouse")
+                return shares
+
+        if spouse:
+            shares[spouse] = (Fraction(1), "spouse")
+        return shares
+
+    # ---------- 遺產稅與稅後分配 ----------
+    def _depth(self, person_id: str) -> int:
+        d, node = 0, person_id
+        while node != DECEDENT:
+            node = self._parent[node]
+            d += 1
+        return d
+
+    def _relation(self, person_id: str, kind: str) -> str:
+        if kind != "descendant":
+            return {"spouse": "配偶", "parent": "父母", "sibling": "兄弟姊妹", "grandparent": "祖父母"}[kind]
+        depth = self._depth(person_id)
+        if depth == 1:
+            return "子女"
+        label = "孫子女" if depth == 2 else f"第 {depth} 親等卑親屬"
+        # 父／母拋棄繼承者為本位繼承；死亡或喪失繼承權者為代位繼承
+        return label if self.people[self._parent[person_id]].renounced else label + "（代位）"
+
+    def deduction_profile(self, shares: Optional[Dict[str, Tuple[Fraction, str]]] = None) -> Dict[str, object]:
+        """由家族樹推得遺產稅扣除額的人數（對應 diagnose_yuan 的家庭參數）。"""
+        shares = self.statutory_shares() if shares is None else shares
+        spouse = self.people[self.spouse] if self.spouse else None
+        descendants = [pid for pid, (_, kind) in shares.items() if kind == "descendant"]
+        n_descendants = len(descendants)
+        # 遺產及贈與稅法第 17 條：親等近者拋棄由次親等繼承時，扣除人數以拋棄前的人數為限
+        if any(self.people[self._parent[pid]].renounced for pid in descendants if self._parent[pid] != DECEDENT):
+            n_descendants = min(n_descendants, sum(1 for c in self._children[DECEDENT] if self.people[c].alive))
+        parents = [pid for pid in self.parents if self.people[pid].alive]
+        dependents = [pid for pid in self.siblings + self.grandparents
+                      if self.people[pid].alive and self.people[pid].dependent]
+        counted = descendants + parents + ([spouse.id] if spouse and spouse.alive else [])
+        return {
+            "has_spouse": bool(spouse and spouse.alive),
+            "adult_children": n_descendants,
+            "parents": len(parents),
+            "disabled_people": sum(1 for pid in counted if self.people[pid].disabled),
+            "other_dependents": len(dependents),
+        }
+
+    def distribute(self, net_estate_wan: float, *, constants: Optional[TaxConstants] = None) -> Distribution:
+        """
+        依應繼分分配淨遺產（單位：萬），遺產稅由各繼承人按應繼分比例負擔。
+        特留分以稅前淨遺產計算。
+        """
+        c = constants or TaxConstants()
+        shares = self.statutory_shares()
+        diag = EstateTaxCalculator(c).diagnose_yuan(
+            float(net_estate_wan) * c.UNIT_FACTOR, **self.deduction_profile(shares)
+        )
+        tax_wan = diag["tax_yuan"] / c.UNIT_FACTOR
+        out = Distribution(net_estate_wan=float(net_estate_wan), tax_wan=tax_wan, rules_version=c.VERSION)
+        for pid, (frac, kind) in shares.items():
+            reserved = frac * RESERVED_RATIO[kind]
+            gross = float(net_estate_wan) * float(frac)
+            tax = tax_wan * float(frac)
+            out.heirs.append(HeirShare(
+                person_id=pid,
+                name=self.people[pid].name or pid,
+                relation=self._relation(pid, kind),
+                statutory_share=frac,
+                reserved_share=reserved,
+                gross_wan=gross,
+                reserved_wan=float(net_estate_wan) * float(reserved),
+                tax_wan=tax,
+                net_wan=gross - tax,
+            ))
+        return out
@@ -0,0 +1,197 @@
+# src/domain/liquidity.py
+# 稅源缺口引擎：資產地圖持有 × 變現折價／變現天數 → 期限內可動用資金 vs. 遺產稅所需
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from src.domain.tax_memo import memo_diagnose_yuan
+from src.domain.tax_rules import TaxConstants, EstateTaxCalculator
+
+
+@dataclass(frozen=True)
+class LiquidityProfile:
+    """變現假設：haircut 為急售折價比例，days_to_cash 為變現所需天數。"""
+    haircut: float
+    days_to_cash: int
+
+
+# 類別名稱與 Tools_AssetMap 的資產項目一致
+DEFAULT_LIQUIDITY: Dict[str, LiquidityProfile] = {
+    "現金 / 活存": LiquidityProfile(0.0, 0),
+    "定存 / 外幣存款（折合新台幣）": LiquidityProfile(0.01, 7),
+    "股票 / 基金 / ETF": LiquidityProfile(0.10, 5),
+    "保單現金價值": LiquidityProfile(0.05, 30),
+    "不動產（淨值）": LiquidityProfile(0.25, 365),  # 須完稅後才能辦理繼承登記、出售
+    "企業股權（估值）": LiquidityProfile(0.40, 365),
+    "加密資產": LiquidityProfile(0.30, 3),
+    "其他資產": LiquidityProfile(0.50, 180),
+}
+
+# 遺產稅申報期限：繼承開始後 6 個月
+DEFAULT_DEADLINE_DAYS = 180
+
+# 累計和以差量更新；每隔若干次更新重新加總一次，避免浮點誤差累積
+_RESYNC_EVERY = 1024
+
+Family = Tuple[bool, int, int, int, int]
+FAMILY_FIELDS = ("has_spouse", "adult_children", "parents", "disabled_people", "other_dependents")
+
+
+@dataclass
+class LiquidityGap:
+    """試算結果（金額單位：萬）。gap_wan > 0 表示期限內可動用資金不足以支應建議預留稅源。"""
+    gross_assets_wan: float
+    liabilities_wan: float
+    net_estate_wan: float
+    tax_wan: float
+    required_wan: float
+    available_wan: float
+    gap_wan: float
+    rules_version: str
+    by_class: List[Dict[str, float]]
+
+    @property
+    def coverage_ratio(self) -> float:
+        return self.available_wan / self.required_wan if self.required_wan > 0 else float("inf")
+
+
+class LiquidityEngine:
+    """
+    增量式稅源缺口試算：
+      - set_holding / update 只重算有變動的項目，並以差量更新總資產與可動用資金
+      - 遺產稅只依淨遺產與家庭扣除決定，兩者未變時沿用上次結果
+    """
+
+    def __init__(
+        self,
+        constants: Optional[TaxConstants] = None,
+        *,
+        profiles: Optional[Mapping[str, LiquidityProfile]] = None,
+        deadline_days: int = DEFAULT_DEADLINE_DAYS,
+        buffer_multiplier: Optional[float] = None,
+    ):
+        self.calc = EstateTaxCalculator(constants)
+        self.profiles = dict(DEFAULT_LIQUIDITY)
+        if profiles:
+            self.profiles.update(profiles)
+        self.deadline_days = int(deadline_days)
+        self.buffer_multiplier = buffer_multiplier
+
+        self._holdings: Dict[str, float] = {}
+        self._available: Dict[str, float] = {}
+        self._gross = 0.0
+        self._available_total = 0.0
+        self._liabilities = 0.0
+        self._family: Family = (False, 0, 0, 0, 0)
+        self._updates = 0
+        self._tax_key: Optional[Tuple[float, Family]] = None
+        self._tax: Dict[str, float] = {}
+        self.tax_evaluations = 0
+
+    @property
+    def constants(self) -> TaxConstants:
+        return self.calc.c
+
+    def _contribution(self, name: str, value_wan: float) -> float:
+        p = self.profiles.get(name)
+        if p is None:
+            raise ValueError(f"缺少資產類別的變現假設：{name}")
+        if p.days_to_cash > self.deadline_days:
+            return 0.0
+        return value_wan * (1.0 - p.haircut)
+
+    def set_holding(self, name: str, value_wan: float) -> bool:
+        """更新單一項目；回傳是否有變動。"""
+        value = max(float(value_wan), 0.0)
+        old = self._holdings.get(name)
+        if old == value:
+            return False
+        avail = self._contribution(name, value)
+        self._gross += value - (old or 0.0)
+        self._available_total += avail - self._available.get(name, 0.0)
+        self._holdings[name] = value
+        self._available[name] = avail
+        self._updates += 1
+        if self._updates % _RESYNC_EVERY == 0:
+            self._gross = sum(self._holdings.values())
+            self._available_total = sum(self._available.values())
+        return True
+
+    def update(self, holdings_wan: Mapping[str, float]) -> List[str]:
+        """批次套用持有金額；只處理與目前不同的項目，回傳有變動的項目名稱。"""
+        return [name for name, v in holdings_wan.items() if self.set_holding(name, v)]
+
+    def set_liabilities(self, total_wan: float) -> None:
+        self._liabilities = max(float(total_wan), 0.0)
+
+    @property
+    def family(self) -> Dict[str, object]:
+        """目前的家庭成員設定（未設定時為無配偶、0 位子女），可直接作為 set_family 的參數。"""
+        return dict(zip(FAMILY_FIELDS, self._family))
+
+    @staticmethod
+    def max_disabled_people(has_spouse: bool, adult_children: int, parents: int) -> int:
+        """身心障礙扣除的人數上限：配偶、直系血親卑親屬與父母合計（與 tax_surface 的列舉一致）。"""
+        return (1 if has_spouse else 0) + int(adult_children) + int(parents)
+
+    def set_family(
+        self,
+        *,
+        has_spouse: bool = False,
+        adult_children: int = 0,
+        parents: int = 0,
+        disabled_people: int = 0,
+        other_dependents: int = 0,
+    ) -> None:
+        limit = self.max_disabled_people(has_spouse, adult_children, parents)
+        if int(disabled_people) > limit:
+            raise ValueError(f"重度以上身心障礙者數（{int(disabled_people)}）不可超過配偶、直系血親卑親屬與父母合計 {limit} 人")
+        self._family = (bool(has_spouse), int(adult_children), int(parents),
+                        int(disabled_people), int(other_dependents))
+
+    def _estate_tax(self, net_wan: float) -> Dict[str, float]:
+        key = (net_wan, self._family)
+        if key != self._tax_key:
+            spouse, children, parents, disabled, other = self._family
+            diag = memo_diagnose_yuan(
+                net_wan * self.constants.UNIT_FACTOR,
+                has_spouse=spouse,
+                adult_children=children,
+                parents=parents,
+                disabled_people=disabled,
+                other_dependents=other,
+                buffer_multiplier=self.buffer_multiplier,
+                constants=self.constants,
+            )
+            self._tax = {
+                "tax_wan": diag["tax_yuan"] / self.constants.UNIT_FACTOR,
+                "required_wan": diag["recommended_liquidity_yuan"] / self.constants.UNIT_FACTOR,
+            }
+            self._tax_key = key
+            self.tax_evaluations += 1
+        return self._tax
+
+    def result(self) -> LiquidityGap:
+        net = max(self._gross - self._liabilities, 0.0)
+        tax = self._estate_tax(net)
+        by_class = []
+        for name, value in self._holdings.items():
+            p = self.profiles[name]
+            by_class.append({
+                "name": name,
+                "value_wan": value,
+                "haircut": p.haircut,
+                "days_to_cash": p.days_to_cash,
+                "available_wan": self._available[name],
+            })
+        return LiquidityGap(
+            gross_assets_wan=self._gross,
+            liabilities_wan=self._liabilities,
+            net_estate_wan=net,
+            tax_wan=tax["tax_wan"],
+            required_wan=tax["required_wan"],
+            available_wan=self._available_total,
+            gap_wan=max(tax["required_wan"] - self._available_total, 0.0),
+            rules_version=self.constants.VERSION,
+            by_class=by_class,
+        )
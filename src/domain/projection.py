@@ -0,0 +1,173 @@
+# src/domain/projection.py
+# 遺產蒙地卡羅推估：各資產類別成長路徑 → 未來遺產稅與稅源缺口的分位數區間
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.domain.tax_rules import TaxConstants, EstateTaxCalculator
+
+
+@dataclass(frozen=True)
+class AssetClassAssumption:
+    """單一資產類別的年化報酬／波動假設；liquid 表示可於短期內變現支應稅款。"""
+    expected_return: float
+    volatility: float
+    liquid: bool
+
+
+# 類別名稱與 Tools_AssetMap 的資產項目一致（單位：萬元）
+DEFAULT_ASSUMPTIONS: Dict[str, AssetClassAssumption] = {
+    "現金 / 活存": AssetClassAssumption(0.005, 0.0, True),
+    "定存 / 外幣存款（折合新台幣）": AssetClassAssumption(0.015, 0.03, True),
+    "股票 / 基金 / ETF": AssetClassAssumption(0.06, 0.18, True),
+    "保單現金價值": AssetClassAssumption(0.025, 0.0, True),
+    "不動產（淨值）": AssetClassAssumption(0.03, 0.08, False),
+    "企業股權（估值）": AssetClassAssumption(0.05, 0.25, False),
+    "加密資產": AssetClassAssumption(0.08, 0.70, True),
+    "其他資產": AssetClassAssumption(0.02, 0.10, False),
+}
+
+DEFAULT_PERCENTILES: Tuple[float, ...] = (5, 25, 50, 75, 95)
+
+# 少於此路徑數時直接在本程序計算（開 process pool 的成本不划算）
+_POOL_MIN_PATHS = 20_000
+
+
+@dataclass
+class ProjectionResult:
+    """
+    推估結果（金額單位：萬元）：
+      - bands[指標] 形狀為 (len(percentiles), years + 1)，第 0 欄為今日
+      - gap_probability[t]：第 t 年稅源缺口 > 0 的路徑比例
+    """
+    years: np.ndarray
+    percentiles: Tuple[float, ...]
+    bands: Dict[str, np.ndarray]
+    gap_probability: np.ndarray
+    n_paths: int
+    seed: Optional[int]
+    rules_version: str
+    paths: Dict[str, np.ndarray] = field(default_factory=dict, repr=False)
+
+    def band(self, metric: str, pct: float) -> np.ndarray:
+        return self.bands[metric][self.percentiles.index(pct)]
+
+
+def _simulate_chunk(args) -> Dict[str, np.ndarray]:
+    (seed_seq, n, years, start, mu, sigma, chol, liquid_mask,
+     liabilities_wan, constants, family, buffer_multiplier) = args
+    rng = np.random.default_rng(seed_seq)
+    k = start.shape[0]
+
+    # 對數常態成長：每年 log 報酬 ~ N(mu - σ²/2, σ)，類別間相關性以 Cholesky 引入
+    z = rng.standard_normal((n, years, k))
+    if chol is not None:
+        z = z @ chol.T
+    log_ret = (mu - 0.5 * sigma ** 2) + sigma * z
+    growth = np.exp(np.cumsum(log_ret, axis=1))
+    values = np.concatenate(
+        [np.broadcast_to(start, (n, 1, k)), start * growth], axis=1
+    )  # (n, years + 1, k)
+
+    gross = values.sum(axis=2)
+    liquid = values[:, :, liquid_mask].sum(axis=2)
+    net_wan = np.maximum(gross - liabilities_wan, 0.0)
+
+    calc = EstateTaxCalculator(constants)
+    diag = calc.diagnose_batch(
+        net_wan.ravel() * constants.UNIT_FACTOR,
+        buffer_multiplier=buffer_multiplier,
+        **family,
+    )
+    tax_wan = (diag["tax_yuan"] / constants.UNIT_FACTOR).reshape(net_wan.shape)
+    need_wan = (diag["recommended_liquidity_yuan"] / constants.UNIT_FACTOR).reshape(net_wan.shape)
+    return {
+        "net_estate_wan": net_wan,
+        "tax_wan": tax_wan,
+        "liquid_wan": liquid,
+        "liquidity_gap_wan": np.maximum(need_wan - liquid, 0.0),
+    }
+
+
+def project_estate(
+    holdings_wan: Mapping[str, float],
+    *,
+    years: int = 20,
+    n_paths: int = 10_000,
+    liabilities_wan: float = 0.0,
+    has_spouse: bool = False,
+    adult_children: int = 0,
+    parents: int = 0,
+    disabled_people: int = 0,
+    other_dependents: int = 0,
+    assumptions: Optional[Mapping[str, AssetClassAssumption]] = None,
+    correlation: Optional[Sequence[Sequence[float]]] = None,
+    constants: Optional[TaxConstants] = None,
+    buffer_multiplier: Optional[float] = None,
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+    seed: Optional[int] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = 10_000,
+    keep_paths: bool = False,
+) -> ProjectionResult:
+    """
+    依資產地圖持有（萬元）模擬 years 年的成長路徑，逐路徑逐年計算遺產稅與稅源缺口。
+      - 路徑以 chunk_size 切塊；各塊的亂數種子由 SeedSequence(seed) 分派，
+        因此同一 seed 不論 workers 數量，結果都完全相同
+      - workers：None 依路徑數自動決定；<= 1 在本程序計算；> 1 使用 process pool
+      - correlation：類別間相關係數矩陣（順序同 holdings_wan），預設彼此獨立
+    """
+    table = dict(DEFAULT_ASSUMPTIONS)
+    if assumptions:
+        table.update(assumptions)
+    names = list(holdings_wan.keys())
+    missing = [n for n in names if n not in table]
+    if missing:
+        raise ValueError(f"缺少資產類別假設：{'、'.join(missing)}")
+
+    start = np.array([float(holdings_wan[n]) for n in names], dtype=float)
+    mu = np.array([table[n].expected_return for n in names], dtype=float)
+    sigma = np.array([table[n].volatility for n in names], dtype=float)
+    liquid_mask = np.array([table[n].liquid for n in names], dtype=bool)
+    chol = np.linalg.cholesky(np.asarray(correlation, dtype=float)) if correlation is not None else None
+
+    c = constants or TaxConstants()
+    family = dict(
+        has_spouse=has_spouse, adult_children=adult_children, parents=parents,
+        disabled_people=disabled_people, other_dependents=other_dependents,
+    )
+
+    sizes = [chunk_size] * (n_paths // chunk_size)
+    if n_paths % chunk_size:
+        sizes.append(n_paths % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [
+        (s, n, int(years), start, mu, sigma, chol, liquid_mask,
+         float(liabilities_wan), c, family, buffer_multiplier)
+        for s, n in zip(seeds, sizes)
+    ]
+
+    if workers is None:
+        workers = 1 if n_paths < _POOL_MIN_PATHS else None
+    if workers is not None and workers <= 1:
+        parts = [_simulate_chunk(j) for j in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_simulate_chunk, jobs))
+
+    paths = {k: np.concatenate([p[k] for p in parts], axis=0) for k in parts[0]}
+    pcts = tuple(float(p) for p in percentiles)
+    bands = {k: np.percentile(v, pcts, axis=0) for k, v in paths.items()}
+    return ProjectionResult(
+        years=np.arange(int(years) + 1),
+        percentiles=pcts,
+        bands=bands,
+        gap_probability=(paths["liquidity_gap_wan"] > 0).mean(axis=0),
+        n_paths=int(n_paths),
+        seed=seed,
+        rules_version=c.VERSION,
+        paths=paths if keep_paths else {},
+    )
@@ -0,0 +1,146 @@
+# src/domain/spousal_plan.py
+# 夫妻兩代遺產稅：婚後財產登記比例 × 剩餘財產差額分配請求比例 → 兩次繼承合計稅額最小
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from src.domain.tax_rules import TaxConstants, EstateTaxCalculator, SpouseProperty, surplus_claim_wan
+
+
+@dataclass
+class TwoDeathResult:
+    """
+    格點試算結果（金額單位：萬）：
+      - split_ratios：婚後財產登記於先身故者名下的比例（列）
+      - claim_ratios：生存配偶實際主張的差額分配比例（欄）
+      - 各矩陣形狀皆為 (len(split_ratios), len(claim_ratios))
+    """
+    split_ratios: np.ndarray
+    claim_ratios: np.ndarray
+    claim_wan: np.ndarray
+    first_tax_wan: np.ndarray
+    second_tax_wan: np.ndarray
+    current: Dict[str, float]
+    rules_version: str
+
+    @property
+    def total_tax_wan(self) -> np.ndarray:
+        return self.first_tax_wan + self.second_tax_wan
+
+    def point(self, i: int, j: int) -> Dict[str, float]:
+        return {
+            "split_ratio": float(self.split_ratios[i]),
+            "claim_ratio": float(self.claim_ratios[j]),
+            "claim_wan": float(self.claim_wan[i, j]),
+            "first_tax_wan": float(self.first_tax_wan[i, j]),
+            "second_tax_wan": float(self.second_tax_wan[i, j]),
+            "total_tax_wan": float(self.total_tax_wan[i, j]),
+        }
+
+    @property
+    def best(self) -> Dict[str, float]:
+        # 同稅額時取較小的請求比例與最接近現況的登記比例（argmin 取第一個）
+        total = self.total_tax_wan
+        order = np.abs(self.split_ratios - self.current["split_ratio"]).argsort(kind="stable")
+        i_sorted, j = np.unravel_index(np.argmin(total[order]), total.shape)
+        return self.point(int(order[i_sorted]), int(j))
+
+    def best_claim_for_split(self) -> np.ndarray:
+        """每個登記比例下的最適請求比例。"""
+        return self.claim_ratios[np.argmin(self.total_tax_wan, axis=1)]
+
+
+def statutory_spouse_share(adult_children: int, parents: int) -> float:
+    """配偶應繼分（民法第 1144 條）：與子女均分；與父母或兄弟姊妹共同繼承時 1/2。"""
+    if adult_children > 0:
+        return 1.0 / (adult_children + 1)
+    if parents > 0:
+        return 0.5
+    return 1.0
+
+
+def optimize_two_deaths(
+    first: SpouseProperty,
+    second: SpouseProperty,
+    *,
+    adult_children: int = 0,
+    parents: int = 0,
+    disabled_people: int = 0,
+    other_dependents: int = 0,
+    spouse_share: Optional[float] = None,
+    years_between: int = 0,
+    growth_rate: float = 0.0,
+    split_ratios: Sequence[float] | int = 101,
+    claim_ratios: Sequence[float] | int = 101,
+    constants: Optional[TaxConstants] = None,
+) -> TwoDeathResult:
+    """
+    first 先身故、second 後身故，兩次繼承的遺產稅一次算完整個格點：
+      1. 雙方婚後財產合計依 split_ratio 重新登記（婚前與無償取得財產不動）
+      2. 先身故時，生存配偶主張 claim_ratio × 差額分配請求額，自遺產中扣除
+      3. 生存配偶取得請求額與應繼分（spouse_share，預設法定應繼分），
+         經 years_between 年、年成長 growth_rate 後身故，無配偶扣除
+    子女、父母等扣除兩次繼承皆適用。101 × 101 格點約數毫秒。
+    """
+    c = constants or TaxConstants()
+    calc = EstateTaxCalculator(c)
+    s = np.linspace(0.0, 1.0, split_ratios) if isinstance(split_ratios, int) else np.asarray(split_ratios, dtype=float)
+    k = np.linspace(0.0, 1.0, claim_ratios) if isinstance(claim_ratios, int) else np.asarray(claim_ratios, dtype=float)
+    share = statutory_spouse_share(adult_children, parents) if spouse_share is None else float(spouse_share)
+    family = (adult_children, parents, disabled_people, other_dependents)
+
+    marital = first.marital_wan + second.marital_wan
+    m1 = s[:, None] * marital
+    m2 = marital - m1
+    surplus1 = np.maximum(m1 - first.debts_wan, 0.0)
+    surplus2 = np.maximum(m2 - second.debts_wan, 0.0)
+    net1 = np.maximum(m1 + first.separate_wan - first.debts_wan, 0.0)
+    net2 = np.maximum(m2 + second.separate_wan - second.debts_wan, 0.0)
+
+    claim = np.minimum(np.maximum((surplus1 - surplus2) / 2.0, 0.0) * k[None, :], net1)
+    ded1 = calc.compute_total_deductions_wan(True, *family)
+    estate1 = net1 - claim
+    tax1 = calc.progressive_tax_wan_batch(np.maximum(estate1 - c.EXEMPT_AMOUNT - ded1, 0.0))
+
+    inherited = share * (estate1 - tax1)
+    estate2 = (net2 + claim + inherited) * (1.0 + growth_rate) ** years_between
+    ded2 = calc.compute_total_deductions_wan(False, *family)
+    tax2 = calc.progressive_tax_wan_batch(np.maximum(estate2 - c.EXEMPT_AMOUNT - ded2, 0.0))
+
+    # 現況：目前登記比例、全額主張
+    current = _current_point(first, second, c, calc, share, family, years_between, growth_rate)
+    return TwoDeathResult(
+        split_ratios=s,
+        claim_ratios=k,
+        claim_wan=claim,
+        first_tax_wan=tax1,
+        second_tax_wan=tax2,
+        current=current,
+        rules_version=c.VERSION,
+    )
+
+
+def _current_point(first, second, c, calc, share, family, years_between, growth_rate) -> Dict[str, Any]:
+    marital = first.marital_wan + second.marital_wan
+    claim = min(surplus_claim_wan(first, second), first.net_wan)
+    d1 = calc.diagnose_yuan(
+        first.net_wan * c.UNIT_FACTOR, has_spouse=True, adult_children=family[0], parents=family[1],
+        disabled_people=family[2], other_dependents=family[3], surplus_claim_yuan=claim * c.UNIT_FACTOR,
+    )
+    tax1 = d1["tax_yuan"] / c.UNIT_FACTOR
+    estate2 = (second.net_wan + claim + share * (first.net_wan - claim - tax1)) * (1.0 + growth_rate) ** years_between
+    d2 = calc.diagnose_yuan(
+        estate2 * c.UNIT_FACTOR, has_spouse=False, adult_children=family[0], parents=family[1],
+        disabled_people=family[2], other_dependents=family[3],
+    )
+    tax2 = d2["tax_yuan"] / c.UNIT_FACTOR
+    return {
+        "split_ratio": first.marital_wan / marital if marital > 0 else 0.0,
+        "claim_ratio": 1.0,
+        "claim_wan": claim,
+        "first_tax_wan": tax1,
+        "second_tax_wan": tax2,
+        "total_tax_wan": tax1 + tax2,
+    }
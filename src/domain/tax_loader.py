@@ -1,58 +1,20 @@
 # src/domain/tax_loader.py
 from __future__ import annotations
 import json
+import threading
+from bisect import bisect_right
 from pathlib import Path
 from datetime import date, datetime
-from typing import Optional, Tuple, List
+from typing import Optional, Tuple, List, Dict
 
-from src.domain.tax_rules import TaxConstants
+from src.domain.tax_rules import TaxConstants, BracketTable, compile_brackets
 
 CONFIG_PATH = Path("src/domain/tax_config.json")
 
 def _parse_date(s: str) -> date:
     return datetime.strptime(s, "%Y-%m-%d").date()
 
-def load_tax_constants(
-    *,
-    on_date: Optional[date] = None,
-    version: Optional[str] = None,
-    config_path: Path = CONFIG_PATH
-) -> TaxConstants:
-    """
-    載入 JSON 設定，挑選最適用版本：
-      - 若指定 version，直接取該版本
-      - 否則用 on_date（預設 today）挑選 effective_from <= on_date 的最新版本
-    回傳 TaxConstants（單位：萬）
-    """
-    on = on_date or date.today()
-    data = json.loads(config_path.read_text(encoding="utf-8"))
-    versions = data.get("versions", [])
-    if not versions:
-        raise RuntimeError("tax_config.json 缺少 versions")
-
-    chosen = None
-    if version:
-        for v in versions:
-            if v.get("version") == version:
-                chosen = v
-                break
-        if not chosen:
-            raise RuntimeError(f"找不到版本：{version}")
-    else:
-        # 選 effective_from <= on 的最新
-        candidates = []
-        for v in versions:
-            eff = _parse_date(v.get("effective_from", "1900-01-01"))
-            if eff <= on:
-                candidates.append((eff, v))
-        if not candidates:
-            # 若沒有符合，就取最早一個
-            chosen = sorted(versions, key=lambda x: x.get("effective_from", ""))[0]
-        else:
-            chosen = sorted(candidates, key=lambda t: t[0])[-1][1]
-
-    # 組 TaxConstants
-    brackets_raw = chosen.get("brackets_wan", [])
+def _parse_brackets(brackets_raw) -> List[tuple]:
     brackets: List[tuple] = []
     for up, rate in brackets_raw:
         if isinstance(up, str) and up.lower() in ("inf", "infinite", "∞"):
@@ -60,6 +22,13 @@ def load_tax_constants(
         else:
             upper = float(up)
         brackets.append((upper, float(rate)))
+    return brackets
+
+def _build_constants(chosen: dict) -> TaxConstants:
+    defaults = TaxConstants()
+    brackets = _parse_brackets(chosen.get("brackets_wan", []))
+    gift_raw = chosen.get("gift_brackets_wan")
+    gift_brackets = _parse_brackets(gift_raw) if gift_raw else list(defaults.GIFT_TAX_BRACKETS)
 
     return TaxConstants(
         UNIT_FACTOR=float(chosen.get("unit_factor", 10000)),
@@ -72,5 +41,115 @@ def load_tax_constants(
         OTHER_DEPENDENTS_DEDUCTION=float(chosen["other_dependents_deduction_wan"]),
         TAX_BRACKETS=brackets,
         BUFFER_MULTIPLIER=float(chosen.get("buffer_multiplier", 1.10)),
-        VERSION=str(chosen.get("version", "unversioned"))
+        VERSION=str(chosen.get("version", "unversioned")),
+        GIFT_ANNUAL_EXCLUSION=float(chosen.get("gift_annual_exclusion_wan", defaults.GIFT_ANNUAL_EXCLUSION)),
+        GIFT_TAX_BRACKETS=gift_brackets,
+        GIFT_LOOKBACK_YEARS=int(chosen.get("gift_lookback_years", defaults.GIFT_LOOKBACK_YEARS)),
     )
+
+
+class TaxRuleRegistry:
+    """
+    稅則版本索引（全程序共用）：
+      - 僅在 tax_config.json 的 mtime / 大小變動時才重新解析
+      - 版本依 effective_from 排序，以 bisect 依日期查找（O(log n)）
+      - 每個版本只建立一次 TaxConstants 與編譯後級距表；回傳的是共用物件，請勿就地修改
+    """
+
+    def __init__(self, config_path: Path = CONFIG_PATH):
+        self.config_path = Path(config_path)
+        self._lock = threading.Lock()
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._dates: List[date] = []
+        self._ordered: List[TaxConstants] = []
+        self._by_version: Dict[str, TaxConstants] = {}
+        self._tables: Dict[str, BracketTable] = {}
+
+    def _refresh(self) -> None:
+        st = self.config_path.stat()
+        stamp = (st.st_mtime_ns, st.st_size)
+        if stamp == self._stamp:
+            return
+        with self._lock:
+            if stamp == self._stamp:
+                return
+            data = json.loads(self.config_path.read_text(encoding="utf-8"))
+            versions = data.get("versions", [])
+            if not versions:
+                raise RuntimeError("tax_config.json 缺少 versions")
+
+            # 沿用既有物件（內容未變者），讓同版本在重新載入後仍是同一個實例
+            built: List[TaxConstants] = []
+            for raw in versions:
+                fresh = _build_constants(raw)
+                prev = self._by_version.get(fresh.VERSION)
+                built.append(prev if prev == fresh else fresh)
+
+            by_version: Dict[str, TaxConstants] = {}
+            tables: Dict[str, BracketTable] = {}
+            for c in built:
+                by_version.setdefault(c.VERSION, c)
+                tables.setdefault(c.VERSION, compile_brackets(c.TAX_BRACKETS))
+
+            # 穩定排序：同一生效日時保留檔案中的先後順序
+            dated = sorted(
+                ((_parse_date(v.get("effective_from", "1900-01-01")), i) for i, v in enumerate(versions)),
+            )
+            dates = [eff for eff, _ in dated]
+            ordered = [built[i] for _, i in dated]
+
+            self._dates, self._ordered = dates, ordered
+            self._by_version, self._tables = by_version, tables
+            self._stamp = stamp
+
+    def versions(self) -> List[str]:
+        """依生效日排序的版本清單。"""
+        self._refresh()
+        return [c.VERSION for c in self._ordered]
+
+    def by_version(self, version: str) -> TaxConstants:
+        self._refresh()
+        c = self._by_version.get(version)
+        if c is None:
+            raise RuntimeError(f"找不到版本：{version}")
+        return c
+
+    def on_date(self, on: date) -> TaxConstants:
+        """effective_from <= on 的最新版本；若皆晚於 on，取最早一個。"""
+        self._refresh()
+        i = bisect_right(self._dates, on)
+        return self._ordered[i - 1] if i > 0 else self._ordered[0]
+
+    def bracket_table(self, version: str) -> BracketTable:
+        self.by_version(version)
+        return self._tables[version]
+
+
+_REGISTRIES: Dict[Path, TaxRuleRegistry] = {}
+_REGISTRIES_LOCK = threading.Lock()
+
+def get_registry(config_path: Path = CONFIG_PATH) -> TaxRuleRegistry:
+    """取得（或建立）該設定檔對應的共用 registry。"""
+    key = Path(config_path).resolve()
+    reg = _REGISTRIES.get(key)
+    if reg is None:
+        with _REGISTRIES_LOCK:
+            reg = _REGISTRIES.setdefault(key, TaxRuleRegistry(key))
+    return reg
+
+def load_tax_constants(
+    *,
+    on_date: Optional[date] = None,
+    version: Optional[str] = None,
+    config_path: Path = CONFIG_PATH
+) -> TaxConstants:
+    """
+    載入 JSON 設定，挑選最適用版本：
+      - 若指定 version，直接取該版本
+      - 否則用 on_date（預設 today）挑選 effective_from <= on_date 的最新版本
+    回傳 TaxConstants（單位：萬）；同一版本回傳同一個共用物件。
+    """
+    reg = get_registry(config_path)
+    if version:
+        return reg.by_version(version)
+    return reg.on_date(on_date or date.today())
@@ -0,0 +1,121 @@
+# src/domain/tax_memo.py
+# 遺產稅試算結果的共用 LRU 快取（全程序、跨 session 共用）
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from src.domain.tax_rules import TaxConstants, EstateTaxCalculator
+
+
+def rules_key(c: TaxConstants) -> Tuple:
+    """
+    稅則識別鍵：以 VERSION 為首，並帶上實際數值，
+    避免設定檔改了數字卻忘了改版本號時誤用舊結果。
+    """
+    return (
+        c.VERSION,
+        float(c.UNIT_FACTOR),
+        float(c.EXEMPT_AMOUNT),
+        float(c.FUNERAL_EXPENSE),
+        float(c.SPOUSE_DEDUCTION_VALUE),
+        float(c.ADULT_CHILD_DEDUCTION),
+        float(c.PARENTS_DEDUCTION),
+        float(c.DISABLED_DEDUCTION),
+        float(c.OTHER_DEPENDENTS_DEDUCTION),
+        tuple((float(u), float(r)) for u, r in c.TAX_BRACKETS),
+        float(c.BUFFER_MULTIPLIER),
+    )
+
+
+class TaxMemo:
+    """有上限的 LRU 快取；thread-safe，並記錄命中／未命中次數。"""
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = int(maxsize)
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hit_rate": (self.hits / total) if total else 0.0,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# 全站共用的遺產稅快取
+ESTATE_TAX_MEMO = TaxMemo()
+
+
+def memo_diagnose_yuan(
+    net_estate_yuan: float,
+    *,
+    has_spouse: bool,
+    adult_children: int,
+    parents: int,
+    disabled_people: int,
+    other_dependents: int,
+    buffer_multiplier: Optional[float] = None,
+    surplus_claim_yuan: float = 0.0,
+    constants: Optional[TaxConstants] = None,
+    memo: TaxMemo = ESTATE_TAX_MEMO,
+) -> Dict[str, Any]:
+    """
+    EstateTaxCalculator.diagnose_yuan 的快取版本（鍵含全部輸入與稅則）；
+    回傳副本，呼叫端可自由修改。
+    """
+    c = constants or TaxConstants()
+    key = (
+        "diagnose_yuan",
+        rules_key(c),
+        float(net_estate_yuan),
+        bool(has_spouse),
+        int(adult_children),
+        int(parents),
+        int(disabled_people),
+        int(other_dependents),
+        float(buffer_multiplier) if buffer_multiplier else None,
+        float(surplus_claim_yuan or 0.0),
+    )
+    result = memo.get_or_compute(
+        key,
+        lambda: EstateTaxCalculator(c).diagnose_yuan(
+            net_estate_yuan,
+            has_spouse=has_spouse,
+            adult_children=adult_children,
+            parents=parents,
+            disabled_people=disabled_people,
+            other_dependents=other_dependents,
+            buffer_multiplier=buffer_multiplier,
+            surplus_claim_yuan=surplus_claim_yuan,
+        ),
+    )
+    return dict(result)
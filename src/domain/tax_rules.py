@@ -1,7 +1,21 @@
 # src/domain/tax_rules.py
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import List, Dict, Any
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import List, Dict, Any, Mapping, Sequence, Tuple
+
+import numpy as np
+
+# 批次試算可接受的欄位（與 diagnose_yuan 的參數同名）
+BATCH_COLUMNS = (
+    "net_estate_yuan",
+    "has_spouse",
+    "adult_children",
+    "parents",
+    "disabled_people",
+    "other_dependents",
+)
 
 @dataclass
 class TaxConstants:
@@ -20,10 +34,191 @@ class TaxConstants:
     )
     BUFFER_MULTIPLIER: float = 1.10
     VERSION: str = "estate-tax-app-v1"
+    # 贈與稅（單位：萬）
+    GIFT_ANNUAL_EXCLUSION: float = 244.0
+    GIFT_TAX_BRACKETS: List[tuple] = (
+        (2811.0, 0.10),
+        (5621.0, 0.15),
+        (float("inf"), 0.20),
+    )
+    GIFT_LOOKBACK_YEARS: int = 2  # 死亡前 N 年內贈與併入遺產
+
+@dataclass(frozen=True)
+class BracketTable:
+    """
+    編譯後的累進級距表（單位：萬）：
+      - lowers / uppers / rates：各級距的下限、上限與稅率
+      - base_tax：進入該級距前已累計的稅額
+    稅額 = base_tax[i] + (課稅淨額 - lowers[i]) * rates[i]，i 以二分搜尋取得。
+    累計順序與逐段迴圈相同，結果逐位元一致。
+    """
+    lowers: Tuple[float, ...]
+    uppers: Tuple[float, ...]
+    rates: Tuple[float, ...]
+    base_tax: Tuple[float, ...]
+    n_brackets: int  # 原始級距數（不含最高級距有限時補上的 0% 哨兵段）
+    _np: Dict[str, np.ndarray] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # 向量化計算用的唯讀 numpy 欄位，建表時一併備妥
+        arrays = {}
+        for name in ("lowers", "uppers", "rates", "base_tax"):
+            arr = np.asarray(getattr(self, name), dtype=float)
+            arr.setflags(write=False)
+            arrays[name] = arr
+        object.__setattr__(self, "_np", arrays)
+
+    def index(self, taxable_base_wan: float) -> int:
+        return min(bisect_left(self.uppers, taxable_base_wan), len(self.uppers) - 1)
+
+    def tax(self, taxable_base_wan: float) -> float:
+        if taxable_base_wan <= 0:
+            return 0.0
+        i = self.index(taxable_base_wan)
+        return max(self.base_tax[i] + (taxable_base_wan - self.lowers[i]) * self.rates[i], 0.0)
+
+    def tax_array(self, taxable_base_wan) -> np.ndarray:
+        base = np.asarray(taxable_base_wan, dtype=float)
+        a = self._np
+        i = np.minimum(np.searchsorted(a["uppers"], base, side="left"), len(self.uppers) - 1)
+        tax = a["base_tax"][i] + (base - a["lowers"][i]) * a["rates"][i]
+        return np.where(base > 0, np.maximum(tax, 0.0), 0.0)
+
+    def marginal_rate(self, taxable_base_wan: float) -> float:
+        if taxable_base_wan <= 0:
+            return 0.0
+        return self.rates[self.index(taxable_base_wan)]
+
+    def inverse_tax(self, tax_wan: float) -> float:
+        """
+        反推：稅額達 tax_wan 所需的最小課稅淨額（萬）。
+        稅額為課稅淨額的分段線性遞增函數，因此可直接在累計稅額上二分搜尋後解一次方程。
+        目標稅額超出可達上限（最高級距有上限）時回傳 inf。
+        """
+        if tax_wan <= 0:
+            return 0.0
+        i = bisect_left(self.base_tax, tax_wan) - 1
+        if self.rates[i] <= 0:
+            return float("inf")
+        return self.lowers[i] + (tax_wan - self.base_tax[i]) / self.rates[i]
+
+    def inverse_tax_array(self, tax_wan) -> np.ndarray:
+        t = np.asarray(tax_wan, dtype=float)
+        a = self._np
+        i = np.maximum(np.searchsorted(a["base_tax"], t, side="left") - 1, 0)
+        rate = a["rates"][i]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            base = np.where(rate > 0, a["lowers"][i] + (t - a["base_tax"][i]) / rate, np.inf)
+        return np.where(t > 0, base, 0.0)
+
+    def rate_floor(self, rate: float) -> float:
+        """邊際稅率首次達到 rate 的課稅淨額（萬）；沒有任何級距達到時回傳 inf。"""
+        for lower, r in zip(self.lowers, self.rates):
+            if r >= rate:
+                return lower
+        return float("inf")
+
+    def breakdown(self, taxable_base_wan: float) -> List[float]:
+        """各級距稅額拆解（長度 = 原始級距數）。"""
+        parts = [0.0] * self.n_brackets
+        if taxable_base_wan <= 0:
+            return parts
+        i = self.index(taxable_base_wan)
+        for j in range(min(i, self.n_brackets)):
+            parts[j] = (self.uppers[j] - self.lowers[j]) * self.rates[j]
+        if i < self.n_brackets:
+            parts[i] = max(taxable_base_wan - self.lowers[i], 0.0) * self.rates[i]
+        return parts
+
+
+@lru_cache(maxsize=32)
+def _compile(brackets: Tuple[Tuple[float, float], ...]) -> BracketTable:
+    lowers: List[float] = []
+    uppers: List[float] = []
+    rates: List[float] = []
+    base_tax: List[float] = []
+    acc = 0.0
+    prev = 0.0
+    for upper, rate in brackets:
+        lowers.append(prev)
+        uppers.append(upper)
+        rates.append(rate)
+        base_tax.append(acc)
+        acc += max(upper - prev, 0.0) * rate
+        prev = upper
+    if not uppers or uppers[-1] != float("inf"):
+        # 最高級距有上限時，超出部分不課稅（與逐段迴圈行為一致）
+        lowers.append(prev)
+        uppers.append(float("inf"))
+        rates.append(0.0)
+        base_tax.append(acc)
+    return BracketTable(
+        lowers=tuple(lowers),
+        uppers=tuple(uppers),
+        rates=tuple(rates),
+        base_tax=tuple(base_tax),
+        n_brackets=len(brackets),
+    )
+
+
+def compile_brackets(brackets: Sequence[Tuple[float, float]]) -> BracketTable:
+    """
+    將 [(上限, 稅率), ...] 編譯為 BracketTable；相同級距只編譯一次（各版本常數共用）。
+    所有遺產稅計算路徑（tax_rules、legacy 計算器、頁面、圖表）皆委派至此。
+    """
+    return _compile(tuple((float(up), float(rate)) for up, rate in brackets))
+
+
+def _split_batch(values, value_key: str, **family) -> Tuple[Any, Dict[str, Any]]:
+    """
+    批次輸入拆解：values 可為陣列，或含 value_key 與家庭欄位（BATCH_COLUMNS）的 DataFrame / dict；
+    表中缺少的家庭欄位以 family 關鍵字參數補上。
+    """
+    cols: Dict[str, Any] = dict(family)
+    if hasattr(values, "columns") or isinstance(values, Mapping):
+        frame = values
+        keys = set(frame.columns) if hasattr(frame, "columns") else set(frame.keys())
+        for k in BATCH_COLUMNS[1:]:
+            if k in keys:
+                cols[k] = frame[k]
+        values = frame[value_key]
+    return values, cols
+
+
+@dataclass(frozen=True)
+class SpouseProperty:
+    """
+    配偶一方的財產（單位：萬）：
+      - marital_wan：婚後財產（列入剩餘財產差額分配）
+      - separate_wan：婚前財產及繼承、受贈、慰撫金等無償取得者（不列入分配，但屬遺產）
+      - debts_wan：婚後負債（先自婚後財產扣除）
+    """
+    marital_wan: float
+    separate_wan: float = 0.0
+    debts_wan: float = 0.0
+
+    @property
+    def surplus_wan(self) -> float:
+        """現存婚後財產扣除婚後債務後的剩餘（民法第 1030-1 條）。"""
+        return max(self.marital_wan - self.debts_wan, 0.0)
+
+    @property
+    def net_wan(self) -> float:
+        return max(self.marital_wan + self.separate_wan - self.debts_wan, 0.0)
+
+
+def surplus_claim_wan(decedent: SpouseProperty, survivor: SpouseProperty) -> float:
+    """
+    生存配偶可請求的剩餘財產差額分配（單位：萬）：雙方剩餘財產差額的一半；
+    被繼承人剩餘較少時為 0。請求額可自遺產總額中扣除（遺產及贈與稅法第 17-1 條）。
+    """
+    return max((decedent.surplus_wan - survivor.surplus_wan) / 2.0, 0.0)
+
 
 class EstateTaxCalculator:
     def __init__(self, constants: TaxConstants | None = None):
         self.c = constants or TaxConstants()
+        self.brackets = compile_brackets(self.c.TAX_BRACKETS)
 
     def _yuan_to_wan(self, amount_yuan: float) -> float:
         return float(amount_yuan) / self.c.UNIT_FACTOR
@@ -56,15 +251,23 @@ class EstateTaxCalculator:
         return max(net_estate_wan - self.c.EXEMPT_AMOUNT - total_deductions_wan, 0.0)
 
     def progressive_tax_wan(self, taxable_base_wan: float) -> float:
-        tax = 0.0
-        prev_upper = 0.0
-        for upper, rate in self.c.TAX_BRACKETS:
-            if taxable_base_wan <= prev_upper:
-                break
-            chunk = min(taxable_base_wan, upper) - prev_upper
-            tax += max(chunk, 0.0) * rate
-            prev_upper = upper
-        return max(tax, 0.0)
+        return self.brackets.tax(taxable_base_wan)
+
+    def progressive_tax_wan_batch(self, taxable_base_wan) -> np.ndarray:
+        """progressive_tax_wan 的向量化版本：一次處理整個陣列（單位：萬）。"""
+        return self.brackets.tax_array(taxable_base_wan)
+
+    def _batch_deductions_wan(self, cols: Dict[str, Any], shape) -> np.ndarray:
+        spouse = np.asarray(cols["has_spouse"], dtype=bool)
+        deductions_wan = (
+            np.where(spouse, self.c.SPOUSE_DEDUCTION_VALUE, 0.0)
+            + self.c.FUNERAL_EXPENSE
+            + np.asarray(cols["adult_children"]) * self.c.ADULT_CHILD_DEDUCTION
+            + np.asarray(cols["parents"]) * self.c.PARENTS_DEDUCTION
+            + np.asarray(cols["disabled_people"]) * self.c.DISABLED_DEDUCTION
+            + np.asarray(cols["other_dependents"]) * self.c.OTHER_DEPENDENTS_DEDUCTION
+        )
+        return np.broadcast_to(deductions_wan, np.broadcast_shapes(shape, np.shape(deductions_wan))).astype(float)
 
     def diagnose_yuan(
         self,
@@ -76,8 +279,11 @@ class EstateTaxCalculator:
         disabled_people: int,
         other_dependents: int,
         buffer_multiplier: float | None = None,
+        surplus_claim_yuan: float = 0.0,
     ) -> Dict[str, Any]:
-        net_wan = self._yuan_to_wan(net_estate_yuan)
+        """surplus_claim_yuan：生存配偶主張的剩餘財產差額分配，先自淨遺產扣除。"""
+        claim_wan = max(min(self._yuan_to_wan(surplus_claim_yuan), self._yuan_to_wan(net_estate_yuan)), 0.0)
+        net_wan = self._yuan_to_wan(net_estate_yuan) - claim_wan
         deductions_wan = self.compute_total_deductions_wan(
             has_spouse, adult_children, parents, disabled_people, other_dependents
         )
@@ -90,9 +296,152 @@ class EstateTaxCalculator:
             "rules_version": self.c.VERSION,
             "unit_factor": self.c.UNIT_FACTOR,
             "exempt_amount_wan": self.c.EXEMPT_AMOUNT,
+            "surplus_claim_wan": claim_wan,
+            "deductions_wan": deductions_wan,
+            "taxable_base_wan": base_wan,
+            "tax_yuan": tax_yuan,
+            "recommended_liquidity_yuan": liquidity_needed_yuan,
+            "buffer_multiplier": buf,
+        }
+
+    def diagnose_batch(
+        self,
+        net_estate_yuan,
+        *,
+        has_spouse=False,
+        adult_children=0,
+        parents=0,
+        disabled_people=0,
+        other_dependents=0,
+        buffer_multiplier: float | None = None,
+        surplus_claim_yuan=0.0,
+    ) -> Dict[str, Any]:
+        """
+        批次版 diagnose_yuan：一次向量化計算整批案件。
+          - net_estate_yuan 可為陣列，或含 BATCH_COLUMNS 欄位的 DataFrame / dict
+            （缺少的家庭欄位以關鍵字參數的值補上）
+          - 家庭欄位可為純量（整批共用）或與 net_estate_yuan 等長的陣列
+        回傳欄位與 diagnose_yuan 相同，數值欄位為 numpy 陣列，逐列結果與 diagnose_yuan 一致。
+        """
+        net_estate_yuan, cols = _split_batch(
+            net_estate_yuan, "net_estate_yuan",
+            has_spouse=has_spouse, adult_children=adult_children, parents=parents,
+            disabled_people=disabled_people, other_dependents=other_dependents,
+        )
+        gross_wan = np.asarray(net_estate_yuan, dtype=float) / self.c.UNIT_FACTOR
+        claim_wan = np.maximum(np.minimum(np.asarray(surplus_claim_yuan, dtype=float) / self.c.UNIT_FACTOR, gross_wan), 0.0)
+        net_wan = gross_wan - claim_wan
+        deductions_wan = self._batch_deductions_wan(cols, net_wan.shape)
+        base_wan = np.maximum(net_wan - self.c.EXEMPT_AMOUNT - deductions_wan, 0.0)
+        tax_wan = self.progressive_tax_wan_batch(base_wan)
+        tax_yuan = tax_wan * self.c.UNIT_FACTOR
+        buf = float(buffer_multiplier or self.c.BUFFER_MULTIPLIER)
+        # np.rint 與內建 round 同為「四捨六入五成雙」，確保與 diagnose_yuan 逐列一致
+        liquidity_needed_yuan = np.rint(tax_yuan * buf).astype(np.int64)
+        return {
+            "rules_version": self.c.VERSION,
+            "unit_factor": self.c.UNIT_FACTOR,
+            "exempt_amount_wan": self.c.EXEMPT_AMOUNT,
+            "surplus_claim_wan": np.broadcast_to(claim_wan, net_wan.shape),
             "deductions_wan": deductions_wan,
             "taxable_base_wan": base_wan,
             "tax_yuan": tax_yuan,
             "recommended_liquidity_yuan": liquidity_needed_yuan,
             "buffer_multiplier": buf,
         }
+
+    # ---- 反推：目標稅額／稅源 → 所需淨遺產 ----
+    def required_net_estate_yuan(
+        self,
+        target_tax_yuan: float,
+        *,
+        has_spouse: bool,
+        adult_children: int,
+        parents: int,
+        disabled_people: int,
+        other_dependents: int,
+    ) -> float:
+        """
+        稅額剛好達到 target_tax_yuan 的淨遺產（元）；淨遺產超過此值即「稅額超過 X」。
+        target 為 0 時回傳開始課稅的門檻（免稅額＋扣除額）。
+        """
+        deductions_wan = self.compute_total_deductions_wan(
+            has_spouse, adult_children, parents, disabled_people, other_dependents
+        )
+        base_wan = self.brackets.inverse_tax(self._yuan_to_wan(target_tax_yuan))
+        return self._wan_to_yuan(base_wan + self.c.EXEMPT_AMOUNT + deductions_wan)
+
+    def required_net_estate_for_liquidity_yuan(
+        self,
+        liquidity_yuan: float,
+        *,
+        has_spouse: bool,
+        adult_children: int,
+        parents: int,
+        disabled_people: int,
+        other_dependents: int,
+        buffer_multiplier: float | None = None,
+    ) -> float:
+        """建議預留稅源（稅額 × 緩衝倍數）達到 liquidity_yuan 的淨遺產（元，未四捨五入前）。"""
+        buf = float(buffer_multiplier or self.c.BUFFER_MULTIPLIER)
+        return self.required_net_estate_yuan(
+            float(liquidity_yuan) / buf,
+            has_spouse=has_spouse, adult_children=adult_children, parents=parents,
+            disabled_people=disabled_people, other_dependents=other_dependents,
+        )
+
+    def bracket_entry_net_estate_yuan(
+        self,
+        rate: float,
+        *,
+        has_spouse: bool,
+        adult_children: int,
+        parents: int,
+        disabled_people: int,
+        other_dependents: int,
+    ) -> float:
+        """進入邊際稅率 rate（例如 0.20）之前可持有的最高淨遺產（元）。"""
+        deductions_wan = self.compute_total_deductions_wan(
+            has_spouse, adult_children, parents, disabled_people, other_dependents
+        )
+        return self._wan_to_yuan(self.brackets.rate_floor(rate) + self.c.EXEMPT_AMOUNT + deductions_wan)
+
+    def required_net_estate_batch(
+        self,
+        target_yuan,
+        *,
+        kind: str = "tax",
+        has_spouse=False,
+        adult_children=0,
+        parents=0,
+        disabled_people=0,
+        other_dependents=0,
+        buffer_multiplier: float | None = None,
+    ) -> Dict[str, Any]:
+        """
+        批次反推：多組家庭條件一次解完。
+          - kind="tax"：target 為目標稅額（元）；kind="liquidity"：target 為建議預留稅源（元）
+          - target_yuan 可為陣列，或含 target_yuan 與家庭欄位的 DataFrame / dict
+        """
+        if kind not in ("tax", "liquidity"):
+            raise ValueError(f"不支援的 kind：{kind}")
+        target_yuan, cols = _split_batch(
+            target_yuan, "target_yuan",
+            has_spouse=has_spouse, adult_children=adult_children, parents=parents,
+            disabled_people=disabled_people, other_dependents=other_dependents,
+        )
+        target = np.asarray(target_yuan, dtype=float)
+        buf = float(buffer_multiplier or self.c.BUFFER_MULTIPLIER)
+        if kind == "liquidity":
+            target = target / buf
+        base_wan = self.brackets.inverse_tax_array(target / self.c.UNIT_FACTOR)
+        deductions_wan = self._batch_deductions_wan(cols, base_wan.shape)
+        net_wan = base_wan + self.c.EXEMPT_AMOUNT + deductions_wan
+        return {
+            "rules_version": self.c.VERSION,
+            "kind": kind,
+            "buffer_multiplier": buf,
+            "deductions_wan": deductions_wan,
+            "taxable_base_wan": base_wan,
+            "net_estate_yuan": net_wan * self.c.UNIT_FACTOR,
+        }
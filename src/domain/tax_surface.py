@@ -0,0 +1,122 @@
+# src/domain/tax_surface.py
+# 遺產稅敏感度曲面：資產級距 × 家庭扣除組合，一次向量化算完，供頁面直接索引
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from src.domain.tax_rules import TaxConstants, EstateTaxCalculator
+
+# (has_spouse, adult_children, parents, disabled_people, other_dependents)
+Profile = Tuple[bool, int, int, int, int]
+
+
+def profile_grid(
+    *,
+    max_children: int = 10,
+    max_parents: int = 2,
+    max_other: int = 5,
+) -> List[Profile]:
+    """列舉頁面可輸入的家庭組合（身心障礙人數不超過配偶＋子女＋父母）。"""
+    out: List[Profile] = []
+    for spouse in (False, True):
+        for children in range(max_children + 1):
+            for parents in range(max_parents + 1):
+                max_disabled = (1 if spouse else 0) + children + parents
+                for disabled in range(max_disabled + 1):
+                    for other in range(max_other + 1):
+                        out.append((spouse, children, parents, disabled, other))
+    return out
+
+
+@dataclass(frozen=True)
+class TaxSurface:
+    """
+    預先計算的稅額曲面（單位：萬）：
+      - tax_wan[i, j]：資產 asset_levels_wan[i]、扣除合計 deductions_wan[j] 時的稅額
+      - bracket_idx[i, j]：所在級距（用於邊際稅率）
+    扣除額只以合計影響稅額，因此相同扣除合計的家庭組合共用同一欄。
+    """
+    rules_version: str
+    exempt_amount_wan: float
+    asset_levels_wan: np.ndarray
+    deductions_wan: np.ndarray
+    tax_wan: np.ndarray
+    bracket_idx: np.ndarray
+    rates: np.ndarray
+    profile_column: Dict[Profile, int]
+
+    def column(self, profile: Profile) -> int:
+        return self.profile_column[_normalize(profile)]
+
+    def row(self, total_assets_wan: float) -> int:
+        i = int(np.searchsorted(self.asset_levels_wan, total_assets_wan))
+        if i >= len(self.asset_levels_wan) or self.asset_levels_wan[i] != total_assets_wan:
+            raise KeyError(f"資產 {total_assets_wan} 不在曲面格點上")
+        return i
+
+    def lookup(self, total_assets_wan: float, profile: Profile) -> Dict[str, float]:
+        """索引單一格點：不重新計算稅額。找不到格點或家庭組合時拋出 KeyError。"""
+        i, j = self.row(total_assets_wan), self.column(profile)
+        deductions = float(self.deductions_wan[j])
+        tax = float(self.tax_wan[i, j])
+        return {
+            "deductions_wan": deductions,
+            "taxable_base_wan": max(total_assets_wan - self.exempt_amount_wan - deductions, 0.0),
+            "tax_wan": tax,
+            "effective_rate": tax / total_assets_wan if total_assets_wan > 0 else 0.0,
+            "marginal_rate": float(self.rates[self.bracket_idx[i, j]]),
+        }
+
+    def curve(self, profile: Profile) -> Dict[str, np.ndarray]:
+        """單一家庭組合沿資產軸的稅額、有效稅率與邊際稅率。"""
+        j = self.column(profile)
+        tax = self.tax_wan[:, j]
+        assets = self.asset_levels_wan
+        return {
+            "asset_levels_wan": assets,
+            "tax_wan": tax,
+            "effective_rate": np.divide(tax, assets, out=np.zeros_like(tax), where=assets > 0),
+            "marginal_rate": self.rates[self.bracket_idx[:, j]],
+        }
+
+
+def _normalize(profile: Profile) -> Profile:
+    spouse, children, parents, disabled, other = profile
+    return (bool(spouse), int(children), int(parents), int(disabled), int(other))
+
+
+def build_tax_surface(
+    constants: TaxConstants,
+    asset_levels_wan: Iterable[float],
+    profiles: Iterable[Profile],
+) -> TaxSurface:
+    calc = EstateTaxCalculator(constants)
+    table = calc.brackets
+
+    profile_list = [_normalize(p) for p in profiles]
+    deds = np.array([
+        calc.compute_total_deductions_wan(s, c, p, d, o) for s, c, p, d, o in profile_list
+    ], dtype=float)
+    unique_deds, inverse = np.unique(deds, return_inverse=True)
+
+    assets = np.asarray(list(asset_levels_wan), dtype=float)
+    base = np.maximum(assets[:, None] - constants.EXEMPT_AMOUNT - unique_deds[None, :], 0.0)
+    tax = table.tax_array(base)
+    idx = np.minimum(np.searchsorted(table.uppers, base, side="left"), len(table.uppers) - 1)
+    rates = np.append(np.asarray(table.rates, dtype=float), 0.0)
+    idx = np.where(base > 0, idx, len(rates) - 1).astype(np.int8)
+
+    for arr in (assets, unique_deds, tax, idx, rates):
+        arr.setflags(write=False)
+    return TaxSurface(
+        rules_version=constants.VERSION,
+        exempt_amount_wan=float(constants.EXEMPT_AMOUNT),
+        asset_levels_wan=assets,
+        deductions_wan=unique_deds,
+        tax_wan=tax,
+        bracket_idx=idx,
+        rates=rates,
+        profile_column={p: int(j) for p, j in zip(profile_list, inverse.ravel())},
+    )
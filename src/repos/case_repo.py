@@ -51,6 +51,16 @@ class CaseRepo:
         row = cur.fetchone()
         return dict(row) if row else None
 
+    @staticmethod
+    def list_cases(advisor_id: str | None = None):
+        """全部案件（或指定顧問的案件），依 id 排序。"""
+        sql = f"SELECT * FROM {CaseRepo.TBL}"
+        args = ()
+        if advisor_id:
+            sql += " WHERE advisor_id=?"
+            args = (advisor_id,)
+        return [dict(r) for r in get_conn().execute(sql + " ORDER BY id", args).fetchall()]
+
     @staticmethod
     def update_status(case_id: str, status: str):
         get_conn().execute(
@@ -0,0 +1,99 @@
+# src/services/batch_pool.py
+"""
+批次工作共用骨架（batch_runner、report_batch 共用）：
+- process pool：各 worker 以 initializer 建立一次共用狀態，放在 WORKER
+- 在途區塊數有上限：工作可由 generator 逐塊產生，記憶體維持固定
+- manifest.csv 邊完成邊寫入暫存檔，結束後以 os.replace 換上；summary.json 同樣原子寫入
+- 每隔 progress_every 秒印出進度
+"""
+from __future__ import annotations
+
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+# worker 端的共用物件（由各批次的 initializer 建立一次）
+WORKER: Dict[str, Any] = {}
+
+
+@dataclass
+class BatchResult:
+    done: int
+    errors: int
+    elapsed_s: float
+    workers: int
+
+    @property
+    def per_s(self) -> Optional[float]:
+        return round(self.done / self.elapsed_s, 2) if self.elapsed_s > 0 else None
+
+
+def write_json(path: Path, data: Dict[str, Any]) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def run_pool(
+    tasks: Iterable[tuple],
+    fn: Callable[..., List[Dict[str, Any]]],
+    *,
+    manifest_path: Path,
+    fields: Sequence[str],
+    initializer: Callable[..., None],
+    initargs: tuple = (),
+    workers: Optional[int] = None,
+    rows: Sequence[Dict[str, Any]] = (),
+    unit: str = "列",
+    progress_every: float = 2.0,
+) -> BatchResult:
+    """
+    以 fn(*task) 處理每個工作區塊（回傳逐列結果，各含 status），結果寫入 manifest。
+    rows 為不需送進 pool 的既有結果（如找不到的案件），先寫入 manifest。
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 2
+    done = errors = 0
+    t0 = last = time.perf_counter()
+    tmp = manifest_path.with_name(manifest_path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8-sig", newline="") as mf, \
+            ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+        writer = csv.DictWriter(mf, fieldnames=list(fields), extrasaction="ignore")
+        writer.writeheader()
+
+        def record(recs: Iterable[Dict[str, Any]]) -> None:
+            nonlocal done, errors
+            for rec in recs:
+                writer.writerow(rec)
+                done += 1
+                errors += rec["status"] != "ok"
+
+        record(rows)
+        pending = set()
+
+        def drain() -> None:
+            nonlocal last
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                pending.discard(fut)
+                record(fut.result())
+            now = time.perf_counter()
+            if now - last >= progress_every:
+                last = now
+                print(f"已處理 {done:,} {unit}｜{done / (now - t0):,.1f} {unit}/秒｜錯誤 {errors}", file=sys.stderr)
+
+        for task in tasks:
+            pending.add(pool.submit(fn, *task))
+            # 在途區塊有上限：產生工作的速度不會超前運算太多
+            while len(pending) >= max_in_flight:
+                drain()
+        while pending:
+            drain()
+    os.replace(tmp, manifest_path)
+    return BatchResult(done=done, errors=errors, elapsed_s=time.perf_counter() - t0, workers=workers)
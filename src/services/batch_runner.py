@@ -0,0 +1,208 @@
+# src/services/batch_runner.py
+"""
+批次產出客戶報告（無介面）：
+
+    python -m src.services.batch_runner clients.csv --out data/batch/2024Q1 --workers 4
+
+CSV 欄位（空白者以預設值補上；有填但無法解析的數值欄位，該列記為錯誤並指明欄位）：
+  client_id, name, age, gender, budget, currency, pay_years, goals（以「、」或「,」分隔）,
+  total_assets_wan, has_spouse, adult_children, parents, disabled_people, other_dependents
+
+以固定大小的區塊串流讀入，同時在途的區塊數有上限，因此 10 萬列的檔案也只占用少量記憶體。
+每位客戶執行 recommend_strategies 與遺產稅試算，PDF 於 process pool 中產生；
+輸出目錄含 pdf/、manifest.csv（逐列結果）與 summary.json（總計與吞吐量）。
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import math
+import os
+import sys
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.services.batch_pool import WORKER, run_pool, write_json
+
+MANIFEST_FIELDS = [
+    "row", "client_id", "name", "status", "error", "pdf",
+    "tier", "n_strategies", "tax_wan", "recommended_liquidity_wan",
+]
+_TRUE = {"1", "true", "t", "yes", "y", "是", "有"}
+
+
+def _init_worker(out_dir: str, fx_rate: float, make_pdf: bool) -> None:
+    from src.domain.tax_loader import load_tax_constants
+    from src.domain.tax_rules import EstateTaxCalculator
+
+    WORKER["calc"] = EstateTaxCalculator(load_tax_constants())
+    WORKER["out_dir"] = Path(out_dir)
+    WORKER["fx_rate"] = fx_rate
+    WORKER["make_pdf"] = make_pdf
+
+
+def _float(row: Dict[str, str], field: str, default: float = 0.0) -> float:
+    """空白取預設值；有填但無法解析（或非有限數）時拋出 ValueError 並指明欄位。"""
+    raw = (row.get(field) or "").strip()
+    if not raw:
+        return default
+    try:
+        v = float(raw.replace(",", ""))
+    except ValueError:
+        raise ValueError(f"欄位 {field} 無法解析：{raw!r}") from None
+    if not math.isfinite(v):
+        raise ValueError(f"欄位 {field} 無法解析：{raw!r}")
+    return v
+
+
+def _int(row: Dict[str, str], field: str, default: int = 0) -> int:
+    v = _float(row, field, default)
+    if v != int(v):
+        raise ValueError(f"欄位 {field} 應為整數：{row.get(field)!r}")
+    return int(v)
+
+
+def _safe_name(s: str) -> str:
+    keep = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in s)
+    return keep.strip("_") or "client"
+
+
+def _process_row(row_no: int, row: Dict[str, str]) -> Dict[str, Any]:
+    from legacy_tools.modules.insurance_logic import budget_tier, recommend_strategies
+    from legacy_tools.modules.pdf_generator import generate_pdf
+    from src.domain.tax_memo import memo_diagnose_yuan
+
+    client_id = (row.get("client_id") or "").strip() or f"row{row_no}"
+    name = (row.get("name") or "").strip()
+    out: Dict[str, Any] = {"row": row_no, "client_id": client_id, "name": name, "status": "ok", "error": "", "pdf": ""}
+    try:
+        currency = (row.get("currency") or "TWD").strip().upper()
+        budget = _float(row, "budget")
+        pay_years = max(_int(row, "pay_years", 10), 1)
+        goals = [g.strip() for g in (row.get("goals") or "").replace("、", ",").split(",") if g.strip()]
+        recs = recommend_strategies(
+            age=_int(row, "age", 45), gender=row.get("gender") or "不分",
+            budget=budget, currency=currency, pay_years=pay_years, goals=goals,
+            fx_rate=WORKER["fx_rate"],
+        )
+        tier = budget_tier(budget, currency, WORKER["fx_rate"])
+
+        calc = WORKER["calc"]
+        total_wan = _float(row, "total_assets_wan")
+        diag = memo_diagnose_yuan(
+            total_wan * calc.c.UNIT_FACTOR,
+            has_spouse=(row.get("has_spouse") or "").strip().lower() in _TRUE,
+            adult_children=_int(row, "adult_children"),
+            parents=_int(row, "parents"),
+            disabled_people=_int(row, "disabled_people"),
+            other_dependents=_int(row, "other_dependents"),
+            constants=calc.c,
+        )
+        tax_wan = diag["tax_yuan"] / calc.c.UNIT_FACTOR
+        need_wan = diag["recommended_liquidity_yuan"] / calc.c.UNIT_FACTOR
+        out.update(tier=tier, n_strategies=len(recs), tax_wan=round(tax_wan, 2),
+                   recommended_liquidity_wan=round(need_wan, 2))
+
+        if WORKER["make_pdf"]:
+            lines = [
+                f"客戶：{name or client_id}",
+                f"總預算：{budget:,.0f} 萬 {currency}｜繳費年期：{pay_years} 年｜分級：{tier}",
+                f"目標：{'、'.join(goals) if goals else '（未填）'}",
+                "",
+                f"總資產（萬元）：{total_wan:,.0f}",
+                f"預估遺產稅（萬元）：{tax_wan:,.0f}",
+                f"建議預留稅源（萬元）：{need_wan:,.0f}",
+                f"稅則版本：{diag['rules_version']}",
+                "",
+                "—— 策略清單 ——",
+            ]
+            for i, s in enumerate(recs, 1):
+                lines += [f"{i}. {s['name']}", f"   觀念：{s['why']}", f"   作法：{s['description']}", ""]
+            buf = generate_pdf("\n".join(lines), title="傳承與保單策略建議",
+                               footer_text="永傳家族辦公室｜www.gracefo.com｜123@gracefo.com")
+            pdf_path = WORKER["out_dir"] / "pdf" / f"{row_no:06d}_{_safe_name(client_id)}.pdf"
+            tmp = pdf_path.with_suffix(".pdf.tmp")
+            tmp.write_bytes(buf.getvalue())
+            os.replace(tmp, pdf_path)
+            out["pdf"] = str(pdf_path.relative_to(WORKER["out_dir"]))
+    except Exception as e:  # 單列失敗不中斷整批
+        out.update(status="error", error=f"{type(e).__name__}: {e}")
+    return out
+
+
+def _process_chunk(start: int, rows: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    return [_process_row(start + i, r) for i, r in enumerate(rows)]
+
+
+def _chunks(path: Path, size: int, limit: Optional[int]) -> Iterator[tuple]:
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        rows = reader if limit is None else islice(reader, limit)
+        start = 1
+        while True:
+            chunk = list(islice(rows, size))
+            if not chunk:
+                return
+            yield start, chunk
+            start += len(chunk)
+
+
+def run(
+    input_csv: Path,
+    out_dir: Path,
+    *,
+    workers: Optional[int] = None,
+    chunk_size: int = 50,
+    make_pdf: bool = True,
+    limit: Optional[int] = None,
+    progress_every: float = 2.0,
+) -> Dict[str, Any]:
+    from legacy_tools.modules.fx import get_fx_service
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / "pdf").mkdir(exist_ok=True)
+    fx = get_fx_service().quote("USD/TWD")  # 整批共用同一匯率
+    manifest_path = out_dir / "manifest.csv"
+    result = run_pool(
+        _chunks(input_csv, chunk_size, limit), _process_chunk,
+        manifest_path=manifest_path, fields=MANIFEST_FIELDS,
+        initializer=_init_worker, initargs=(str(out_dir), fx.rate, make_pdf),
+        workers=workers, unit="列", progress_every=progress_every,
+    )
+    summary = {
+        "input": str(input_csv),
+        "rows": result.done,
+        "errors": result.errors,
+        "elapsed_s": round(result.elapsed_s, 3),
+        "rows_per_s": result.per_s,
+        "workers": result.workers,
+        "pdf": make_pdf,
+        "fx": {"pair": fx.pair, "rate": fx.rate, "as_of": fx.as_of.isoformat(), "source": fx.source},
+        "manifest": manifest_path.name,
+    }
+    write_json(out_dir / "summary.json", summary)
+    print(f"完成 {result.done:,} 列（錯誤 {result.errors}），{summary['rows_per_s']} 列/秒 → {out_dir}", file=sys.stderr)
+    return summary
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m src.services.batch_runner", description="批次產出客戶策略與遺產稅報告")
+    ap.add_argument("input", type=Path, help="客戶 CSV（UTF-8）")
+    ap.add_argument("--out", type=Path, default=Path("data/batch"), help="輸出目錄（預設 data/batch）")
+    ap.add_argument("--workers", type=int, default=None, help="process 數（預設 CPU 數）")
+    ap.add_argument("--chunk-size", type=int, default=50, help="每個工作區塊的列數")
+    ap.add_argument("--limit", type=int, default=None, help="只處理前 N 列")
+    ap.add_argument("--no-pdf", action="store_true", help="只計算並寫 manifest，不產生 PDF")
+    args = ap.parse_args(argv)
+
+    if not args.input.is_file():
+        print(f"找不到輸入檔：{args.input}", file=sys.stderr)
+        return 2
+    summary = run(args.input, args.out, workers=args.workers, chunk_size=args.chunk_size,
+                  make_pdf=not args.no_pdf, limit=args.limit)
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+# src/services/chart_vector.py
+"""
+charts.py 的 matplotlib 圖 → reportlab 向量圖（Drawing）：
+- 以自訂 renderer 直接把路徑與文字轉成 reportlab shapes，不經 PNG 點陣化
+- 同一份 Drawing 可畫進 reportlab canvas（PDF），也可輸出 SVG（HTML）
+- 依（圖表名稱, 參數）的雜湊快取，同樣輸入只轉一次
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict
+
+import numpy as np
+from matplotlib.backend_bases import RendererBase
+from matplotlib.path import Path as MplPath
+from reportlab.graphics import renderPDF, renderSVG
+from reportlab.graphics.shapes import Drawing, Group, Path, String
+from reportlab.lib.colors import Color
+from reportlab.pdfbase import pdfmetrics
+
+_CAP = {"butt": 0, "round": 1, "projecting": 2}
+_JOIN = {"miter": 0, "round": 1, "bevel": 2}
+
+
+def _color(rgba, alpha=None):
+    if rgba is None:
+        return None
+    r, g, b, *a = rgba
+    a = (a[0] if a else 1.0) if alpha is None else alpha
+    return None if a <= 0 else Color(r, g, b, alpha=a)
+
+
+class _DrawingRenderer(RendererBase):
+    """matplotlib 以 72 dpi 繪製時，display 座標即為 pt，與 reportlab 同為 y 軸朝上。"""
+
+    def __init__(self, width: float, height: float, font: str):
+        super().__init__()
+        self.width, self.height = width, height
+        self.font = font
+        self.drawing = Drawing(width, height)
+
+    def flipy(self):
+        return False
+
+    def get_canvas_width_height(self):
+        return self.width, self.height
+
+    def points_to_pixels(self, points):
+        return points
+
+    def get_text_width_height_descent(self, s, prop, ismath):
+        size = prop.get_size_in_points()
+        face = pdfmetrics.getFont(self.font).face
+        ascent = getattr(face, "ascent", 718) / 1000.0
+        descent = -getattr(face, "descent", -207) / 1000.0
+        w = pdfmetrics.stringWidth(s, self.font, size)
+        return w, size * (ascent + descent), size * descent
+
+    def _add(self, shape, gc):
+        clip = gc.get_clip_rectangle()
+        if clip is None:
+            self.drawing.add(shape)
+            return
+        x0, y0, w, h = clip.bounds
+        cp = Path(isClipPath=1, fillColor=None, strokeColor=None)
+        cp.moveTo(x0, y0); cp.lineTo(x0 + w, y0); cp.lineTo(x0 + w, y0 + h); cp.lineTo(x0, y0 + h); cp.closePath()
+        self.drawing.add(Group(cp, shape))
+
+    def draw_path(self, gc, path, transform, rgbFace=None):
+        p = Path()
+        last = None
+        for verts, code in path.iter_segments(transform, remove_nans=True, simplify=False):
+            if code == MplPath.MOVETO:
+                p.moveTo(*verts); last = verts
+            elif code == MplPath.LINETO:
+                p.lineTo(*verts); last = verts
+            elif code == MplPath.CURVE3:
+                # 二次貝茲轉三次
+                c, end = np.asarray(verts[:2]), np.asarray(verts[2:])
+                q0 = np.asarray(last)
+                c1, c2 = q0 + 2 / 3 * (c - q0), end + 2 / 3 * (c - end)
+                p.curveTo(*c1, *c2, *end); last = verts[2:]
+            elif code == MplPath.CURVE4:
+                p.curveTo(*verts); last = verts[4:]
+            elif code == MplPath.CLOSEPOLY:
+                p.closePath()
+        alpha = gc.get_alpha() if gc.get_forced_alpha() else None
+        p.fillColor = _color(rgbFace, alpha)
+        lw = gc.get_linewidth()
+        p.strokeColor = _color(gc.get_rgb(), alpha) if lw > 0 else None
+        p.strokeWidth = lw
+        p.strokeLineCap = _CAP.get(gc.get_capstyle(), 0)
+        p.strokeLineJoin = _JOIN.get(gc.get_joinstyle(), 0)
+        offset, dashes = gc.get_dashes()
+        if dashes:
+            p.strokeDashArray = list(dashes)
+        if p.fillColor is None and p.strokeColor is None:
+            return
+        self._add(p, gc)
+
+    def draw_text(self, gc, x, y, s, prop, angle, ismath=False, mtext=None):
+        if ismath:
+            s = s.replace("$", "")
+        text = String(0, 0, s, fontName=self.font, fontSize=prop.get_size_in_points(),
+                      fillColor=_color(gc.get_rgb(), gc.get_alpha()), textAnchor="start")
+        g = Group(text)
+        g.translate(x, y)
+        if angle:
+            g.rotate(angle)
+        self._add(g, gc)
+
+    def draw_image(self, gc, x, y, im):
+        pass  # charts.py 沒有點陣圖層
+
+
+def figure_to_drawing(fig, font: str | None = None) -> Drawing:
+    """把 matplotlib Figure 轉成 reportlab Drawing（尺寸以 pt 計）。"""
+    if font is None:
+        from legacy_tools.modules.pdf_generator import _font_name
+        font = _font_name()
+    dpi = fig.dpi
+    w, h = fig.get_size_inches()
+    try:
+        fig.set_dpi(72)
+        renderer = _DrawingRenderer(w * 72, h * 72, font)
+        fig.draw(renderer)
+    finally:
+        fig.set_dpi(dpi)
+    return renderer.drawing
+
+
+# ---------- 依輸入雜湊的快取 ----------
+_CACHE_MAX = 64
+_DRAWINGS: "OrderedDict[str, Drawing]" = OrderedDict()
+_SVGS: "OrderedDict[str, str]" = OrderedDict()
+_STATS: Dict[str, int] = {"hits": 0, "misses": 0}
+_LOCK = threading.Lock()
+
+
+def _key(name: str, args: tuple, kwargs: Dict[str, Any]) -> str:
+    return hashlib.sha256(repr((name, args, sorted(kwargs.items()))).encode("utf-8")).hexdigest()
+
+
+def _remember(cache: OrderedDict, key: str, value):
+    cache[key] = value
+    while len(cache) > _CACHE_MAX:
+        cache.popitem(last=False)
+    return value
+
+
+def chart_drawing(name: str, *args, **kwargs) -> Drawing:
+    """以 charts.<name>(*args, **kwargs) 作圖並轉成 Drawing；相同輸入直接回傳快取。"""
+    key = _key(name, args, kwargs)
+    with _LOCK:
+        hit = _DRAWINGS.get(key)
+        if hit is not None:
+            _DRAWINGS.move_to_end(key)
+            _STATS["hits"] += 1
+            return hit
+    import matplotlib.pyplot as plt
+    from src.services import charts
+
+    fig = getattr(charts, name)(*args, **kwargs)
+    try:
+        drawing = figure_to_drawing(fig)
+    finally:
+        plt.close(fig)
+    with _LOCK:
+        _STATS["misses"] += 1
+        return _remember(_DRAWINGS, key, drawing)
+
+
+def chart_svg(name: str, *args, **kwargs) -> str:
+    """同 chart_drawing，輸出可直接內嵌於 HTML 的 SVG 字串。"""
+    key = _key(name, args, kwargs)
+    with _LOCK:
+        hit = _SVGS.get(key)
+        if hit is not None:
+            _SVGS.move_to_end(key)
+            return hit
+    svg = renderSVG.drawToString(chart_drawing(name, *args, **kwargs))
+    svg = svg[svg.index("<svg"):]  # 去掉 XML 宣告與 DOCTYPE，才能內嵌
+    with _LOCK:
+        return _remember(_SVGS, key, svg)
+
+
+def draw_on_canvas(canvas, drawing: Drawing, x: float, y: float, width: float | None = None) -> float:
+    """把 Drawing 畫在 canvas 的 (x, y)（左下角）；可指定寬度等比例縮放，回傳實際高度。"""
+    scale = 1.0 if width is None else width / drawing.width
+    canvas.saveState()
+    canvas.translate(x, y)
+    canvas.scale(scale, scale)
+    renderPDF.draw(drawing, canvas, 0, 0)
+    canvas.restoreState()
+    return drawing.height * scale
+
+
+def cache_stats() -> Dict[str, int]:
+    with _LOCK:
+        return dict(_STATS, size=len(_DRAWINGS))
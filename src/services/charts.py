@@ -1,26 +1,14 @@
 from __future__ import annotations
 from typing import List, Tuple
-import math
 import matplotlib.pyplot as plt
 from matplotlib.sankey import Sankey
 
-from src.domain.tax_rules import TaxConstants
+from src.domain.tax_rules import TaxConstants, compile_brackets
 
 # --- 既有：各級距稅額 Bar ---
 def _compute_tax_components_wan(taxable_base_wan: float, brackets: List[Tuple[float, float]]) -> List[Tuple[str, float]]:
-    parts = []
-    prev = 0.0
-    for idx, (upper, rate) in enumerate(brackets, start=1):
-        if taxable_base_wan <= prev:
-            parts.append((f"L{idx}", 0.0))
-            continue
-        chunk = min(taxable_base_wan, upper) - prev
-        tax_wan = max(chunk, 0.0) * rate
-        parts.append((f"L{idx}", tax_wan))
-        prev = upper
-        if math.isinf(upper):
-            break
-    return parts
+    parts = compile_brackets(brackets).breakdown(taxable_base_wan)
+    return [(f"L{idx}", tax_wan) for idx, tax_wan in enumerate(parts, start=1)]
 
 def tax_breakdown_bar(taxable_base_wan: float, *, constants: TaxConstants | None = None):
     c = constants or TaxConstants()
@@ -38,6 +26,22 @@ def tax_breakdown_bar(taxable_base_wan: float, *, constants: TaxConstants | None
     fig.tight_layout()
     return fig
 
+# --- 資產結構圓餅圖 ---
+
+def asset_pie(financial: float, realestate: float, business: float):
+    """金融資產／不動產／企業股權占比（金額單位不限，只看比例；0 的類別不畫）。"""
+    items = [("金融資產", financial), ("不動產", realestate), ("企業股權", business)]
+    items = [(k, max(float(v or 0.0), 0.0)) for k, v in items]
+    items = [(k, v) for k, v in items if v > 0] or [("（無資料）", 1.0)]
+
+    fig, ax = plt.subplots(figsize=(4.8, 3.6))
+    ax.pie([v for _, v in items], labels=[k for k, _ in items], autopct="%1.0f%%",
+           startangle=90, counterclock=False, wedgeprops=dict(linewidth=1, edgecolor="white"))
+    ax.set_title("資產結構")
+    ax.axis("equal")
+    fig.tight_layout()
+    return fig
+
 # --- 新增：節稅對比（實際上是「稅後資金缺口」對比） ---
 
 def savings_compare_bar(current_tax_yuan: float, coverage_yuan: float):
@@ -84,16 +88,22 @@ def simple_sankey(total_assets_yuan: float, tax_yuan: float, reserve_yuan: float
     ax = fig.add_subplot(1, 1, 1, xticks=[], yticks=[])
     ax.set_title("資金流示意（資產→稅款/家族；保單覆蓋稅款）")
 
-    # 第一條 Sankey：資產流出到 稅款(其他負擔) 與 家族
+    # 第一條 Sankey：資產流出到 稅款(其他負擔)、保單預留 與 家族（流量加總為 0）
     sankey = Sankey(ax=ax, format='%.0f')
     flows1 = [total, -other_tax if other_tax > 0 else -eps, -to_family if to_family > 0 else -eps]
     labels1 = ["資產總額", "稅款（其他資金）", "留給家族"]
     orientations1 = [0, 1, -1]
-    sankey.add(flows=flows1, labels=labels1, orientations=orientations1, trunklength=1.0, pathlengths=[0.4,0.4,0.4])
+    if reserve_to_tax > 0:
+        flows1.append(-reserve_to_tax)
+        labels1.append("保單預留")
+        orientations1.append(1)
+    sankey.add(flows=flows1, labels=labels1, orientations=orientations1, trunklength=1.0,
+               pathlengths=[0.4] * len(flows1))
 
-    # 第二條 Sankey：保單預留 → 稅款（與第一條的稅款端相接）
+    # 第二條 Sankey：保單預留 → 稅款（接在第一條的保單預留出口，兩端流量大小相同、正負相反）
     if reserve_to_tax > 0:
-        sankey.add(flows=[reserve_to_tax, -reserve_to_tax], labels=["保單預留", "稅款（保單覆蓋）"], orientations=[0, 0], prior=0, connect=(0, 1), pathlengths=[0.4,0.3])
+        sankey.add(flows=[reserve_to_tax, -reserve_to_tax], labels=[None, "稅款（保單覆蓋）"], orientations=[0, 0],
+                   prior=0, connect=(len(flows1) - 1, 0), pathlengths=[0.4, 0.3])
 
     sankey.finish()
     fig.tight_layout()
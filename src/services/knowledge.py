@@ -0,0 +1,52 @@
+# src/services/knowledge.py
+# 知識卡載入與檢索（AI Copilot 使用；獨立成模組以便不啟動 Streamlit 也能呼叫）
+from __future__ import annotations
+
+import os
+import glob
+import re
+from typing import List, Tuple
+
+SENSITIVE_PATTERNS = [
+    r"【內部】.*?【/內部】",
+    r"\[\[PRIVATE\]\].*?\[\[/PRIVATE\]\]",
+    r"\{\{SENSITIVE\}\}.*?\{\{/SENSITIVE\}\}",
+]
+
+def read_text(path: str) -> str:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except Exception:
+        return ""
+
+def scrub_sensitive(text: str) -> str:
+    t = text
+    for pat in SENSITIVE_PATTERNS:
+        t = re.sub(pat, "", t, flags=re.DOTALL)
+    return t
+
+def hard_truncate(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    return text[:limit] + "……"
+
+def keywordize(s: str) -> List[str]:
+    s = re.sub(r"[^\u4e00-\u9fffA-Za-z0-9]+", " ", s)
+    return [w for w in s.lower().split() if w]
+
+def score_overlap(query: str, doc: str) -> int:
+    qset = set(keywordize(query))
+    dset = set(keywordize(doc))
+    return len(qset & dset)
+
+def load_cards_from(folder: str) -> List[Tuple[str, str]]:
+    cards: List[Tuple[str, str]] = []
+    for p in sorted(glob.glob(os.path.join(folder, "*.md"))):
+        cards.append((os.path.basename(p), read_text(p)))
+    return cards
+
+def retrieve(query: str, docs: List[Tuple[str, str]], k: int = 3) -> List[Tuple[str, str]]:
+    scored = [(fn, tx, score_overlap(query, tx)) for fn, tx in docs]
+    scored.sort(key=lambda x: x[2], reverse=True)
+    return [(fn, tx) for fn, tx, _ in scored[:k] if _ > 0]
@@ -0,0 +1,158 @@
+# src/services/report_batch.py
+"""
+批次重產案件報告（月底全顧問重出用）：
+
+    python -m src.services.report_batch --all --workers 8
+    python -m src.services.report_batch CASE-001 CASE-002 --formats pdf
+    python -m src.services.report_batch --advisor A001 --full
+
+主程序由資料庫讀出案件，交給 process pool 產出（圖表＋PDF／DOCX）；
+每個 worker 只在啟動時載入字型與 matplotlib 一次。檔案先寫到本次執行專屬的暫存目錄再以
+os.replace 搬入輸出目錄（預設 data/reports），中途中斷不會留下半個檔案；
+最後寫出 manifest.csv 與 summary.json（pool、manifest 與進度共用 batch_pool）。
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.services.batch_pool import WORKER, run_pool, write_json
+
+FORMATS = ("pdf", "docx")
+MANIFEST_FIELDS = ["case_id", "advisor_id", "status", "error", "files", "elapsed_ms"]
+
+
+def _init_worker(out_dir: str, staging: str, formats: Sequence[str], full: bool) -> None:
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from legacy_tools.modules.pdf_generator import _font_name
+
+    _font_name()
+    plt.close(plt.figure())  # 先把 pyplot 與字型快取載好
+    WORKER["out_dir"] = Path(out_dir)
+    WORKER["formats"] = tuple(formats)
+    WORKER["full"] = full
+    WORKER["staging"] = Path(staging)
+
+
+def _publish(path: Path) -> str:
+    """暫存檔搬入輸出目錄（同一檔案系統上為原子操作）。"""
+    dest = WORKER["out_dir"] / path.name
+    os.replace(path, dest)
+    return dest.name
+
+
+def _render_case(case: Dict[str, Any]) -> Dict[str, Any]:
+    from src.services.reports import generate_docx
+    from src.services.reports_pdf import build_pdf_report
+
+    t0 = time.perf_counter()
+    out: Dict[str, Any] = {"case_id": case.get("id"), "advisor_id": case.get("advisor_id") or "",
+                           "status": "ok", "error": "", "files": ""}
+    staging = WORKER["staging"]
+    files: List[str] = []
+    try:
+        if "pdf" in WORKER["formats"]:
+            files.append(_publish(build_pdf_report(case, out_dir=staging)))
+        if "docx" in WORKER["formats"]:
+            files.append(_publish(staging / generate_docx(case, full=WORKER["full"], out_dir=staging)))
+    except Exception as e:  # 單一案件失敗不中斷整批
+        out.update(status="error", error=f"{type(e).__name__}: {e}")
+    out["files"] = ";".join(files)
+    out["elapsed_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    return out
+
+
+def _render_chunk(cases: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [_render_case(c) for c in cases]
+
+
+def load_cases(case_ids: Sequence[str] = (), advisor_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """指定 id 時逐筆讀取（找不到的以空案件回報錯誤）；否則讀全部或指定顧問的案件。"""
+    from src.repos.case_repo import CaseRepo
+
+    if not case_ids:
+        return CaseRepo.list_cases(advisor_id)
+    return [CaseRepo.get(cid) or {"id": cid, "_missing": True} for cid in case_ids]
+
+
+def run(
+    cases: Sequence[Dict[str, Any]],
+    out_dir: Path = Path("data/reports"),
+    *,
+    formats: Sequence[str] = FORMATS,
+    full: bool = False,
+    workers: Optional[int] = None,
+    chunk_size: int = 8,
+    progress_every: float = 2.0,
+) -> Dict[str, Any]:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    todo = [c for c in cases if not c.get("_missing")]
+    missing = [
+        {"case_id": c["id"], "advisor_id": "", "status": "error", "error": "找不到案件", "files": "", "elapsed_ms": 0}
+        for c in cases if c.get("_missing")
+    ]
+
+    # 本次執行專屬的暫存目錄：結束時只刪這一個，不動其他同時執行中的批次
+    staging = tempfile.mkdtemp(prefix=".staging-", dir=out_dir)
+    try:
+        result = run_pool(
+            ((todo[i:i + chunk_size],) for i in range(0, len(todo), chunk_size)), _render_chunk,
+            manifest_path=out_dir / "manifest.csv", fields=MANIFEST_FIELDS,
+            initializer=_init_worker, initargs=(str(out_dir), staging, tuple(formats), full),
+            workers=workers, rows=missing, unit="件", progress_every=progress_every,
+        )
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    summary = {
+        "cases": result.done,
+        "errors": result.errors,
+        "formats": list(formats),
+        "full": full,
+        "elapsed_s": round(result.elapsed_s, 3),
+        "cases_per_s": result.per_s,
+        "workers": result.workers,
+        "manifest": "manifest.csv",
+    }
+    write_json(out_dir / "summary.json", summary)
+    print(f"完成 {result.done:,} 件（錯誤 {result.errors}），{summary['cases_per_s']} 件/秒 → {out_dir}", file=sys.stderr)
+    return summary
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m src.services.report_batch", description="批次重產案件報告（PDF／DOCX）")
+    ap.add_argument("case_ids", nargs="*", help="案件碼（未指定時需加 --all 或 --advisor）")
+    ap.add_argument("--all", action="store_true", help="全部案件")
+    ap.add_argument("--advisor", default=None, help="只處理指定顧問的案件")
+    ap.add_argument("--formats", default="pdf,docx", help="輸出格式，逗號分隔（pdf、docx）")
+    ap.add_argument("--full", action="store_true", help="DOCX 產出完整版")
+    ap.add_argument("--out", type=Path, default=Path("data/reports"), help="輸出目錄（預設 data/reports）")
+    ap.add_argument("--workers", type=int, default=None, help="process 數（預設 CPU 數）")
+    ap.add_argument("--chunk-size", type=int, default=8, help="每個工作區塊的案件數")
+    args = ap.parse_args(argv)
+
+    formats = [f.strip().lower() for f in args.formats.split(",") if f.strip()]
+    bad = [f for f in formats if f not in FORMATS]
+    if bad or not formats:
+        print(f"不支援的格式：{'、'.join(bad) or '（未指定）'}", file=sys.stderr)
+        return 2
+    if not (args.case_ids or args.all or args.advisor):
+        print("請指定案件碼，或加上 --all／--advisor", file=sys.stderr)
+        return 2
+
+    cases = load_cases(args.case_ids, args.advisor)
+    summary = run(cases, args.out, formats=formats, full=args.full,
+                  workers=args.workers, chunk_size=args.chunk_size)
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
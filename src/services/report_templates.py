@@ -6,13 +6,20 @@ from typing import Dict, Any
 TEMPLATE_DIR = Path("templates")
 TEMPLATE_DIR.mkdir(parents=True, exist_ok=True)
 
-def fig_to_data_uri(fig) -> str:
+def fig_to_data_uri(fig, fmt: str = "svg") -> str:
+    """圖表轉 data URI；預設向量 SVG（檔案小、縮放不糊），fmt="png" 保留舊的 180 dpi 點陣輸出。"""
     import io
-    buf = io.BytesIO()
-    fig.savefig(buf, format="png", dpi=180, bbox_inches="tight")
-    buf.seek(0)
-    b64 = base64.b64encode(buf.read()).decode("ascii")
-    return f"data:image/png;base64,{b64}"
+    if fmt == "svg":
+        from src.services.chart_vector import figure_to_drawing
+        from reportlab.graphics import renderSVG
+        data = renderSVG.drawToString(figure_to_drawing(fig)).encode("utf-8")
+        mime = "image/svg+xml"
+    else:
+        buf = io.BytesIO()
+        fig.savefig(buf, format="png", dpi=180, bbox_inches="tight")
+        data, mime = buf.getvalue(), "image/png"
+    b64 = base64.b64encode(data).decode("ascii")
+    return f"data:{mime};base64,{b64}"
 
 def render_template(name: str, context: Dict[str, Any]) -> str:
     """偏好使用 jinja2；若無 jinja2，使用簡單替換。"""
@@ -1,22 +1,210 @@
-from docx import Document
+"""
+DOCX 報告：以母版（templates/report_master.docx；不存在時以程式建立）套版產出。
+母版只解析一次並快取在記憶體（依檔案 mtime 失效），每份報告只做字串替換與重新打包，
+可直接寫入串流（Streamlit 下載不必落地）。
+
+母版語法（寫在段落或表格儲存格文字中）：
+  {{key}}                 一般欄位
+  {{rows.field}}          所在表格列依 context["rows"]（list of dict）逐筆複製
+  {{#if key}} … {{/if}}   兩個標記各自獨立成段，key 為假時中間段落整段移除
+"""
+from __future__ import annotations
+
+import io
+import re
+import threading
+import zipfile
+from datetime import datetime
 from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from docx import Document
 
-def generate_docx(case: dict, full: bool = False) -> str:
+MASTER_PATH = Path("templates/report_master.docx")
+_DOCUMENT_XML = "word/document.xml"
+
+_ROW = re.compile(r"<w:tr[ >].*?</w:tr>", re.S)
+_FIELD = re.compile(r"\{\{\s*([A-Za-z_][\w.]*)\s*\}\}")
+_ROW_FIELD = re.compile(r"\{\{\s*([A-Za-z_]\w*)\.[A-Za-z_]\w*\s*\}\}")
+_IF_BLOCK = re.compile(
+    r"<w:p[ >](?:(?!</w:p>).)*?\{\{#if\s+(\w+)\}\}.*?</w:p>(.*?)<w:p[ >](?:(?!</w:p>).)*?\{\{/if\}\}.*?</w:p>",
+    re.S,
+)
+
+
+def _build_master() -> bytes:
+    """預設母版（與舊版 generate_docx 的內容一致，另加摘要與資產表格）。"""
     doc = Document()
     doc.add_heading("傳承診斷報告", level=1)
-    doc.add_paragraph(f"案件碼：{case['id']}")
-    doc.add_paragraph(f"客戶：{case['client_alias']}")
-    doc.add_paragraph(f"淨遺產：{case['net_estate']:,}")
-    doc.add_paragraph(f"估算稅額：{case['tax_estimate']:,}")
-    doc.add_paragraph(f"建議預留稅源：{case['liquidity_needed']:,}")
-
-    if full:
-        doc.add_heading("完整明細與建議", level=2)
-        doc.add_paragraph("• 稅則假設與參數（示意，可替換為正式版）")
-        doc.add_paragraph("• 資產分類明細與負債")
-        doc.add_paragraph("• 策略建議：保險、信託、遺囑、公司治理架構、稅務安排（示意）")
-
-    out_dir = Path("data/reports"); out_dir.mkdir(parents=True, exist_ok=True)
+    doc.add_paragraph("案件碼：{{id}}")
+    doc.add_paragraph("客戶：{{client_alias}}")
+    doc.add_paragraph("產出日期：{{date}}")
+
+    summary = doc.add_table(rows=3, cols=2)
+    summary.style = "Table Grid"
+    for row, (label, key) in zip(summary.rows, (("淨遺產", "net_estate"), ("估算稅額", "tax_estimate"),
+                                              ("建議預留稅源", "liquidity_needed"))):
+        row.cells[0].text = label
+        row.cells[1].text = "{{%s}}" % key
+
+    doc.add_heading("資產分類", level=2)
+    assets = doc.add_table(rows=2, cols=2)
+    assets.style = "Table Grid"
+    assets.rows[0].cells[0].text = "項目"
+    assets.rows[0].cells[1].text = "金額"
+    assets.rows[1].cells[0].text = "{{assets.item}}"
+    assets.rows[1].cells[1].text = "{{assets.amount}}"
+
+    doc.add_paragraph("{{#if full}}")
+    doc.add_heading("完整明細與建議", level=2)
+    doc.add_paragraph("• 稅則假設與參數（示意，可替換為正式版）")
+    doc.add_paragraph("• 資產分類明細與負債")
+    doc.add_paragraph("• 策略建議：保險、信託、遺囑、公司治理架構、稅務安排（示意）")
+    doc.add_paragraph("{{/if}}")
+
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def _merge_split_placeholders(data: bytes) -> bytes:
+    """Word 常把 {{…}} 拆進多個 run；載入母版時把這類段落的文字併回第一個 run（沿用其格式）。"""
+    doc = Document(io.BytesIO(data))
+    paragraphs = list(doc.paragraphs)
+    for table in doc.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                paragraphs.extend(cell.paragraphs)
+    changed = False
+    for p in paragraphs:
+        runs = p.runs
+        if "{{" not in p.text or all(r.text.count("{{") == r.text.count("}}") for r in runs):
+            continue
+        if len(runs) > 1:
+            runs[0].text = p.text
+            for r in runs[1:]:
+                r._r.getparent().remove(r._r)
+            changed = True
+    if not changed:
+        return data
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+class DocxTemplate:
+    """
+    解析一次的母版：document.xml 以字串保存；其餘項目先壓成一份不含 document.xml 的 zip，
+    render 時複製這份 bytes 再附加新的 document.xml，不必每份重新壓縮樣式、主題等檔案。
+    """
+
+    def __init__(self, data: bytes):
+        data = _merge_split_placeholders(data)
+        base = io.BytesIO()
+        with zipfile.ZipFile(io.BytesIO(data)) as src, zipfile.ZipFile(base, "w", zipfile.ZIP_DEFLATED) as dst:
+            for info in src.infolist():
+                if info.filename == _DOCUMENT_XML:
+                    self._xml = src.read(info).decode("utf-8")
+                    self._xml_date_time = info.date_time
+                else:
+                    dst.writestr(info, src.read(info))
+        self._base = base.getvalue()
+
+    @staticmethod
+    def _fill(xml: str, context: Dict[str, Any], keep_missing: bool = False) -> str:
+        def value(m: re.Match) -> str:
+            key = m.group(1)
+            if key not in context:
+                return m.group(0) if keep_missing else ""
+            v = context[key]
+            return escape("" if v is None else str(v))
+        return _FIELD.sub(value, xml)
+
+    def render_xml(self, context: Dict[str, Any]) -> str:
+        xml = _IF_BLOCK.sub(lambda m: m.group(2) if context.get(m.group(1)) else "", self._xml)
+
+        def expand_row(m: re.Match) -> str:
+            row = m.group(0)
+            names = set(_ROW_FIELD.findall(row))
+            if not names:
+                return row
+            name = sorted(names)[0]
+            items = context.get(name) or []
+            return "".join(
+                self._fill(row, {f"{name}.{k}": v for k, v in item.items()}, keep_missing=True) for item in items
+            )
+
+        xml = _ROW.sub(expand_row, xml)
+        return self._fill(xml, context)
+
+    def render(self, context: Dict[str, Any], stream: Optional[BinaryIO] = None) -> BinaryIO:
+        """套版並寫入 stream（預設新的 BytesIO，已 seek(0)）。"""
+        buf = io.BytesIO(self._base)
+        buf.seek(0, io.SEEK_END)
+        # 每次用新的 ZipInfo：writestr 會改寫 file_size/CRC/header_offset，共用同一個物件在多執行緒下會互相覆蓋
+        info = zipfile.ZipInfo(_DOCUMENT_XML, self._xml_date_time)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        with zipfile.ZipFile(buf, "a", zipfile.ZIP_DEFLATED) as z:
+            z.writestr(info, self.render_xml(context).encode("utf-8"))
+        if stream is None:
+            buf.seek(0)
+            return buf
+        stream.write(buf.getvalue())
+        return stream
+
+
+_MASTER: Dict[str, Tuple[Optional[int], DocxTemplate]] = {}
+_MASTER_LOCK = threading.Lock()
+
+
+def load_master(path: Path = MASTER_PATH) -> DocxTemplate:
+    """讀取母版並快取；檔案不存在時使用程式建立的預設母版。"""
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        mtime = None
+    key = str(path)
+    with _MASTER_LOCK:
+        hit = _MASTER.get(key)
+        if hit is not None and hit[0] == mtime:
+            return hit[1]
+        tpl = DocxTemplate(path.read_bytes() if mtime is not None else _build_master())
+        _MASTER[key] = (mtime, tpl)
+        return tpl
+
+
+def _money(v) -> str:
+    return f"{float(v or 0):,.0f}"
+
+
+def case_context(case: dict, full: bool = False) -> Dict[str, Any]:
+    return {
+        "id": case.get("id", ""),
+        "client_alias": case.get("client_alias") or "",
+        "date": datetime.now().strftime("%Y-%m-%d"),
+        "net_estate": _money(case.get("net_estate")),
+        "tax_estimate": _money(case.get("tax_estimate")),
+        "liquidity_needed": _money(case.get("liquidity_needed")),
+        "assets": [
+            {"item": label, "amount": _money(case.get(key))}
+            for label, key in (("金融資產", "assets_financial"), ("不動產", "assets_realestate"),
+                               ("企業股權", "assets_business"), ("負債", "liabilities"))
+            if case.get(key)
+        ],
+        "full": full,
+    }
+
+
+def render_docx(case: dict, full: bool = False, stream: Optional[BinaryIO] = None) -> BinaryIO:
+    """案件報告寫入串流（可直接交給 st.download_button）。"""
+    return load_master().render(case_context(case, full), stream)
+
+
+def generate_docx(case: dict, full: bool = False, out_dir: Path | None = None) -> str:
+    out_dir = Path(out_dir) if out_dir else Path("data/reports")
+    out_dir.mkdir(parents=True, exist_ok=True)
     fname = f"{case['id']}_report{'_full' if full else '_lite'}.docx"
-    doc.save(out_dir / fname)
+    with open(out_dir / fname, "wb") as f:
+        render_docx(case, full, f)
     return fname
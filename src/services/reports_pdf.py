@@ -1,50 +1,61 @@
 from __future__ import annotations
+import json
 from pathlib import Path
 from datetime import datetime
-import io
 
-# 延遲匯入：WeasyPrint 非必裝，裝不到就退回 HTML
+# 延遲匯入：WeasyPrint 非必裝，裝不到就改以 reportlab 直接輸出 PDF
 try:
     from weasyprint import HTML
     HAS_WEASY = True
 except Exception:
     HAS_WEASY = False
 
-# 不在頂層匯入 charts，避免一出錯整檔無法 import
-def _try_import_charts():
-    try:
-        # 相對匯入比絕對匯入更穩
-        from .charts import (
-            tax_breakdown_bar,
-            asset_pie,
-            savings_compare_bar,
-            simple_sankey,
-        )
-        return {
-            "tax_breakdown_bar": tax_breakdown_bar,
-            "asset_pie": asset_pie,
-            "savings_compare_bar": savings_compare_bar,
-            "simple_sankey": simple_sankey,
-        }, None
-    except Exception as e:
-        return None, e
-
-def _ensure_outdir() -> Path:
-    out = Path("data/reports")
+_FAMILY_KEYS = ("has_spouse", "adult_children", "parents", "disabled_people", "other_dependents")
+
+def _taxable_base_wan(case: dict) -> float | None:
+    """
+    課稅遺產淨額（萬）：淨遺產（元）扣除免稅額與家庭扣除額。
+    家庭結構取自案件 payload 的 params；未記錄時回傳 None（無法得知扣除額，不硬算）。
+    """
+    payload = case.get("payload")
+    if payload is None and case.get("payload_json"):
+        try:
+            payload = json.loads(case["payload_json"])
+        except (TypeError, ValueError):
+            payload = None
+    params = (payload or {}).get("params") if isinstance(payload, dict) else None
+    if not isinstance(params, dict) or not any(k in params for k in _FAMILY_KEYS):
+        return None
+    from src.domain.tax_loader import load_tax_constants
+    from src.domain.tax_memo import memo_diagnose_yuan
+
+    c = load_tax_constants()
+    diag = memo_diagnose_yuan(
+        float(case.get("net_estate") or 0.0),
+        has_spouse=bool(params.get("has_spouse")),
+        **{k: int(params.get(k) or 0) for k in _FAMILY_KEYS[1:]},
+        constants=c,
+    )
+    return diag["taxable_base_wan"]
+
+def _chart_specs(case: dict) -> list:
+    """依案件現有欄位決定要畫哪些圖：[(圖表名稱, 參數), ...]（有多少用多少）。"""
+    specs = []
+    base_wan = _taxable_base_wan(case) if case.get("net_estate") else None
+    if base_wan:
+        specs.append(("tax_breakdown_bar", (base_wan,)))
+    assets = tuple(float(case.get(k) or 0.0) for k in ("assets_financial", "assets_realestate", "assets_business"))
+    if any(assets):
+        specs.append(("asset_pie", assets))
+    return specs
+
+def _ensure_outdir(out_dir: Path | None = None) -> Path:
+    out = Path(out_dir) if out_dir else Path("data/reports")
     out.mkdir(parents=True, exist_ok=True)
     return out
 
-def _png_bytes_from_fig(fig):
-    """將 matplotlib 圖存成 PNG bytes"""
-    import matplotlib.pyplot as plt
-    buf = io.BytesIO()
-    fig.savefig(buf, format="png", bbox_inches="tight", dpi=160)
-    plt.close(fig)
-    buf.seek(0)
-    return buf.getvalue()
-
-def _build_html(case: dict) -> str:
-    """最簡 HTML 報告（即使沒有圖也能出）"""
+def _build_html(case: dict, charts_svg: list | None = None) -> str:
+    """最簡 HTML 報告（即使沒有圖也能出）；圖表以內嵌 SVG 呈現"""
     id_ = case.get("id", "")
     net = case.get("net_estate", 0.0)
     tax = case.get("tax_estimate", 0.0)
@@ -64,6 +75,7 @@ def _build_html(case: dict) -> str:
     .kv {{ display:flex; gap:16px; }}
     .kv div {{ flex:1; }}
     .num {{ font-weight:600; font-size:20px; }}
+    .chart svg {{ max-width:100%; height:auto; }}
   </style>
 </head>
 <body>
@@ -76,6 +88,8 @@ def _build_html(case: dict) -> str:
     <div class="card"><div>建議預留稅源</div><div class="num">{liq:,.0f}</div></div>
   </div>
 
+  {"".join(f'<div class="card chart">{svg}</div>' for svg in charts_svg or [])}
+
   <p style="margin-top:24px;color:#666;font-size:12px">
     本報告為教育性質示意，不構成保險或法律建議。
   </p>
@@ -83,48 +97,74 @@ def _build_html(case: dict) -> str:
 </html>
 """
 
-def build_pdf_report(case: dict) -> Path:
+def _write_reportlab_pdf(case: dict, drawings: list, path: Path) -> None:
+    """沒有 WeasyPrint 時直接以 reportlab 輸出：摘要數字＋向量圖表。"""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import mm
+    from reportlab.pdfgen import canvas as rl_canvas
+    from legacy_tools.modules.pdf_generator import _font_name
+    from src.services.chart_vector import draw_on_canvas
+
+    font = _font_name()
+    page_w, page_h = A4
+    margin = 20 * mm
+    c = rl_canvas.Canvas(path.as_posix(), pagesize=A4)
+    y = page_h - margin
+    c.setFont(font, 18)
+    c.drawString(margin, y - 18, "規劃報告（簡版）")
+    c.setFont(font, 9)
+    c.drawString(margin, y - 34, f"案件：{case.get('id', '')}｜產出時間：{datetime.now().strftime('%Y-%m-%d %H:%M')}")
+    y -= 60
+    c.setFont(font, 12)
+    for label, key in (("淨遺產", "net_estate"), ("估算稅額", "tax_estimate"), ("建議預留稅源", "liquidity_needed")):
+        c.drawString(margin, y, f"{label}：{float(case.get(key) or 0.0):,.0f}")
+        y -= 18
+    y -= 6 * mm
+    width = page_w - 2 * margin
+    for d in drawings:
+        h = d.height * min(width / d.width, 1.0)
+        if y - h < margin:
+            c.showPage()
+            y = page_h - margin
+        y -= h
+        draw_on_canvas(c, d, margin, y, width=min(width, d.width))
+        y -= 6 * mm
+    c.setFont(font, 8)
+    c.drawString(margin, margin / 2, "本報告為教育性質示意，不構成保險或法律建議。")
+    c.showPage()
+    c.save()
+
+def build_pdf_report(case: dict, out_dir: Path | None = None) -> Path:
     """
-    產生 PDF（若無 WeasyPrint 或圖表匯入失敗，會退回 HTML）。
-    回傳檔案路徑（.pdf 或 .html）
+    產生 PDF：有 WeasyPrint 時由 HTML（內嵌 SVG 圖表）轉出，否則以 reportlab 直接繪製向量圖表；
+    兩者皆失敗才退回 HTML。回傳檔案路徑（.pdf 或 .html）；out_dir 預設 data/reports
     """
-    outdir = _ensure_outdir()
-    charts, charts_err = _try_import_charts()
-
-    # 嘗試組圖（若失敗就不放圖）
-    images = {}
-    if charts:
-        try:
-            # 依現有欄位生成圖表（有多少用多少）
-            if case.get("tax_estimate") and case.get("net_estate"):
-                fig1 = charts["tax_breakdown_bar"](
-                    float(case.get("tax_estimate")) / 10000.0  # 若此函式吃「萬」，自行調整
-                )
-                images["tax_breakdown.png"] = _png_bytes_from_fig(fig1)
-
-            assets_fin = case.get("assets_financial") or 0.0
-            assets_re  = case.get("assets_realestate") or 0.0
-            assets_biz = case.get("assets_business") or 0.0
-            if any([assets_fin, assets_re, assets_biz]):
-                fig2 = charts["asset_pie"](assets_fin, assets_re, assets_biz)
-                images["asset_pie.png"] = _png_bytes_from_fig(fig2)
-        except Exception:
-            # 圖表失敗就忽略，不要讓整個匯出掛掉
-            images = {}
+    outdir = _ensure_outdir(out_dir)
+    specs = _chart_specs(case)
+    case_id = case.get("id", "report")
 
-    # 基本 HTML
-    html = _build_html(case)
+    # 圖表以 chart_vector 轉成向量圖（依輸入雜湊快取）；失敗就不放圖，不讓整個匯出掛掉
+    drawings, svgs = [], []
+    try:
+        from src.services.chart_vector import chart_drawing, chart_svg
+        drawings = [chart_drawing(name, *args) for name, args in specs]
+        svgs = [chart_svg(name, *args) for name, args in specs]
+    except Exception:
+        drawings, svgs = [], []
 
-    # 若能做成 PDF 就輸出 PDF；否則輸出 HTML
-    case_id = case.get("id", "report")
+    html = _build_html(case, svgs)
+    pdf_path = outdir / f"{case_id}.pdf"
     if HAS_WEASY:
         try:
-            pdf_path = outdir / f"{case_id}.pdf"
-            # 若要嵌入圖片，可在 HTML 中使用 data URI（此處為簡化版本，不嵌圖也能出）
             HTML(string=html).write_pdf(pdf_path.as_posix())
             return pdf_path
         except Exception:
             pass
+    try:
+        _write_reportlab_pdf(case, drawings, pdf_path)
+        return pdf_path
+    except Exception:
+        pass
 
     # 退回 HTML 檔
     html_path = outdir / f"{case_id}.html"
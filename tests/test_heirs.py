@@ -0,0 +1,46 @@
+from fractions import Fraction
+
+from src.domain.heirs import FamilyTree, Person
+
+
+def _family(**spouse):
+    tree = FamilyTree()
+    tree.set_spouse(Person("w", "配偶", **spouse))
+    tree.add_parent(Person("f", "父"))
+    tree.add_child(Person("a", "長子", renounced=True))
+    tree.add_child(Person("b", "次女", renounced=True))
+    tree.add_child(Person("a1", "孫甲"), parent_id="a")
+    tree.add_child(Person("a2", "孫乙"), parent_id="a")
+    tree.add_child(Person("b1", "孫丙"), parent_id="b")
+    return tree
+
+
+def test_all_children_renounce_passes_to_grandchildren_per_capita():
+    shares = _family().statutory_shares()
+    assert set(shares) == {"w", "a1", "a2", "b1"}
+    for pid in ("w", "a1", "a2", "b1"):
+        assert shares[pid][0] == Fraction(1, 4)
+    assert "f" not in shares
+
+
+def test_grandchildren_are_own_right_heirs_and_deductions_capped():
+    tree = _family()
+    relations = {h.person_id: h.relation for h in tree.distribute(10_000).heirs}
+    assert relations["a1"] == "孫子女"
+    assert tree.deduction_profile()["adult_children"] == 2
+
+
+def test_renounced_share_stays_within_first_degree():
+    tree = _family()
+    tree.update("b", renounced=False)
+    shares = tree.statutory_shares()
+    assert set(shares) == {"w", "b"}
+    assert shares["b"][0] == Fraction(1, 2)
+
+
+def test_parents_inherit_when_no_descendant_accepts():
+    tree = _family()
+    for pid in ("a1", "a2", "b1"):
+        tree.update(pid, renounced=True)
+    shares = tree.statutory_shares()
+    assert shares == {"f": (Fraction(1, 2), "parent"), "w": (Fraction(1, 2), "spouse")}
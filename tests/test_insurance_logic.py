@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+
+from legacy_tools.modules.insurance_logic import recommend_strategies, recommend_strategies_batch
+
+# 以下為改寫前 recommend_strategies（FX_USD_TWD = 32）的實際輸出：(name, fit, description)
+LEGACY = ("終身壽險＋增額結構（預留稅源）", ["傳承", "稅源", "企業主"])
+CASHFLOW = ("增額型終身壽＋現金流配置", ["退休", "資產配置"])
+MEDICAL = ("醫療險／長照險（保障缺口補強）", ["醫療", "長照"],
+           "優先補齊實支實付與長照給付；與壽險方案協同配置保費。")
+EDUCATION = ("教育金專案（保值與安全性優先）", ["教育"])
+HINT = ("入門預算提示", ["入門預算"], "可先以定期壽險＋醫療長照補足缺口，逐步升級到終身壽險結構。")
+
+
+def _legacy(pay_years):
+    return LEGACY + (f"前期視資金狀況加保；建議以 {pay_years} 年繳，調整基本保額與增額比例；"
+                     "保單可作為流動性工具（保單借款），亦可搭配信託或股權設計。",)
+
+
+CASES = [
+    # (budget, currency, pay_years, goals, expected)
+    (float("nan"), "TWD", 10, ["傳承"], [_legacy(10)]),
+    (50, "TWD", 1, ["醫療", "教育"], [MEDICAL, EDUCATION + ("搭配年期 1；屆期以減額或保單借款取得資金。",), HINT]),
+    (99.9, "TWD", 6, ["退休"], [
+        CASHFLOW + ("前期視資金狀況加保；採 6 年期；以定率增額提高長期現金值，"
+                    "到期後視利率與家庭現金流需求調整保單借款或減額繳清。",),
+        HINT,
+    ]),
+    (3.1, "USD", 10, ["稅源", "長照"], [_legacy(10), MEDICAL, HINT]),
+    (3.125, "USD", 5, ["傳承", "醫療"], [_legacy(5), MEDICAL]),
+    (3.2, "USD", 20, ["企業主"], [_legacy(20)]),
+    (10, "USD", 2, ["資產配置", "教育"], [
+        CASHFLOW + ("前期視資金狀況加保；採 2 年期；以定率增額提高長期現金值，"
+                    "到期後視利率與家庭現金流需求調整保單借款或減額繳清。",),
+        EDUCATION + ("前期視資金狀況加保；搭配年期 2；屆期以減額或保單借款取得資金。",),
+    ]),
+    (1500, "TWD", 3, [], []),
+    (-5, "TWD", 1, ["醫療"], [MEDICAL, HINT]),
+]
+
+
+def _summary(strategies):
+    return [(s["name"], s["fit"], s["description"]) for s in strategies]
+
+
+@pytest.mark.parametrize("budget,currency,pay_years,goals,expected", CASES)
+def test_scalar_matches_legacy_output(budget, currency, pay_years, goals, expected):
+    got = recommend_strategies(45, "不分", budget, currency, pay_years, goals, fx_rate=32.0)
+    assert _summary(got) == [tuple(e) for e in expected]
+
+
+def test_batch_matches_legacy_output():
+    profiles = pd.DataFrame(
+        [(b, c, p, "、".join(g)) for b, c, p, g, _ in CASES],
+        columns=["budget", "currency", "pay_years", "goals"],
+    )
+    batch = recommend_strategies_batch(profiles, fx_rate=32.0)
+    for i, (*_, expected) in enumerate(CASES):
+        assert _summary(batch[i]) == [tuple(e) for e in expected], i